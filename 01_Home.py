@@ -1,18 +1,26 @@
 import streamlit as st
-from utils.carrega_dados import carregar_dados
+from utils.cache import estatisticas_caches
+from utils.carrega_dados import carregar_dados, estatisticas_rapidas, resumo_qualidade
+from utils.estatisticas_rapidas import calcular_metricas
+from utils.filtros import filtrar_dados_da_pagina, filtros_ativos, filtros_salvos
+from utils.payload import exibir_resumo_payload, exibir_tabela, iniciar_payload, relatorio_payload
+from utils.recarga import acompanhar_versao_dataset
 
 st.set_page_config(
     page_title="Análise de Músicas do Spotify",
     page_icon="🎵",
     layout="wide"
 )
+iniciar_payload()
 
 st.title("Análise de Dados Musicais do Spotify")
 
-# Carrega os dados usando a função cacheada
-df = carregar_dados()
+# Usa a versão do dataset da sessão e avisa quando houver uma nova
+acompanhar_versao_dataset()
 
-st.markdown(f"""
+def exibir_resumo_dataset(metricas):
+    """Apresentação, dimensões do dataset e métricas rápidas"""
+    st.markdown(f"""
 Bem-vindo(a) ao **Dashboard de Análise de Dados Musicais do Spotify**!
 
 Este aplicativo interativo foi desenvolvido para explorar e visualizar as principais percepções sobre músicas, artistas e álbuns disponíveis no Spotify. Através de dados detalhados, buscamos responder a perguntas como:
@@ -34,17 +42,18 @@ Utilize o menu de navegação na **barra lateral (esquerda)** para explorar as d
 * **📈 Popularidade** Análise de fatores para popularidade.
 * **🎼 Gêneros Musicais:** Analise de detalhes sobre cada gênero musical e comparações.
 * **🔍 Insights Avançados:** Análises aprofundadas para uso comercial
+* **🗓️ Comparação de Snapshots:** Quem ganhou ou perdeu popularidade e seguidores entre dois exports
 
 ---
 
 ### 📋 Sobre o Dataset:
 
 O seu conjunto de dados tem as seguintes dimensões:
-- **Total de Músicas (Linhas):** 🎵 `{df.shape[0]:,}` 
-- **Variáveis Analisadas (Colunas):** 📈 `{df.shape[1]}` 
-- **Artistas Únicos:** 👩‍🎤​ `{df['artist_name'].nunique()}` diferentes
-- **Álbuns Únicos:** 💿​ `{df['album_name'].nunique()}` álbuns
-- **Tipos de Álbum:** ​💽​ `{df['album_type'].nunique()}` categorias
+- **Total de Músicas (Linhas):** 🎵 `{metricas['linhas']:,}` 
+- **Variáveis Analisadas (Colunas):** 📈 `{metricas['colunas']}` 
+- **Artistas Únicos:** 👩‍🎤​ `{metricas['artistas_unicos']}` diferentes
+- **Álbuns Únicos:** 💿​ `{metricas['albuns_unicos']}` álbuns
+- **Tipos de Álbum:** ​💽​ `{metricas['tipos_album']}` categorias
 
 **Principais métricas analisadas:**
 - **Popularidade** de artistas e músicas
@@ -54,28 +63,51 @@ O seu conjunto de dados tem as seguintes dimensões:
 - **Data de lançamento**
 
 
-""")
+    """)
+
+    # Métricas rápidas
+    st.header("📈 Métricas Rápidas")
+
+    #Criando colunas para as métricas
+    col1, col2, col3 = st.columns(3) 
+
+    with col1:
+        # Artista com maior valor na coluna artist_popularity
+        st.metric("Artista Mais Popular", metricas['artista_mais_popular'])
+
+    with col2:
+        # Média da popularidade das músicas
+        st.metric("Popularidade Média", f"{metricas['popularidade_media']:.1f}")
 
-# Métricas rápidas
-st.header("📈 Métricas Rápidas")
+    with col3:
+        # Duração média das músicas
+        st.metric("Duração Média", f"{metricas['duracao_media']:.1f} min")
 
-#Criando colunas para as métricas
-col1, col2, col3 = st.columns(3) 
 
-with col1:
-    # Encontra o nome do artista com maior valor na coluna artist_popularity
-    artista_mais_popular = df.loc[df['artist_popularity'].idxmax(), 'artist_name'] 
-    st.metric("Artista Mais Popular", artista_mais_popular)
+# Estatísticas gravadas na ingestão: sem filtros, o resumo aparece antes da
+# carga completa, que segue em segundo plano
+rapidas = estatisticas_rapidas()
+metricas = None
+if rapidas is not None:
+    ano_min, ano_max = rapidas['metricas']['ano_min'], rapidas['metricas']['ano_max']
+    if not filtros_ativos(filtros_salvos(ano_min, ano_max)):
+        metricas = rapidas['metricas']
 
-with col2:
-    # Calcula a média da popularidade das músicas
-    avg_popularity = df['track_popularity'].mean()
-    st.metric("Popularidade Média", f"{avg_popularity:.1f}")
+resumo = st.container()
+if metricas is not None:
+    with resumo:
+        exibir_resumo_dataset(metricas)
 
-with col3:
-    # Duração média das músicas
-    avg_duration = df['track_duration_min'].mean()
-    st.metric("Duração Média", f"{avg_duration:.1f} min")
+# Carrega os dados usando a função cacheada
+with st.spinner("Carregando o dataset completo..."):
+    df = carregar_dados()
+
+# Aplica os filtros globais da barra lateral (tipo de álbum, explícito, gêneros e anos)
+df, filtros = filtrar_dados_da_pagina(df)
+
+if metricas is None:
+    with resumo:
+        exibir_resumo_dataset(calcular_metricas(df))
 
 st.header("👀 Prévia dos Dados")
 st.info(f"Abaixo uma amostra das primeiras 10 músicas de um total de {df.shape[0]:,} linhas no dataset.")
@@ -93,11 +125,56 @@ colunas_para_exibir = {
   
 # Criar DataFrame apenas com as colunas que queremos exibir
 df_display = df[list(colunas_para_exibir.keys())].rename(columns=colunas_para_exibir)
-st.dataframe(df_display.head(10), use_container_width=True)
+exibir_tabela(df_display.head(10), 'Amostra do dataset')
 
 # Informação adicional sobre o tamanho do dataset
 st.caption(f"📊 Dataset completo possui **{df.shape[0]:,} linhas** e **{df.shape[1]} colunas**")
 
+# Resultado da validação feita na ingestão do CSV
+qualidade = resumo_qualidade()
+with st.expander("🧪 Qualidade dos Dados"):
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Linhas no Arquivo", f"{qualidade['linhas_lidas']:,}")
+    col2.metric("Linhas Válidas", f"{qualidade['linhas_validas']:,}")
+    col3.metric("Rejeitadas", f"{qualidade['linhas_rejeitadas']:,}")
+    col4.metric("Duplicadas", f"{qualidade['linhas_duplicadas']:,}",
+                help=f"Política de deduplicação: {qualidade['politica_deduplicacao']}")
+
+    for motivo, quantidade in qualidade['rejeitadas_por_motivo'].items():
+        st.markdown(f"- **{motivo}:** {quantidade:,} linhas")
+    if qualidade['nulos_por_coluna']:
+        nulos = ', '.join(f"`{c}` ({n:,})" for c, n in qualidade['nulos_por_coluna'].items())
+        st.markdown(f"- **Valores ausentes nas linhas válidas:** {nulos}")
+    if qualidade.get('datas_invalidas_mantidas'):
+        st.markdown(f"- **Mantidas sem data de lançamento (data ilegível):** "
+                    f"{qualidade['datas_invalidas_mantidas']:,} linhas")
+    if qualidade['arquivo_quarentena']:
+        st.caption(f"Linhas rejeitadas e duplicadas, com o motivo, ficam em `{qualidade['arquivo_quarentena']}`.")
+    else:
+        st.caption("Para gravar as linhas rejeitadas e duplicadas, com o motivo, inicie o app com GRAVAR_QUARENTENA=1.")
+
 #barra lateralde navegação
 st.sidebar.header("Navegação")
 st.sidebar.success("Tudo pronto! Selecione uma página acima para explorar!")
+
+# Uso dos caches da camada de dados (entradas, memória, acertos e despejos)
+with st.sidebar.expander("🧮 Uso do cache"):
+    st.dataframe(
+        estatisticas_caches()[['cache', 'entradas', 'mb', 'taxa_acerto', 'esperas', 'despejos', 'recusados']],
+        hide_index=True,
+        column_config={
+            'mb': st.column_config.NumberColumn('MB', format='%.1f'),
+            'taxa_acerto': st.column_config.NumberColumn('Acertos', format='percent'),
+        }
+    )
+
+# Volume médio enviado ao navegador por rerun em cada página do processo
+with st.sidebar.expander("📡 Payload por página"):
+    st.dataframe(
+        relatorio_payload()[['pagina', 'reruns', 'kb_por_rerun', 'reducoes']],
+        hide_index=True,
+        column_config={'kb_por_rerun': st.column_config.NumberColumn('KB/rerun', format='%.0f')}
+    )
+
+# Volume enviado ao navegador nesta execução
+exibir_resumo_payload('Home')
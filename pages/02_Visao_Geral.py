@@ -1,19 +1,105 @@
 # Importação das bibliotecas e funções
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-from utils.carrega_dados import carregar_dados
+import plotly.graph_objects as go
+from utils.carrega_dados import carregar_dados, estatisticas_rapidas, versao_carregada, versao_sessao
+from utils.estatisticas_rapidas import calcular_metricas, tabela_grafico
+from utils.filtros import filtrar_dados_da_pagina, filtros_ativos, filtros_salvos
+from utils.dag import derivado
+from utils.interpretacao import ROTULOS_DURACAO, ROTULOS_POPULARIDADE, interpretar_duracao, interpretar_lancamentos
+from utils.sketches import estatisticas_box, mesclar_celulas, sketches_da_versao
+from utils.top_k import construir_indices_top_k, consultar_top_k, valores_escopo
+from utils.payload import exibir_grafico, exibir_selecao, exibir_resumo_payload, fragmento, iniciar_payload
+from utils.recarga import acompanhar_versao_dataset
 
 st.set_page_config(
     page_title='Visão Geral',
     page_icon='📈',
     layout='wide'
 )
+iniciar_payload()
 
 st.title('Visão Geral dos Dados Musicais do Spotify')
 
+# Usa a versão do dataset da sessão e avisa quando houver uma nova
+acompanhar_versao_dataset()
+
+def exibir_resumo_estatistico(metricas):
+    """Métricas do Resumo Estatístico (artistas, álbuns, popularidade máxima e período)"""
+    col5, col6, col7, col8 = st.columns(4)
+    col5.metric("Artistas Únicos", f"{metricas['artistas_unicos']}")
+    col6.metric("Álbuns Únicos", f"{metricas['albuns_unicos']}")
+    col7.metric("Popularidade Máxima", f"{metricas['popularidade_max']}")
+    col8.metric("Período Analisado", f"{metricas['ano_min']}-{metricas['ano_max']}")
+
+# Enquanto o dataset completo carrega, mostra o resumo gravado na ingestão
+rapidas = estatisticas_rapidas()
+previa = st.empty()
+if rapidas is not None and not versao_carregada(versao_sessao()):
+    metricas_rapidas = rapidas['metricas']
+    if not filtros_ativos(filtros_salvos(metricas_rapidas['ano_min'], metricas_rapidas['ano_max'])):
+        with previa.container():
+            st.info('⏳ Carregando o dataset completo. Enquanto isso, o resumo pré-calculado:')
+            exibir_resumo_estatistico(metricas_rapidas)
+
+            col_tipos, col_anos, col_top = st.columns(3)
+            with col_tipos:
+                df_tipos = tabela_grafico(rapidas, 'musicas_por_tipo_album', ['Tipo_Album', 'Quantidade'])
+                exibir_grafico(px.bar(df_tipos, x='Tipo_Album', y='Quantidade',
+                                      title='Músicas por Tipo de Álbum'), 'Prévia: tipos de álbum')
+            with col_anos:
+                df_lancamentos = tabela_grafico(rapidas, 'lancamentos_por_ano', ['Ano', 'Quantidade'])
+                exibir_grafico(px.line(df_lancamentos.astype({'Ano': int}), x='Ano', y='Quantidade',
+                                       title='Lançamentos por Ano'), 'Prévia: lançamentos por ano')
+            with col_top:
+                df_top = tabela_grafico(rapidas, 'top_artistas', ['Artista', 'Popularidade_Média'])
+                exibir_grafico(px.bar(df_top, y='Artista', x='Popularidade_Média', orientation='h',
+                                      title='Top 10 Artistas').update_layout(yaxis=dict(autorange='reversed')),
+                               'Prévia: top artistas')
+
 # Carrega os dados usando a função cacheada
-df = carregar_dados()
+with st.spinner('Carregando o dataset completo...'):
+    df = carregar_dados()
+previa.empty()
+
+# Aplica os filtros globais da barra lateral (tipo de álbum, explícito, gêneros e anos)
+df, filtros = filtrar_dados_da_pagina(df)
+
+# Modo aproximado: métricas e boxplots a partir de sketches mescláveis (HyperLogLog e KLL),
+# calculados uma vez por versão para cada célula dos filtros e mesclados conforme a seleção.
+# O filtro de gêneros não particiona as linhas, então desativa o modo aproximado
+filtro_generos = bool(filtros.get('filtro_generos'))
+modo_aproximado = st.sidebar.toggle(
+    '⚡ Modo aproximado (sketches)',
+    disabled=filtro_generos,
+    help=('Indisponível com o filtro de gêneros' if filtro_generos else
+          'Mescla sketches pré-calculados (contagens distintas e quartis, com erro limitado) '
+          'em vez de varrer os dados')
+) and not filtro_generos
+
+# Os índices pré-calculados recebem o dataset sem as colunas de apoio, como na
+# recarga (utils/recarga.py), para reaproveitar o que ela já aqueceu
+df_indices = df
+
+# Criar categorias agrupando por duração e por popularidade do artista
+# (convertidas para string para evitar problemas de serialização)
+df = df.assign(
+    duration_category_str=derivado('faixas_duracao', df),
+    artist_popularity_cat_str=derivado('faixas_popularidade_artista', df),
+)
+
+if modo_aproximado:
+    resumo = mesclar_celulas(sketches_da_versao(versao_sessao()), filtros)
+
+
+def box_aproximado(coluna, ordem, **kwargs):
+    """Boxplot desenhado só com os quartis estimados pelos sketches de cada categoria"""
+    sketches = resumo['quantis'][coluna]
+    fig = go.Figure()
+    for categoria in [c for c in ordem if c in sketches]:
+        fig.add_trace(go.Box(x=[categoria], name=categoria,
+                             **{k: [v] for k, v in estatisticas_box(sketches[categoria]).items()}, **kwargs))
+    return fig
 
 # =============================================
 # GRÁFICO 1: BOXPLOT - POPULARIDADE POR DURAÇÃO
@@ -21,24 +107,20 @@ df = carregar_dados()
 
 st.subheader('📊 Distribuição da Popularidade por Duração da Música')
 
-# Criar categorias agrupando por duração para melhor visualização
-df['duration_category'] = pd.cut(df['track_duration_min'], 
-                               bins=[0, 2, 4, 6, 10, 20], 
-                               labels=['0-2min', '2-4min', '4-6min', '6-10min', '10+min'])
-
-# Converter para string para evitar problemas de serialização
-df['duration_category_str'] = df['duration_category'].astype(str)
-
 #CRIANDO GRAFICO BOXPLOT
-fig = px.box(df,
-    x='duration_category_str',
-    y='track_popularity',
-    points='all',
-    title='Distribuição da Popularidade por Duração da Música',
-    labels={'track_popularity':'Popularidade', 'duration_category_str':'Duração (minutos)'},
-    color='duration_category_str',
-    color_discrete_sequence=px.colors.qualitative.Set3
-)
+if modo_aproximado:
+    fig = box_aproximado('duration_category_str', ROTULOS_DURACAO)
+    fig.update_layout(title='Distribuição da Popularidade por Duração da Música (aproximada)')
+else:
+    fig = px.box(df,
+        x='duration_category_str',
+        y='track_popularity',
+        points='all',
+        title='Distribuição da Popularidade por Duração da Música',
+        labels={'track_popularity':'Popularidade', 'duration_category_str':'Duração (minutos)'},
+        color='duration_category_str',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
 
 fig.update_layout(
     xaxis_title_text='Duração da Música',
@@ -46,7 +128,7 @@ fig.update_layout(
     title_x=0.5,
     margin=dict(t=80)
 )
-st.plotly_chart(fig, use_container_width=True)
+exibir_grafico(fig, 'Popularidade por duração')
 
 st.markdown("""
 - **Popularidade:** Escala de 0-100, onde 100 é mais popular
@@ -56,48 +138,7 @@ st.markdown("""
 # INTERPRETAÇÃO AUTOMÁTICA DO GRÁFICO
 # =============================================
 
-# 1. Encontrar qual categoria tem MAIS músicas
-categoria_mais_comum = (
-    df['duration_category_str']
-    .value_counts()
-    .idxmax()
-)
-
-# 2. Encontrar qual categoria tem MAIOR POPULARIDADE MÉDIA
-categoria_mais_popular = (
-    df.groupby('duration_category_str')['track_popularity']
-    .mean()
-    .idxmax()
-)
-
-# 3. Mediana por categoria para interpretar distribuição
-medianas = df.groupby('duration_category_str')['track_popularity'].median()
-
-# 4. Determinar categoria com MENOR popularidade mediana
-categoria_menos_popular = medianas.idxmin()
-
-# 5. Número de outliers (pontos fora do padrão) por categoria
-outliers_info = {}
-for cat in df['duration_category_str'].unique():
-    grupo = df[df['duration_category_str'] == cat]['track_popularity']
-    q1, q3 = grupo.quantile([0.25, 0.75])
-    iqr = q3 - q1
-    limite_superior = q3 + 1.5 * iqr
-    outliers = grupo[grupo > limite_superior]
-    outliers_info[cat] = len(outliers)
-
-categoria_mais_outliers = max(outliers_info, key=outliers_info.get)
-
-
-st.markdown(f"""
-### 🧠 Interpretação Automática do Gráfico
-
-- A maior densidade de músicas está na categoria **{categoria_mais_comum}**, indicando ser a duração mais comum do dataset.
-- As músicas **mais populares**, em média, pertencem à categoria **{categoria_mais_popular}**.
-- A categoria menos popular, analisando a mediana, é **{categoria_menos_popular}**.
-- A categoria que apresenta **mais outliers de popularidade** (músicas muito mais populares que o restante do grupo) é **{categoria_mais_outliers}**.
-- Isso sugere que músicas de duração **moderada** tendem a ter desempenho mais consistente, enquanto músicas muito curtas ou muito longas apresentam grande variabilidade.
-""")
+st.markdown(interpretar_duracao(df))
 
 
 st.markdown("---")
@@ -108,22 +149,19 @@ st.markdown("---")
 
 st.subheader('📊 Popularidade do Artista vs Popularidade da Música')
 
-# Criar categorias para popularidade do artista
-df['artist_popularity_cat'] = pd.cut(df['artist_popularity'], 
-                                   bins=5, 
-                                   labels=['Muito Baixa', 'Baixa', 'Média', 'Alta', 'Muito Alta'])
-
-# Converter para string
-df['artist_popularity_cat_str'] = df['artist_popularity_cat'].astype(str)
-
-fig = px.box(df,
-    x='artist_popularity_cat_str',
-    y='track_popularity',
-    points='all',
-    title='Relação entre Popularidade do Artista e Popularidade da Música',
-    labels={'track_popularity':'Popularidade da Música', 'artist_popularity_cat_str':'Popularidade do Artista'},
-    color_discrete_sequence=['lightblue']
-)
+if modo_aproximado:
+    fig = box_aproximado('artist_popularity_cat_str', ROTULOS_POPULARIDADE, marker_color='lightblue')
+    fig.update_layout(title='Relação entre Popularidade do Artista e Popularidade da Música (aproximada)',
+                      showlegend=False)
+else:
+    fig = px.box(df,
+        x='artist_popularity_cat_str',
+        y='track_popularity',
+        points='all',
+        title='Relação entre Popularidade do Artista e Popularidade da Música',
+        labels={'track_popularity':'Popularidade da Música', 'artist_popularity_cat_str':'Popularidade do Artista'},
+        color_discrete_sequence=['lightblue']
+    )
 
 fig.update_layout(
     xaxis_title_text='Popularidade do Artista',
@@ -132,7 +170,7 @@ fig.update_layout(
     margin=dict(t=80),
     xaxis_tickangle=-45
 )
-st.plotly_chart(fig, use_container_width=True)
+exibir_grafico(fig, 'Popularidade por nível do artista')
 
 st.markdown("""
 **📝 Interpretação:** Analisa se artistas mais populares tendem a ter músicas mais populares.
@@ -166,7 +204,7 @@ fig_barras.update_layout(
     title_x=0.5,
     margin=dict(t=80)
 )
-st.plotly_chart(fig_barras, use_container_width=True)
+exibir_grafico(fig_barras, 'Músicas por tipo de álbum')
 
 st.markdown("""
 **📝 Interpretação:** Analisa que músicas de albuns possuem maior populares.
@@ -180,8 +218,12 @@ st.markdown("---")
 
 st.subheader('👑 Top Artistas Mais Populares')
 
+# Rankings pré-calculados (global, por gênero, ano e segmento)
+indices_top_k = construir_indices_top_k(df_indices)
+
 # Top 10 artistas por popularidade média
-df_artistas = df.groupby('artist_name')['artist_popularity'].mean().nlargest(10).reset_index()
+df_artistas = consultar_top_k(indices_top_k, 'artistas', 'popularidade', n=10)
+df_artistas = df_artistas[['artist_name', 'artist_popularity']]
 df_artistas.columns = ['Artista', 'Popularidade_Média']
 
 fig_barras_h = px.bar(
@@ -201,13 +243,69 @@ fig_barras_h.update_layout(
     title_x=0.5,
     margin=dict(t=80)
 )
-st.plotly_chart(fig_barras_h, use_container_width=True)
+exibir_grafico(fig_barras_h, 'Top 10 artistas')
 
 st.markdown("""
 **📝 Interpretação:** Analisa que a artista mais popular é a Taylor Swift.
 """)
 st.markdown("---")
 
+# =============================================
+# RANKINGS POR ANO E SEGMENTO
+# =============================================
+
+st.subheader('🏅 Rankings por Ano e Segmento')
+
+@fragmento('Visão Geral', 'visao_geral_ranking')
+def secao_rankings(indices_top_k):
+    """Ranking por escopo: trocar escopo, valor ou métrica reexecuta só esta seção"""
+    escopos_ranking = {'Ano de Lançamento': 'ano', 'Segmento Estratégico': 'segmento'}
+    metricas_ranking = {
+        'Popularidade': 'popularidade',
+        'Seguidores': 'seguidores',
+        'Quantidade de Músicas': 'musicas',
+    }
+
+    col_escopo, col_valor, col_metrica = st.columns(3)
+
+    with col_escopo:
+        escopo_escolhido = escopos_ranking[st.radio('Escopo:', list(escopos_ranking), horizontal=True)]
+
+    with col_valor:
+        valores = valores_escopo(indices_top_k, escopo_escolhido)
+        valor_escolhido = exibir_selecao(st.selectbox, 'Valor:', valores[::-1] if escopo_escolhido == 'ano' else valores)
+
+    with col_metrica:
+        nome_metrica = st.radio('Ordenar por:', list(metricas_ranking), horizontal=True)
+
+    df_ranking = consultar_top_k(
+        indices_top_k, 'artistas', metricas_ranking[nome_metrica],
+        escopo=escopo_escolhido, valor=valor_escolhido, n=10
+    )
+    coluna_ranking = {
+        'popularidade': 'artist_popularity',
+        'seguidores': 'artist_followers',
+        'musicas': 'qtd_musicas',
+    }[metricas_ranking[nome_metrica]]
+
+    fig_ranking = px.bar(
+        df_ranking,
+        y='artist_name',
+        x=coluna_ranking,
+        orientation='h',
+        title=f'Top 10 Artistas — {valor_escolhido} ({nome_metrica})',
+        labels={'artist_name': 'Artista', coluna_ranking: nome_metrica},
+        color=coluna_ranking,
+        color_continuous_scale='viridis'
+    )
+    fig_ranking.update_layout(yaxis=dict(autorange='reversed'), title_x=0.5, margin=dict(t=80))
+    exibir_grafico(fig_ranking, 'Ranking por escopo')
+
+
+secao_rankings(indices_top_k)
+
+st.markdown("---")
+
 
 # =============================================
 # GRÁFICO 6: EVOLUÇÃO TEMPORAL (LANÇAMENTOS)
@@ -215,11 +313,8 @@ st.markdown("---")
 
 st.subheader('📅 Distribuição de Lançamentos por Ano')
 
-# Extrair ano da data de lançamento
-df['release_year'] = df['album_release_date'].dt.year
-
-# Contar lançamentos por ano
-df_anos = df['release_year'].value_counts().sort_index().reset_index()
+# Contar lançamentos por ano a partir do cubo pré-agregado
+df_anos = derivado('agregados_anuais', df)[['release_year', 'musicas']]
 df_anos.columns = ['Ano', 'Quantidade']
 
 fig_temporal = px.line(
@@ -236,40 +331,12 @@ fig_temporal.update_layout(
     title_x=0.5,
     margin=dict(t=80)
 )
-st.plotly_chart(fig_temporal, use_container_width=True)
+exibir_grafico(fig_temporal, 'Lançamentos por ano')
 # =============================================
 # INTERPRETAÇÃO AUTOMÁTICA DO GRÁFICO TEMPORAL
 # =============================================
 
-# Encontrar ano com mais lançamentos
-ano_max = df_anos.loc[df_anos['Quantidade'].idxmax(), 'Ano']
-qtd_max = df_anos['Quantidade'].max()
-
-# Encontrar ano com menos lançamentos
-ano_min = df_anos.loc[df_anos['Quantidade'].idxmin(), 'Ano']
-qtd_min = df_anos['Quantidade'].min()
-
-# Tendência geral ao longo dos anos (aumento, queda ou estabilidade)
-import numpy as np
-coef = np.polyfit(df_anos['Ano'], df_anos['Quantidade'], 1)[0]
-
-if coef > 0:
-    tendencia = "uma **tendência geral de aumento** no número de lançamentos ao longo dos anos"
-elif coef < 0:
-    tendencia = "uma **tendência geral de queda** no número de lançamentos ao longo dos anos"
-else:
-    tendencia = "um **comportamento estável**, sem tendência clara de crescimento ou queda"
-
-# Montar texto final
-interpretacao_temporal = f"""
-### 🧠 Interpretação Automática do Gráfico — Lançamentos ao Longo do Tempo
-
-- O ano com **maior número de lançamentos** foi **{ano_max}**, com aproximadamente **{qtd_max} músicas**.
-- O ano com **menor número de lançamentos** foi **{ano_min}**, com cerca de **{qtd_min} músicas**.
-- A análise da linha temporal indica **{tendencia}**.
-"""
-
-st.markdown(interpretacao_temporal)
+st.markdown(interpretar_lancamentos(df_anos))
 
 st.markdown("---")
 
@@ -281,22 +348,27 @@ st.subheader('📋 Resumo Estatístico')
 
 
 # Métricas adicionais
-col5, col6, col7, col8 = st.columns(4)
-
-with col5:
-    artistas_unicos = df['artist_name'].nunique()
-    st.metric("Artistas Únicos", f"{artistas_unicos}")
-    
-with col6:
-    albuns_unicos = df['album_name'].nunique()
-    st.metric("Álbuns Únicos", f"{albuns_unicos}")
-    
-with col7:
-    max_popularity = df['track_popularity'].max()
-    st.metric("Popularidade Máxima", f"{max_popularity}")
-    
-with col8:
-    min_year = df['release_year'].min()
-    max_year = df['release_year'].max()
-    st.metric("Período Analisado", f"{min_year}-{max_year}")
+if modo_aproximado:
+    col5, col6, col7, col8 = st.columns(4)
+    erro = resumo['artistas'].erro_relativo * 100
+
+    with col5:
+        st.metric("Artistas Únicos (≈)", f"{resumo['artistas'].estimativa():,.0f}", help=f"Erro típico de ±{erro:.1f}%")
+
+    with col6:
+        st.metric("Álbuns Únicos (≈)", f"{resumo['albuns'].estimativa():,.0f}", help=f"Erro típico de ±{erro:.1f}%")
 
+    with col7:
+        st.metric("Popularidade Máxima", f"{resumo['popularidade_max']}")
+
+    with col8:
+        st.metric("Período Analisado", f"{resumo['ano_min']}-{resumo['ano_max']}")
+else:
+    # Sem filtros, as métricas do dataset inteiro já estão no sidecar
+    if rapidas is not None and not filtros_ativos(filtros):
+        exibir_resumo_estatistico(rapidas['metricas'])
+    else:
+        exibir_resumo_estatistico(calcular_metricas(df))
+
+# Volume enviado ao navegador nesta execução
+exibir_resumo_payload('Visão Geral')
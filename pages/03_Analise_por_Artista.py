@@ -1,39 +1,15 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import re
 from utils.carrega_dados import carregar_dados
-
-# =====================================================
-# FUNÇÃO PARA PADRONIZAR NOMES DE ARTISTAS
-# =====================================================
-def limpar_artista(nome):
-    if not isinstance(nome, str):
-        return None
-
-    nome = nome.strip()
-
-    # Remove símbolos no início e no fim, mas preserva símbolos internos
-    nome = re.sub(r'^[^a-zA-Z0-9]+', '', nome)
-    nome = re.sub(r'[^a-zA-Z0-9]+$', '', nome)
-
-    if nome.strip() == "":
-        return None
-
-    # Mantém siglas como NSYNC em caixa alta
-    if nome.isupper():
-        return nome
-
-    return nome.title()
-
-
-# Função para gerar a lista de artistas já limpa
-def obter_artistas(df):
-    artistas = df["artist_name"].apply(limpar_artista)
-    artistas = artistas.dropna().unique().tolist()
-    artistas.sort()
-    return artistas
-
+from utils.dag import derivado
+from utils.busca import construir_indice_busca, buscar, RESULTADOS_POR_PAGINA
+from utils.similares import construir_indice_similares, buscar_similares
+from utils.interpretacao import interpretar_artista
+from utils.filtros import filtrar_dados_da_pagina
+from utils.payload import (exibir_grafico, exibir_selecao, exibir_tabela, exibir_resumo_payload, fragmento,
+                           iniciar_payload)
+from utils.recarga import acompanhar_versao_dataset
 
 # =====================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -43,14 +19,25 @@ st.set_page_config(
     page_icon='🎵',
     layout='wide'
 )
+iniciar_payload()
+
+# Usa a versão do dataset da sessão e avisa quando houver uma nova
+acompanhar_versao_dataset()
 
 # =====================================================
 # CARREGAR DADOS
 # =====================================================
 df = carregar_dados()
 
+# Aplica os filtros globais da barra lateral (tipo de álbum, explícito, gêneros e anos)
+df, filtros = filtrar_dados_da_pagina(df)
+
+# Os índices de busca e de similares recebem o dataset sem a coluna de apoio,
+# como na recarga (utils/recarga.py), para reaproveitar o que ela já aqueceu
+df_indices = df
+
 # Criar coluna limpa
-df["artist_clean"] = df["artist_name"].apply(limpar_artista)
+df = df.assign(artist_clean=derivado('artistas_limpos', df))
 
 st.title("🎤 Análise por Artista")
 
@@ -68,11 +55,36 @@ Nesta página, você pode selecionar um artista e visualizar análises **especí
 
 st.header("🔍 Selecione o Artista")
 
-lista_artistas = obter_artistas(df)   # Agora tratada corretamente
+# Índice de busca: envia ao navegador só uma página de resultados por vez
+indice_busca = construir_indice_busca(df_indices)
+
+col_busca, col_pagina = st.columns([3, 1])
+
+with col_busca:
+    consulta = st.text_input(
+        "Buscar artista:",
+        placeholder="Digite parte do nome (ex.: tay, weeknd)..."
+    )
 
-artista_selecionado = st.selectbox(
+resultados, total_resultados = buscar(indice_busca, consulta, 'artistas')
+total_paginas = max(1, -(-total_resultados // RESULTADOS_POR_PAGINA))
+
+with col_pagina:
+    pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, value=1, step=1)
+
+if pagina > 1:
+    resultados, _ = buscar(indice_busca, consulta, 'artistas', pagina=pagina - 1)
+
+if resultados.empty:
+    st.warning("Nenhum artista encontrado para esta busca.")
+    st.stop()
+
+st.caption(f"{total_resultados:,} artistas encontrados, ordenados por relevância e popularidade.")
+
+artista_selecionado = exibir_selecao(
+    st.selectbox,
     "Escolha um artista para analisar:",
-    lista_artistas,
+    resultados["nome"].tolist(),
     index=0,
     placeholder="Selecione..."
 )
@@ -120,7 +132,7 @@ fig_pop = px.bar(
 )
 
 fig_pop.update_layout(xaxis_tickangle=-45)
-st.plotly_chart(fig_pop, use_container_width=True)
+exibir_grafico(fig_pop, 'Popularidade das músicas')
 
 # =====================================================
 # GRÁFICO 2 — Evolução Temporal
@@ -128,8 +140,6 @@ st.plotly_chart(fig_pop, use_container_width=True)
 
 st.subheader("📅 Evolução dos Lançamentos ao Longo dos Anos")
 
-df_artista["release_year"] = df_artista["album_release_date"].dt.year
-
 df_ano = df_artista["release_year"].value_counts().sort_index().reset_index()
 df_ano.columns = ["Ano", "Quantidade"]
 
@@ -142,7 +152,7 @@ fig_ano = px.line(
     labels={"Quantidade": "Número de Músicas", "Ano": "Ano"},
 )
 
-st.plotly_chart(fig_ano, use_container_width=True)
+exibir_grafico(fig_ano, 'Lançamentos do artista')
 
 # =====================================================
 # GRÁFICO 3 — Popularidade por Álbum
@@ -161,7 +171,7 @@ fig_album = px.bar(
 )
 
 fig_album.update_layout(xaxis_tickangle=-45)
-st.plotly_chart(fig_album, use_container_width=True)
+exibir_grafico(fig_album, 'Popularidade dos álbuns')
 
 # =====================================================
 # GRÁFICO 4 — Distribuição da Duração
@@ -177,7 +187,7 @@ fig_dur = px.histogram(
     labels={"track_duration_min": "Duração (min)"},
 )
 
-st.plotly_chart(fig_dur, use_container_width=True)
+exibir_grafico(fig_dur, 'Duração das músicas')
 
 # =====================================================
 # INTERPRETAÇÃO AUTOMÁTICA
@@ -185,19 +195,33 @@ st.plotly_chart(fig_dur, use_container_width=True)
 
 st.header("🧠 Interpretação Automática do Artista")
 
-musica_top = df_artista.sort_values(by="track_popularity", ascending=False).iloc[0]
-nome_top = musica_top["track_name"]
-pop_top = musica_top["track_popularity"]
+st.markdown(interpretar_artista(artista_selecionado, df_artista, df_album, df_ano))
 
-album_top = df_album.sort_values("track_popularity", ascending=False).iloc[0]
-nome_album_top = album_top["album_name"]
-pop_album_top = album_top["track_popularity"]
+# =====================================================
+# ARTISTAS SEMELHANTES
+# =====================================================
 
-st.markdown(f"""
-### 📌 Principais insights sobre **{artista_selecionado}**
+st.header("🧬 Artistas Semelhantes")
 
-- 🎵 **Música mais popular:** *{nome_top}* (popularidade {pop_top})
-- 💿 **Álbum mais forte:** *{nome_album_top}* (popularidade média {pop_album_top:.1f})
-- 📅 Lançamentos variam de **{df_ano['Ano'].min()}** a **{df_ano['Ano'].max()}**
-- 📈 A carreira apresenta **{ "crescimento" if df_ano['Quantidade'].iloc[-1] > df_ano['Quantidade'].iloc[0] else "queda" }** no volume de lançamentos ao longo dos anos
+st.markdown("""
+Artistas com perfil parecido, considerando **gêneros em comum**, popularidade,
+seguidores e duração típica das músicas (similaridade de cosseno).
 """)
+
+@fragmento('Análise por Artista', 'artista_similares')
+def secao_similares(df, artista_selecionado):
+    """Mudar a quantidade de artistas reexecuta só esta seção"""
+    qtd_similares = st.slider("Quantidade de artistas:", 5, 30, 10)
+
+    df_similares = buscar_similares(construir_indice_similares(df), artista_selecionado, k=qtd_similares)
+
+    if df_similares.empty:
+        st.info("Não há dados suficientes para encontrar artistas semelhantes.")
+    else:
+        exibir_tabela(df_similares, 'Artistas semelhantes', hide_index=True)
+
+
+secao_similares(df_indices, artista_selecionado)
+
+# Volume enviado ao navegador nesta execução
+exibir_resumo_payload('Análise por Artista')
@@ -3,7 +3,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from utils.amostras import MINIMO_POR_ESTRATO, controles_modo_aproximado
 from utils.carrega_dados import carregar_dados
+from utils.correlacao import VARIAVEIS_CORRELACAO, correlacoes_bootstrap
+from utils.interpretacao import interpretar_correlacoes
+from utils.filtros import filtrar_dados_da_pagina
+from utils.payload import exibir_grafico, exibir_resumo_payload, fragmento, iniciar_payload
+from utils.recarga import acompanhar_versao_dataset
 
 # =============================================
 # CONFIGURAÇÃO
@@ -14,6 +20,7 @@ st.set_page_config(
     page_icon='📈',
     layout='wide'
 )
+iniciar_payload()
 
 st.title('📈 Análise de Popularidade Musical')
 
@@ -22,8 +29,22 @@ st.title('📈 Análise de Popularidade Musical')
 # CARREGAR DADOS
 # =============================================
 
+# Usa a versão do dataset da sessão e avisa quando houver uma nova
+acompanhar_versao_dataset()
+
 df = carregar_dados()
 
+# Aplica os filtros globais da barra lateral (tipo de álbum, explícito, gêneros e anos)
+df, filtros = filtrar_dados_da_pagina(df)
+
+# Modo aproximado: correlações e gráficos sobre uma amostra estratificada
+amostra = controles_modo_aproximado(df, 'popularidade')
+if amostra is not None:
+    df = amostra['dados']
+    st.caption(f"Correlações e gráficos usam as músicas sorteadas sem pesos: estratos pequenos entram com "
+               f"pelo menos {MINIMO_POR_ESTRATO} músicas e ficam sobrerrepresentados, principalmente nas "
+               f"amostras menores.")
+
 
 # =============================================
 # ANÁLISE DE CORRELAÇÃO
@@ -31,62 +52,53 @@ df = carregar_dados()
 
 st.header('🔗 Correlação entre Variáveis')
 
-variaveis_numericas = [
-    'track_popularity',
-    'artist_popularity',
-    'track_duration_min',
-    'artist_followers'
-]
-
-df_corr = df[variaveis_numericas].corr()
-
-mapeamento_nomes = {
-    'track_popularity': 'Popularidade da Música',
-    'artist_popularity': 'Popularidade do Artista',
-    'track_duration_min': 'Duração da Música (min)',
-    'artist_followers': 'Seguidores do Artista'
-}
-
-df_corr_pt = df_corr.rename(index=mapeamento_nomes, columns=mapeamento_nomes)
-
-# Heatmap
-fig_corr = px.imshow(
-    df_corr_pt,
-    text_auto=True,
-    aspect='auto',
-    color_continuous_scale='RdBu_r',
-    title='Matriz de Correlação entre Variáveis Musicais'
-)
-st.plotly_chart(fig_corr, use_container_width=True)
+variaveis_numericas = VARIAVEIS_CORRELACAO
 
+@fragmento('Popularidade', 'popularidade_correlacao')
+def secao_correlacao(df, variaveis_numericas):
+    """Trocar o método de correlação reexecuta só esta seção"""
+    # Spearman (por postos) é mais robusto para variáveis de cauda longa como seguidores
+    metodo = st.radio(
+        'Método de correlação:',
+        ['spearman', 'pearson'],
+        format_func={'spearman': 'Spearman (postos)', 'pearson': 'Pearson (linear)'}.get,
+        horizontal=True
+    )
 
-# =============================================
-# INTERPRETAÇÃO AUTOMÁTICA DA CORRELAÇÃO
-# =============================================
-
-st.subheader("🧠 Interpretação Automática da Correlação")
+    # Matrizes e intervalos de confiança por bootstrap, calculados uma vez por versão e filtro
+    correlacoes = correlacoes_bootstrap(df, variaveis_numericas)
+    df_corr = correlacoes['matrizes'][metodo]
 
-df_long = df_corr_pt.stack().reset_index()
-df_long.columns = ["Variável 1", "Variável 2", "Correlação"]
-df_long = df_long[df_long["Variável 1"] < df_long["Variável 2"]]
+    mapeamento_nomes = {
+        'track_popularity': 'Popularidade da Música',
+        'artist_popularity': 'Popularidade do Artista',
+        'track_duration_min': 'Duração da Música (min)',
+        'artist_followers': 'Seguidores do Artista'
+    }
 
-analises = []
+    df_corr_pt = df_corr.rename(index=mapeamento_nomes, columns=mapeamento_nomes)
+    df_inferior_pt = correlacoes['inferior'][metodo].rename(index=mapeamento_nomes, columns=mapeamento_nomes)
+    df_superior_pt = correlacoes['superior'][metodo].rename(index=mapeamento_nomes, columns=mapeamento_nomes)
 
-for _, row in df_long.iterrows():
-    v1, v2, corr = row["Variável 1"], row["Variável 2"], row["Correlação"]
+    # Heatmap
+    fig_corr = px.imshow(
+        df_corr_pt,
+        text_auto='.2f',
+        aspect='auto',
+        color_continuous_scale='RdBu_r',
+        title='Matriz de Correlação entre Variáveis Musicais'
+    )
+    exibir_grafico(fig_corr, 'Matriz de correlação')
 
-    if abs(corr) >= 0.7:
-        intensidade = "forte"
-    elif abs(corr) >= 0.4:
-        intensidade = "moderada"
-    else:
-        intensidade = "fraca"
+    # Interpretação automática da correlação
+    st.subheader("🧠 Interpretação Automática da Correlação")
 
-    tipo = "positiva" if corr > 0 else "negativa"
+    st.markdown(interpretar_correlacoes(df_corr_pt, df_inferior_pt, df_superior_pt))
+    st.caption(f"Intervalos de confiança de 95% por bootstrap percentil "
+               f"({correlacoes['n_bootstrap']} reamostragens de {correlacoes['amostras']:,} músicas).")
 
-    analises.append(f"- **{v1} × {v2}** → correlação **{tipo} {intensidade}** ({corr:.2f})")
 
-st.markdown("\n".join(analises))
+secao_correlacao(df, variaveis_numericas)
 
 
 # =============================================
@@ -120,7 +132,7 @@ fig1 = px.scatter(
 y_pred, coef = linha_tendencia(df["artist_popularity"], df["track_popularity"])
 fig1.add_trace(go.Scatter(x=df["artist_popularity"], y=y_pred, mode="lines", name="Tendência"))
 
-st.plotly_chart(fig1, use_container_width=True)
+exibir_grafico(fig1, 'Música × artista')
 
 st.markdown(f"""
 📌 **Análise Automática:**  
@@ -146,7 +158,7 @@ fig2 = px.scatter(
 y_pred, coef = linha_tendencia(df["artist_followers"], df["track_popularity"])
 fig2.add_trace(go.Scatter(x=df["artist_followers"], y=y_pred, mode="lines", name="Tendência"))
 
-st.plotly_chart(fig2, use_container_width=True)
+exibir_grafico(fig2, 'Música × seguidores')
 
 st.markdown(f"""
 📌 **Análise Automática:**  
@@ -172,7 +184,7 @@ fig3 = px.scatter(
 y_pred, coef = linha_tendencia(df["track_duration_min"], df["track_popularity"])
 fig3.add_trace(go.Scatter(x=df["track_duration_min"], y=y_pred, mode="lines", name="Tendência"))
 
-st.plotly_chart(fig3, use_container_width=True)
+exibir_grafico(fig3, 'Música × duração')
 
 st.markdown(f"""
 📌 **Análise Automática:**  
@@ -180,3 +192,5 @@ A duração da música tem impacto **{ 'positivo' if coef[0] > 0 else 'negativo'
 Inclinação: **{coef[0]:.4f}**.
 """)
 
+# Volume enviado ao navegador nesta execução
+exibir_resumo_payload('Popularidade')
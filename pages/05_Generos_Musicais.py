@@ -1,26 +1,40 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-from utils.carrega_dados import carregar_dados
+from utils.cache import cache_limitado
+from utils.carrega_dados import carregar_dados, filtrar_por_genero
+from utils.dag import derivado
+from utils.top_k import construir_indices_top_k, consultar_top_k
+from utils.filtros import filtrar_dados_da_pagina
+from utils.payload import (exibir_grafico, exibir_selecao, exibir_tabela, exibir_resumo_payload, fragmento,
+                           iniciar_payload)
+from utils.recarga import acompanhar_versao_dataset
 
 st.set_page_config(
     page_title='Gêneros Musicais',
     page_icon='🎼',
     layout='wide'
 )
+iniciar_payload()
 
 st.title('🎼 Análise de Gêneros Musicais')
 
+# Usa a versão do dataset da sessão e avisa quando houver uma nova
+acompanhar_versao_dataset()
+
 # Carrega os dados
 df = carregar_dados()
 
+# Aplica os filtros globais da barra lateral (tipo de álbum, explícito, gêneros e anos)
+df, filtros = filtrar_dados_da_pagina(df)
+
 # =============================================
 # PROCESSAMENTO DOS GÊNEROS
 # =============================================
 
 st.sidebar.header('🎛️ Filtros de Gênero')
 
-@st.cache_data
+@cache_limitado
 def processar_generos(df):
     """Processa e extrai todos os gêneros musicais do dataset"""
     todos_generos = []
@@ -34,11 +48,64 @@ def processar_generos(df):
     # Remove duplicatas e retorna lista ordenada
     return sorted(list(set(todos_generos)))
 
+@fragmento('Gêneros Musicais', 'generos_comparacao')
+def secao_comparacao(df, lista_generos, generos_padrao):
+    """Comparação entre gêneros: mudar a seleção reexecuta só esta seção"""
+    # Selecionar alguns gêneros para comparação
+    generos_comparacao = exibir_selecao(
+        st.multiselect,
+        'Selecione gêneros para comparar:',
+        lista_generos,
+        default=generos_padrao
+    )
+
+    if generos_comparacao:
+        dados_comparacao = []
+
+        for genero in generos_comparacao:
+            df_gen = filtrar_por_genero(df, genero)
+            if not df_gen.empty:
+                dados_comparacao.append({
+                    'Genero': genero,
+                    'Popularidade_Media': df_gen['track_popularity'].mean(),
+                    'Duracao_Media': df_gen['track_duration_min'].mean(),
+                    'Quantidade_Musicas': len(df_gen),
+                    'Artistas_Unicos': df_gen['artist_name'].nunique()
+                })
+
+        if dados_comparacao:
+            df_comparacao = pd.DataFrame(dados_comparacao)
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                fig_comp_popularidade = px.bar(
+                    df_comparacao,
+                    x='Genero',
+                    y='Popularidade_Media',
+                    title='Comparação de Popularidade Média',
+                    color='Popularidade_Media',
+                    color_continuous_scale='reds'
+                )
+                exibir_grafico(fig_comp_popularidade, 'Comparação de popularidade')
+
+            with col2:
+                fig_comp_duracao = px.bar(
+                    df_comparacao,
+                    x='Genero',
+                    y='Duracao_Media',
+                    title='Comparação de Duração Média',
+                    color='Duracao_Media',
+                    color_continuous_scale='blues'
+                )
+                exibir_grafico(fig_comp_duracao, 'Comparação de duração')
+
 # Obter lista de gêneros
 lista_generos = processar_generos(df)
 
 # Filtro por gênero
-genero_selecionado = st.sidebar.selectbox(
+genero_selecionado = exibir_selecao(
+    st.sidebar.selectbox,
     'Selecione um Gênero para Análise:',
     ['Todos'] + lista_generos
 )
@@ -50,22 +117,7 @@ genero_selecionado = st.sidebar.selectbox(
 st.header('🌍 Panorama dos Gêneros Musicais')
 
 # Contar frequência de cada gênero
-@st.cache_data
-def contar_generos(df):
-    contagem_generos = {}
-    
-    for genero_str in df['artist_genres'].dropna():
-        if genero_str != 'N/A':
-            generos = [g.strip() for g in genero_str.split(',')]
-            for genero in generos:
-                contagem_generos[genero] = contagem_generos.get(genero, 0) + 1
-    
-    return pd.DataFrame({
-        'Genero': list(contagem_generos.keys()),
-        'Quantidade': list(contagem_generos.values())
-    }).sort_values('Quantidade', ascending=False)
-
-df_contagem_generos = contar_generos(df)
+df_contagem_generos = derivado('contagem_generos', df)
 
 col1, col2 = st.columns(2)
 
@@ -83,7 +135,7 @@ with col1:
     )
     
     fig_top_generos.update_layout(height=400)
-    st.plotly_chart(fig_top_generos, use_container_width=True)
+    exibir_grafico(fig_top_generos, 'Top 10 gêneros')
 
 with col2:
     st.subheader('📊 Distribuição dos Gêneros')
@@ -97,7 +149,7 @@ with col2:
     )
     
     fig_pizza_generos.update_layout(height=400)
-    st.plotly_chart(fig_pizza_generos, use_container_width=True)
+    exibir_grafico(fig_pizza_generos, 'Distribuição dos gêneros')
 
 st.markdown('---')
 
@@ -109,17 +161,6 @@ if genero_selecionado != 'Todos':
     st.header(f'🎵 Análise Detalhada: {genero_selecionado}')
     
     # Filtrar artistas do gênero selecionado
-    def filtrar_por_genero(df, genero_alvo):
-        artistas_do_genero = []
-        
-        for idx, row in df.iterrows():
-            if pd.notna(row['artist_genres']) and row['artist_genres'] != 'N/A':
-                generos_artista = [g.strip() for g in row['artist_genres'].split(',')]
-                if genero_alvo in generos_artista:
-                    artistas_do_genero.append(row['artist_name'])
-        
-        return df[df['artist_name'].isin(artistas_do_genero)]
-    
     df_genero = filtrar_por_genero(df, genero_selecionado)
     
     if not df_genero.empty:
@@ -148,16 +189,14 @@ if genero_selecionado != 'Todos':
         
         st.subheader(f'👑 Top Artistas do {genero_selecionado}')
         
-        # Agrupar por artista e calcular métricas
-        df_artistas_genero = df_genero.groupby('artist_name').agg({
-            'track_popularity': 'mean',
-            'artist_popularity': 'first',
-            'artist_followers': 'first',
-            'track_name': 'count'
-        }).round(2).reset_index()
+        # Ranking pré-calculado por gênero (popularidade média das músicas)
+        df_artistas_genero = consultar_top_k(
+            construir_indices_top_k(df), 'artistas', 'popularidade_musicas',
+            escopo='genero', valor=genero_selecionado
+        ).round(2)
         
+        df_artistas_genero = df_artistas_genero[['artist_name', 'popularidade_media_musicas', 'artist_popularity', 'artist_followers', 'qtd_musicas']]
         df_artistas_genero.columns = ['Artista', 'Popularidade_Média', 'Popularidade_Artista', 'Seguidores', 'Quantidade_Musicas']
-        df_artistas_genero = df_artistas_genero.sort_values('Popularidade_Média', ascending=False)
         
         fig_artistas_genero = px.bar(
             df_artistas_genero.head(10),
@@ -170,7 +209,7 @@ if genero_selecionado != 'Todos':
         )
         
         fig_artistas_genero.update_layout(height=400)
-        st.plotly_chart(fig_artistas_genero, use_container_width=True)
+        exibir_grafico(fig_artistas_genero, 'Top artistas do gênero')
         
         # =============================================
         # COMPARAÇÃO ENTRE GÊNEROS
@@ -178,53 +217,7 @@ if genero_selecionado != 'Todos':
         
         st.subheader('🆚 Comparação com Outros Gêneros')
         
-        # Selecionar alguns gêneros para comparação
-        generos_comparacao = st.multiselect(
-            'Selecione gêneros para comparar:',
-            lista_generos,
-            default=[genero_selecionado] + list(df_contagem_generos['Genero'].head(3))
-        )
-        
-        if generos_comparacao:
-            dados_comparacao = []
-            
-            for genero in generos_comparacao:
-                df_gen = filtrar_por_genero(df, genero)
-                if not df_gen.empty:
-                    dados_comparacao.append({
-                        'Genero': genero,
-                        'Popularidade_Media': df_gen['track_popularity'].mean(),
-                        'Duracao_Media': df_gen['track_duration_min'].mean(),
-                        'Quantidade_Musicas': len(df_gen),
-                        'Artistas_Unicos': df_gen['artist_name'].nunique()
-                    })
-            
-            if dados_comparacao:
-                df_comparacao = pd.DataFrame(dados_comparacao)
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    fig_comp_popularidade = px.bar(
-                        df_comparacao,
-                        x='Genero',
-                        y='Popularidade_Media',
-                        title='Comparação de Popularidade Média',
-                        color='Popularidade_Media',
-                        color_continuous_scale='reds'
-                    )
-                    st.plotly_chart(fig_comp_popularidade, use_container_width=True)
-                
-                with col2:
-                    fig_comp_duracao = px.bar(
-                        df_comparacao,
-                        x='Genero',
-                        y='Duracao_Media',
-                        title='Comparação de Duração Média',
-                        color='Duracao_Media',
-                        color_continuous_scale='blues'
-                    )
-                    st.plotly_chart(fig_comp_duracao, use_container_width=True)
+        secao_comparacao(df, lista_generos, [genero_selecionado] + list(df_contagem_generos['Genero'].head(3)))
     
     else:
         st.warning(f'Nenhum artista encontrado para o gênero "{genero_selecionado}"')
@@ -239,44 +232,21 @@ else:
 st.markdown('---')
 st.header('🗺️ Mapa de Relações entre Gêneros')
 
-# Análise de co-ocorrência de gêneros
-@st.cache_data
-def analisar_coocorrencia(df):
-    coocorrencias = {}
-    
-    for genero_str in df['artist_genres'].dropna():
-        if genero_str != 'N/A':
-            generos = [g.strip() for g in genero_str.split(',')]
-            
-            # Para cada par de gêneros no mesmo artista
-            for i in range(len(generos)):
-                for j in range(i + 1, len(generos)):
-                    par = tuple(sorted([generos[i], generos[j]]))
-                    coocorrencias[par] = coocorrencias.get(par, 0) + 1
-    
-    # Converter para DataFrame
-    pares_coocorrencia = []
-    for par, count in coocorrencias.items():
-        if count >= 5:  # Só mostrar pares com pelo menos 5 ocorrências
-            pares_coocorrencia.append({
-                'Genero1': par[0],
-                'Genero2': par[1],
-                'Coocorrencias': count
-            })
-    
-    return pd.DataFrame(pares_coocorrencia).sort_values('Coocorrencias', ascending=False)
-
-df_coocorrencia = analisar_coocorrencia(df)
+# Análise de co-ocorrência de gêneros (pares com pelo menos 5 ocorrências)
+df_coocorrencia = derivado('coocorrencia_generos', df)
 
 if not df_coocorrencia.empty:
     st.subheader('🔗 Gêneros que Frequentemente Aparecem Juntos')
     
     # Mostrar top pares
-    st.dataframe(df_coocorrencia.head(15), use_container_width=True)
+    exibir_tabela(df_coocorrencia.head(15), 'Coocorrência de gêneros')
     
     st.info("""
     **💡 Insight:** Estes são gêneros que frequentemente são associados aos mesmos artistas, 
     mostrando possíveis fusões ou influências mútuas entre estilos musicais.
     """)
 
-st.caption('🎼 Análise de Gêneros Musicais - Dashboard Spotify')
\ No newline at end of file
+st.caption('🎼 Análise de Gêneros Musicais - Dashboard Spotify')
+
+# Volume enviado ao navegador nesta execução
+exibir_resumo_payload('Gêneros Musicais')
@@ -6,18 +6,61 @@ import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
-from utils.carrega_dados import carregar_dados
+from utils.amostras import (controles_modo_aproximado, estimar_contagens, estimar_medias,
+                            estimar_proporcoes)
+from utils.carrega_dados import carregar_dados, classificar_segmento
+from utils.cubo import consultar_cubo
+from utils.dag import derivado
+from utils.modelo import (COLUNAS_CANDIDATOS, NOMES_ATRIBUTOS, pontuar_lote,
+                          treinar_modelo_popularidade)
+from utils.filtros import filtrar_dados_da_pagina, tabelas_filtradas
+from utils.payload import exibir_grafico, exibir_tabela, exibir_resumo_payload, fragmento, iniciar_payload
+from utils.recarga import acompanhar_versao_dataset
 
 st.set_page_config(
     page_title='Insights Avançados',
     page_icon='🔍',
     layout='wide'
 )
+iniciar_payload()
 
 st.title('🔍 Insights Avançados e Análises Estatísticas')
 
+# Usa a versão do dataset da sessão e avisa quando houver uma nova
+acompanhar_versao_dataset()
+
 # Isso evita recarregar os dados a cada interação, melhorando a experiência do usuário
-df = carregar_dados()
+df_completo = carregar_dados()
+
+# Aplica os filtros globais da barra lateral (tipo de álbum, explícito, gêneros e anos)
+df, filtros = filtrar_dados_da_pagina(df_completo)
+
+# Intervalo de anos das análises temporais e de segmento
+anos_validos = df['release_year'].dropna()
+if anos_validos.empty:
+    st.warning('Nenhuma música da seleção tem ano de lançamento válido para as análises por período.')
+    st.stop()
+
+ano_minimo, ano_maximo = int(anos_validos.min()), int(anos_validos.max())
+if ano_minimo < ano_maximo:
+    ano_inicio, ano_fim = st.sidebar.slider(
+        'Período analisado',
+        min_value=ano_minimo,
+        max_value=ano_maximo,
+        value=(min(max(2010, ano_minimo), ano_maximo), ano_maximo)
+    )
+else:
+    ano_inicio, ano_fim = ano_minimo, ano_maximo
+
+# Modo aproximado: tendências e segmentos estimados sobre uma amostra estratificada
+amostra = controles_modo_aproximado(df, 'insights')
+if amostra is None:
+    # O dataset da sessão já está em memória e filtrado: basta o recorte por ano
+    df_periodo = df[df['release_year'].between(ano_inicio, ano_fim).fillna(False)].copy()
+else:
+    dados_amostra = amostra['dados']
+    anos_amostra = dados_amostra['release_year'].astype('float64')
+    no_periodo = anos_amostra.between(ano_inicio, ano_fim)
 
 # =============================================
 # ANÁLISE DE TENDÊNCIAS TEMPORAIS AVANÇADA
@@ -26,20 +69,43 @@ df = carregar_dados()
 st.header('📈 Evolução Temporal das Características Musicais')
 
 # Mostra evolução real do mercado musical ao longo do tempo
-df['release_year'] = df['album_release_date'].dt.year
-df_temporal = df[df['release_year'] >= 2010]  # Focar em anos mais relevantes
-
-# Permite ver várias tendências simultaneamente
-df_ano = df_temporal.groupby('release_year').agg({
-    'track_popularity': 'mean',
-    'track_duration_min': 'mean', 
-    'artist_popularity': 'mean',
-    'track_name': 'count',
-    'explicit': lambda x: (x == 'Sim').mean() * 100  # % de conteúdo explícito
-}).reset_index()
+if amostra is None:
+    # Consulta o cubo pré-agregado, focando nos anos selecionados
+    df_ano = consultar_cubo(derivado('cubo', df), ['release_year'], {'release_year': (ano_inicio, ano_fim)})
+
+    # Permite ver várias tendências simultaneamente
+    df_ano = df_ano[['release_year', 'media_track_popularity', 'media_track_duration_min',
+                     'media_artist_popularity', 'musicas', 'percentual_explicito']]
+
+    df_ano.columns = ['Ano', 'Popularidade_Media', 'Duracao_Media', 'Popularidade_Artista_Media', 
+                      'Quantidade_Musicas', 'Percentual_Explicito']
+    margens = {}
+else:
+    # Estimativas por ano (fora do período, a linha não entra em nenhum grupo)
+    anos = anos_amostra.where(no_periodo)
+    popularidade = estimar_medias(amostra, 'track_popularity', anos)
+    duracao = estimar_medias(amostra, 'track_duration_min', anos).reindex(popularidade.index)
+    quantidade = estimar_contagens(amostra, anos).reindex(popularidade.index)
+
+    df_ano = pd.DataFrame({
+        'Ano': popularidade.index.astype(int),
+        'Popularidade_Media': popularidade['estimativa'].to_numpy(),
+        'Duracao_Media': duracao['estimativa'].to_numpy(),
+        'Quantidade_Musicas': quantidade['estimativa'].to_numpy(),
+    })
+    margens = {
+        'Popularidade_Media': popularidade['margem'].to_numpy(),
+        'Duracao_Media': duracao['margem'].to_numpy(),
+        'Quantidade_Musicas': quantidade['margem'].to_numpy(),
+    }
+
+
+def barras_erro(coluna):
+    """Intervalo de confiança da coluna no modo aproximado (nada no modo exato)"""
+    if coluna not in margens:
+        return None
+    return dict(type='data', array=margens[coluna], visible=True, thickness=1)
 
-df_ano.columns = ['Ano', 'Popularidade_Media', 'Duracao_Media', 'Popularidade_Artista_Media', 
-                  'Quantidade_Musicas', 'Percentual_Explicito']
 
 # de diferentes escalas (popularidade vs duração vs quantidade)
 fig_temporal = go.Figure()
@@ -49,7 +115,8 @@ fig_temporal.add_trace(go.Scatter(
     x=df_ano['Ano'], y=df_ano['Popularidade_Media'],
     name='🎵 Popularidade Média',
     line=dict(color='#1DB954', width=4),  # Verde do Spotify
-    mode='lines+markers'
+    mode='lines+markers',
+    error_y=barras_erro('Popularidade_Media')
 ))
 
 # Duração (eixo secundário)
@@ -57,6 +124,7 @@ fig_temporal.add_trace(go.Scatter(
     x=df_ano['Ano'], y=df_ano['Duracao_Media'],
     name='⏱️ Duração Média',
     line=dict(color='#FF6B6B', width=3),
+    error_y=barras_erro('Duracao_Media'),
     yaxis='y2'
 ))
 
@@ -65,11 +133,12 @@ fig_temporal.add_trace(go.Bar(
     x=df_ano['Ano'], y=df_ano['Quantidade_Musicas'],
     name='📊 Lançamentos',
     marker_color='rgba(100, 149, 237, 0.6)',
+    error_y=barras_erro('Quantidade_Musicas'),
     yaxis='y3'
 ))
 
 fig_temporal.update_layout(
-    title='Evolução do Mercado Musical (2010-2025)',
+    title=f'Evolução do Mercado Musical ({ano_inicio}-{ano_fim})',
     xaxis_title='Ano de Lançamento',
     yaxis=dict(title='Popularidade Média', side='left'),
     yaxis2=dict(title='Duração Média (minutos)', overlaying='y', side='right'),
@@ -78,7 +147,7 @@ fig_temporal.update_layout(
     showlegend=True
 )
 
-st.plotly_chart(fig_temporal, use_container_width=True)
+exibir_grafico(fig_temporal, 'Evolução temporal')
 
 
 st.markdown('---')
@@ -95,21 +164,12 @@ st.markdown("""
 Categoriza artistas em grupos estrategicamente relevantes.
 """)
 
-# Segmentação melhorada com critérios de negócio
-conditions = [
-    (df['artist_popularity'] >= 80) & (df['artist_followers'] >= 5000000),
-    (df['artist_popularity'] >= 65) & (df['artist_followers'] >= 1000000),
-    (df['artist_popularity'] >= 50) & (df['artist_followers'] >= 100000),
-    (df['artist_popularity'] >= 35) & (df['artist_followers'] >= 10000),
-    (df['artist_popularity'] < 35) | (df['artist_followers'] < 10000)
-]
+# Gráfico de segmentação interativo sobre a tabela de artistas (uma linha por artista)
+df_artistas = tabelas_filtradas(df, filtros)['artistas']
+df_artistas['segmento_estrategico'] = classificar_segmento(df_artistas)
 
-segments = ['🏆 Superstars', '⭐ Estrelas', '🚀 Emergentes', '🌱 Promessas', '🎨 Independentes']
-df['segmento_estrategico'] = np.select(conditions, segments, default='🎨 Independentes')
-
-# Gráfico de segmentação interativo
 fig_segmentos = px.scatter(
-    df.drop_duplicates('artist_name'),
+    df_artistas,
     x='artist_popularity',
     y='artist_followers',
     color='segmento_estrategico',
@@ -132,23 +192,51 @@ fig_segmentos.update_layout(
     yaxis_title="Seguidores (Escala Logarítmica)"
 )
 
-st.plotly_chart(fig_segmentos, use_container_width=True)
+exibir_grafico(fig_segmentos, 'Mapa de segmentos')
 
 # de forma mais clara que clusters abstratos
 st.subheader('📊 Análise de Oportunidades por Segmento')
+st.caption(f'Músicas lançadas entre {ano_inicio} e {ano_fim}')
+
+if amostra is None:
+    # Segmentação melhorada com critérios de negócio
+    df_periodo['segmento_estrategico'] = classificar_segmento(df_periodo)
+    # Indicador numérico: a média vetorizada do groupby dá o percentual
+    df_periodo['percentual_explicito'] = (df_periodo['explicit'] == 'Sim') * 100.0
+
+    segment_stats = df_periodo.groupby('segmento_estrategico').agg({
+        'track_popularity': ['mean', 'count'],
+        'track_duration_min': 'mean',
+        'artist_name': 'nunique',
+        'percentual_explicito': 'mean'
+    }).round(2)
+
+    # Reformatar o DataFrame para melhor visualização
+    segment_stats.columns = ['Popularidade_Média', 'Total_Músicas', 'Duração_Média', 'Artistas_Únicos', 'Percentual_Explicito']
+else:
+    # Artistas únicos não têm estimador pela amostra: a coluna fica só no modo exato
+    segmentos = classificar_segmento(dados_amostra).where(no_periodo)
+    popularidade = estimar_medias(amostra, 'track_popularity', segmentos)
+    quantidade = estimar_contagens(amostra, segmentos).reindex(popularidade.index)
+    duracao = estimar_medias(amostra, 'track_duration_min', segmentos).reindex(popularidade.index)
+    explicitas = estimar_proporcoes(amostra, dados_amostra['explicit'] == 'Sim', segmentos).reindex(popularidade.index)
+
+    segment_stats = pd.DataFrame({
+        'Popularidade_Média': popularidade['estimativa'],
+        '± Popularidade': popularidade['margem'],
+        'Total_Músicas': quantidade['estimativa'],
+        '± Total': quantidade['margem'],
+        'Duração_Média': duracao['estimativa'],
+        '± Duração': duracao['margem'],
+        'Percentual_Explicito': explicitas['estimativa'] * 100,
+        '± Explícito': explicitas['margem'] * 100,
+    }).round(2)
+    segment_stats.index.name = 'segmento_estrategico'
+    st.caption('Estimativas com margem de erro de 95% (±)')
 
-segment_stats = df.groupby('segmento_estrategico').agg({
-    'track_popularity': ['mean', 'count'],
-    'track_duration_min': 'mean',
-    'artist_name': 'nunique',
-    'explicit': lambda x: (x == 'Sim').mean() * 100
-}).round(2)
-
-# Reformatar o DataFrame para melhor visualização
-segment_stats.columns = ['Popularidade_Média', 'Total_Músicas', 'Duração_Média', 'Artistas_Únicos', 'Percentual_Explicito']
 segment_stats = segment_stats.sort_values('Popularidade_Média', ascending=False)
 
-st.dataframe(segment_stats, use_container_width=True)
+exibir_tabela(segment_stats, 'Estatísticas por segmento')
 
 st.markdown('---')
 
@@ -160,114 +248,166 @@ st.header('🔮 Simulador de Potencial de Popularidade')
 
 # JUSTIFICATIVA: Modelo preditivo simples é mais útil que clusterização
 # Dá ao usuário ferramentas práticas para tomada de decisão
-st.markdown("""
-**Como funciona:** Baseado nas correlações identificadas nos dados, estimamos o potencial 
-de popularidade de uma música considerando características do artista e da música.
+# Modelo linear ajustado uma vez por versão do dataset
+# (sempre sobre o dataset completo, independente dos filtros globais)
+modelo = treinar_modelo_popularidade(df_completo)
+
+st.markdown(f"""
+**Como funciona:** Um modelo de regressão linear ajustado sobre as {modelo['amostras']:,} músicas do dataset
+estima o potencial de popularidade de uma música considerando características do artista e da música
+(R² = {modelo['r2']:.2f}).
 """)
 
 # JUSTIFICATIVA: Simulador interativo engaja usuários e mostra aplicação prática dos insights dos dados
 st.subheader('🎮 Experimente o Simulador')
 
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.markdown("**👤 Perfil do Artista**")
-    artist_pop = st.slider(
-        'Popularidade do Artista:',
-        0, 100, 70,
-        help="Quão conhecido é o artista no mercado"
-    )
-    artist_followers = st.slider(
-        'Seguidores (milhões):',
-        0.0, 100.0, 5.0, 0.1,
-        help="Base de fãs no Spotify"
-    )
-
-with col2:
-    st.markdown("**🎵 Características da Música**")
-    track_duration = st.slider(
-        'Duração (minutos):',
-        1.0, 10.0, 3.5, 0.1,
-        help="Duração ideal está entre 3-4 minutos"
-    )
-
-with col3:
-    st.markdown("**📊 Métricas Adicionais**")
-    album_type = st.selectbox(
-        'Tipo de Álbum:',
-        ['single', 'album', 'compilation'],
-        help="Singles tendem a ser mais focados em sucesso comercial"
-    )
+@fragmento('Insights Avançados', 'insights_simulador')
+def secao_simulador(modelo):
+    """Sliders e botão do simulador reexecutam só esta seção"""
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown("**👤 Perfil do Artista**")
+        artist_pop = st.slider(
+            'Popularidade do Artista:',
+            0, 100, 70,
+            help="Quão conhecido é o artista no mercado"
+        )
+        artist_followers = st.slider(
+            'Seguidores (milhões):',
+            0.0, 100.0, 5.0, 0.1,
+            help="Base de fãs no Spotify"
+        )
+
+    with col2:
+        st.markdown("**🎵 Características da Música**")
+        track_duration = st.slider(
+            'Duração (minutos):',
+            1.0, 10.0, 3.5, 0.1,
+            help="Duração ideal está entre 3-4 minutos"
+        )
+
+    with col3:
+        st.markdown("**📊 Métricas Adicionais**")
+        album_type = st.selectbox(
+            'Tipo de Álbum:',
+            ['single', 'album', 'compilation'],
+            help="Singles tendem a ser mais focados em sucesso comercial"
+        )
+        explicito = st.checkbox(
+            'Conteúdo explícito',
+            help="Se a música contém letra explícita"
+        )
+
+
+    # Estimativa pelo modelo ajustado aos dados
+    if st.button('🎯 Calcular Potencial de Popularidade', type='primary'):
+
+        candidato = pd.DataFrame([{
+            'artist_popularity': artist_pop,
+            'artist_followers': artist_followers * 1_000_000,
+            'track_duration_min': track_duration,
+            'album_type': album_type,
+            'explicit': 'Sim' if explicito else 'Não',
+        }])
+        resultado = pontuar_lote(modelo, candidato).iloc[0]
+
+        # Já limitada entre 0 e 100
+        popularidade_estimada = resultado['popularidade_estimada']
+
+        # Exibir resultado
+        st.success(f"## 🎵 Potencial de Popularidade Estimado: **{popularidade_estimada:.1f}/100**")
+
+        # ============================
+        # ANÁLISE DETALHADA
+        # ============================
+
+        col_analise1, col_analise2 = st.columns(2)
+
+        with col_analise1:
+            if popularidade_estimada >= 80:
+                st.info("""
+                **🔥 Alto Potencial de Sucesso!**
+                - Grande chance de entrar nas paradas
+                - Potencial viral nas redes sociais
+                - Muito alinhado com os padrões das músicas mais populares
+                """)
+            elif popularidade_estimada >= 60:
+                st.info("""
+                **💫 Bom Potencial**
+                - Forte engajamento esperado
+                - Pode crescer com marketing adequado
+                - Artista bem posicionado
+                """)
+            elif popularidade_estimada >= 40:
+                st.info("""
+                **⭐ Potencial Moderado**
+                - Atinge nichos específicos
+                - Depende mais do momento e divulgação
+                """)
+            else:
+                st.info("""
+                **🌱 Baixo Potencial Inicial**
+                - Precisa de maior visibilidade
+                - Estratégias de lançamento podem ajudar
+                """)
+
+        with col_analise2:
+            st.markdown("### 📌 O que mais influenciou o resultado?")
+            st.caption(f"Em relação a uma música média do dataset ({resultado['base']:.1f} pontos)")
+            st.markdown("\n".join(
+                f"- **{nome}:** {resultado[f'contrib_{atributo}']:+.1f} pontos"
+                for atributo, nome in NOMES_ATRIBUTOS.items()
+            ))
+
+
+secao_simulador(modelo)
 
+# =============================================
+# PONTUAÇÃO EM LOTE
+# =============================================
 
-# Fórmula preditiva baseada nas correlações observadas
-if st.button('🎯 Calcular Potencial de Popularidade', type='primary'):
+st.subheader('📦 Pontuação em Lote')
 
-    # Fatores inspirados nas correlações reais
-    fator_artista = artist_pop * 0.6                    # mais relevante
-    fator_seguidores = (artist_followers / 100) * 100 * 0.25  # até 25% do peso
-    fator_duracao = max(0, 50 - abs(track_duration - 3.5) * 20) * 0.15
+st.markdown(f"""
+Envie um CSV com os lançamentos candidatos para pontuar todos de uma vez.
+Colunas necessárias: `{'`, `'.join(COLUNAS_CANDIDATOS)}` (seguidores em número absoluto).
+""")
 
-    # singles tendem a performar melhor
-    fator_album = 8 if album_type == 'single' else 0
+@fragmento('Insights Avançados', 'insights_lote')
+def secao_pontuacao_lote(modelo):
+    """Enviar um CSV de candidatos reexecuta só esta seção"""
+    arquivo_candidatos = st.file_uploader('CSV de candidatos:', type='csv')
+
+    if arquivo_candidatos is not None:
+        try:
+            df_candidatos = pd.read_csv(arquivo_candidatos)
+        except (pd.errors.ParserError, UnicodeDecodeError, ValueError) as erro:
+            # Arquivo vazio, com colunas desalinhadas ou fora do UTF-8
+            st.error(f'Não foi possível ler o CSV enviado: {erro}')
+            return
+        colunas_faltando = [c for c in COLUNAS_CANDIDATOS if c not in df_candidatos.columns]
+
+        if df_candidatos.empty:
+            st.warning('O arquivo não tem nenhum candidato.')
+        elif colunas_faltando:
+            st.error(f"Colunas ausentes no arquivo: {', '.join(colunas_faltando)}")
+        else:
+            df_pontuado = pd.concat([df_candidatos, pontuar_lote(modelo, df_candidatos).round(2)], axis=1)
+            df_pontuado = df_pontuado.sort_values('popularidade_estimada', ascending=False)
 
-    # Soma final
-    popularidade_estimada = (
-        fator_artista +
-        fator_seguidores +
-        fator_duracao +
-        fator_album
-    )
+            exibir_tabela(df_pontuado, 'Pontuação em lote')
+            st.download_button(
+                '⬇️ Baixar resultados',
+                df_pontuado.to_csv(index=False).encode('utf-8'),
+                file_name='candidatos_pontuados.csv',
+                mime='text/csv'
+            )
 
-    # Limitar entre 0 e 100
-    popularidade_estimada = max(0, min(100, popularidade_estimada))
-
-    # Exibir resultado
-    st.success(f"## 🎵 Potencial de Popularidade Estimado: **{popularidade_estimada:.1f}/100**")
-
-    # ============================
-    # ANÁLISE DETALHADA
-    # ============================
-
-    col_analise1, col_analise2 = st.columns(2)
-
-    with col_analise1:
-        if popularidade_estimada >= 80:
-            st.info("""
-            **🔥 Alto Potencial de Sucesso!**
-            - Grande chance de entrar nas paradas
-            - Potencial viral nas redes sociais
-            - Muito alinhado com os padrões das músicas mais populares
-            """)
-        elif popularidade_estimada >= 60:
-            st.info("""
-            **💫 Bom Potencial**
-            - Forte engajamento esperado
-            - Pode crescer com marketing adequado
-            - Artista bem posicionado
-            """)
-        elif popularidade_estimada >= 40:
-            st.info("""
-            **⭐ Potencial Moderado**
-            - Atinge nichos específicos
-            - Depende mais do momento e divulgação
-            """)
-        else:
-            st.info("""
-            **🌱 Baixo Potencial Inicial**
-            - Precisa de maior visibilidade
-            - Estratégias de lançamento podem ajudar
-            """)
 
-    with col_analise2:
-        st.markdown("### 📌 O que mais influenciou o resultado?")
-        st.markdown(f"""
-        - **Popularidade do artista:** {fator_artista:.1f} pontos  
-        - **Seguidores do artista:** {fator_seguidores:.1f} pontos  
-        - **Duração da música:** {fator_duracao:.1f} pontos  
-        - **Tipo do álbum:** +{fator_album} pontos  
-        """)
+secao_pontuacao_lote(modelo)
 
+st.markdown('---')
 
 
 # =============================================
@@ -321,3 +461,6 @@ with col2:
     - **Colaborações estratégicas**: Una artistas de segmentos complementares
     - **Dados como guia**: Use análises para validar intuições criativas
     """)
+
+# Volume enviado ao navegador nesta execução
+exibir_resumo_payload('Insights Avançados')
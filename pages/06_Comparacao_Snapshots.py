@@ -0,0 +1,167 @@
+import streamlit as st
+import plotly.express as px
+from utils.snapshots import DIRETORIO_SNAPSHOTS, comparar_snapshots, listar_snapshots, maiores_variacoes
+from utils.payload import (exibir_grafico, exibir_selecao, exibir_tabela, exibir_resumo_payload, fragmento,
+                           iniciar_payload)
+from utils.recarga import acompanhar_versao_dataset
+
+# =====================================================
+# CONFIGURAÇÃO DA PÁGINA
+# =====================================================
+st.set_page_config(
+    page_title='Comparação de Snapshots',
+    page_icon='🗓️',
+    layout='wide'
+)
+iniciar_payload()
+
+# Usa a versão do dataset da sessão e avisa quando houver uma nova
+acompanhar_versao_dataset()
+
+st.title('🗓️ Comparação entre Snapshots')
+
+st.markdown("""
+Compare dois exports do catálogo e veja quais **artistas** e **músicas** ganharam
+ou perderam popularidade e seguidores entre eles.
+""")
+
+snapshots = listar_snapshots()
+
+if len(snapshots) < 2:
+    st.info(
+        f'Nenhum snapshot anterior encontrado. Salve os exports semanais (CSV no mesmo '
+        f'formato do dataset principal) em `{DIRETORIO_SNAPSHOTS}` para compará-los.'
+    )
+    st.stop()
+
+# =====================================================
+# SELEÇÃO DOS SNAPSHOTS
+# =====================================================
+nomes = list(snapshots)
+
+col_base, col_comparado = st.columns(2)
+with col_base:
+    nome_base = exibir_selecao(st.selectbox, 'Snapshot base:', nomes, index=len(nomes) - 2)
+with col_comparado:
+    nome_comparado = exibir_selecao(st.selectbox, 'Snapshot comparado:', nomes, index=len(nomes) - 1)
+
+if nome_base == nome_comparado:
+    st.warning('Selecione dois snapshots diferentes.')
+    st.stop()
+
+with st.spinner('Comparando snapshots...'):
+    comparacao = comparar_snapshots(snapshots[nome_base], snapshots[nome_comparado])
+
+musicas = comparacao['musicas']
+artistas = comparacao['artistas']
+resumo = comparacao['resumo']
+
+# =====================================================
+# RESUMO
+# =====================================================
+st.header('📋 Resumo')
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric('Músicas no comparado', f"{resumo['musicas_depois']:,}",
+            f"{resumo['musicas_depois'] - resumo['musicas_antes']:+,}")
+col2.metric('Músicas novas', f"{resumo['situacao_musicas']['nova']:,}")
+col3.metric('Músicas removidas', f"{resumo['situacao_musicas']['removida']:,}")
+col4.metric('Variação média de popularidade', f"{resumo['delta_medio_popularidade_musicas']:+.2f}")
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric('Artistas nos dois snapshots', f"{resumo['situacao_artistas']['mantida']:,}")
+col2.metric('Artistas novos', f"{resumo['situacao_artistas']['nova']:,}")
+col3.metric('Artistas removidos', f"{resumo['situacao_artistas']['removida']:,}")
+col4.metric('Variação total de seguidores', f"{resumo['delta_total_seguidores']:+,.0f}")
+
+# =====================================================
+# ARTISTAS
+# =====================================================
+st.header('🎤 Artistas que Mais Variaram')
+
+@fragmento('Comparação de Snapshots', 'comparacao_artistas')
+def secao_artistas(artistas):
+    """Trocar a métrica reexecuta só esta seção"""
+    metricas_artista = {
+        'delta_popularidade': 'Popularidade',
+        'delta_seguidores': 'Seguidores',
+        'variacao_seguidores_pct': 'Seguidores (%)',
+    }
+    metrica = st.radio(
+        'Métrica:',
+        list(metricas_artista),
+        format_func=metricas_artista.get,
+        horizontal=True
+    )
+
+    subiram, cairam = maiores_variacoes(artistas, metrica)
+    colunas_artista = ['artist_name', 'popularidade_antes', 'popularidade_depois',
+                       'seguidores_antes', 'seguidores_depois', metrica]
+    colunas_artista = list(dict.fromkeys(colunas_artista))
+
+    col_sobe, col_cai = st.columns(2)
+    for coluna, tabela, titulo, cor in [
+        (col_sobe, subiram, '📈 Maiores altas', '#2ca02c'),
+        (col_cai, cairam, '📉 Maiores quedas', '#d62728'),
+    ]:
+        with coluna:
+            fig = px.bar(
+                tabela.iloc[::-1],
+                x=metrica,
+                y='artist_name',
+                orientation='h',
+                title=titulo,
+                labels={metrica: metricas_artista[metrica], 'artist_name': 'Artista'},
+                color_discrete_sequence=[cor]
+            )
+            exibir_grafico(fig, f'Artistas: {titulo}')
+            exibir_tabela(tabela[colunas_artista], f'Tabela de artistas: {titulo}', hide_index=True)
+
+
+secao_artistas(artistas)
+
+# =====================================================
+# MÚSICAS
+# =====================================================
+st.header('🎵 Músicas que Mais Variaram')
+
+subiram, cairam = maiores_variacoes(musicas, 'delta_popularidade')
+colunas_musica = ['track_name', 'artist_name', 'album_name',
+                  'popularidade_antes', 'popularidade_depois', 'delta_popularidade']
+
+col_sobe, col_cai = st.columns(2)
+with col_sobe:
+    st.subheader('📈 Maiores altas de popularidade')
+    exibir_tabela(subiram[colunas_musica], 'Músicas: maiores altas', hide_index=True)
+with col_cai:
+    st.subheader('📉 Maiores quedas de popularidade')
+    exibir_tabela(cairam[colunas_musica], 'Músicas: maiores quedas', hide_index=True)
+
+# Distribuição das variações entre as músicas presentes nos dois snapshots
+mantidas = musicas[musicas['situacao'] == 'mantida']
+fig_dist = px.histogram(
+    mantidas,
+    x='delta_popularidade',
+    nbins=41,
+    title='Distribuição da Variação de Popularidade das Músicas',
+    labels={'delta_popularidade': 'Variação de popularidade'}
+)
+exibir_grafico(fig_dist, 'Distribuição das variações')
+
+# =====================================================
+# ENTRADAS E SAÍDAS
+# =====================================================
+st.header('🔄 Entradas e Saídas do Catálogo')
+
+aba_novas, aba_removidas = st.tabs(['Músicas novas', 'Músicas removidas'])
+with aba_novas:
+    novas = musicas[musicas['situacao'] == 'nova'].sort_values('popularidade_depois', ascending=False)
+    exibir_tabela(novas[['track_name', 'artist_name', 'album_name', 'popularidade_depois']],
+                  'Músicas novas', hide_index=True)
+with aba_removidas:
+    removidas = musicas[musicas['situacao'] == 'removida'].sort_values('popularidade_antes', ascending=False)
+    exibir_tabela(removidas[['track_name', 'artist_name', 'album_name', 'popularidade_antes']],
+                  'Músicas removidas', hide_index=True)
+
+# Volume enviado ao navegador nesta execução
+exibir_resumo_payload('Comparação de Snapshots')
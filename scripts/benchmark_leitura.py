@@ -0,0 +1,102 @@
+"""
+Benchmark da leitura do CSV em paralelo (motor pandas).
+
+Mede ler_dataset com 1, 2, 4... processos sobre o mesmo arquivo, sem caches
+e sem gravar a quarentena. Antes de medir, confere se cada quantidade de
+processos produz exatamente o mesmo dataset e o mesmo resumo de qualidade
+da leitura única.
+
+Com --escala N o dataset é replicado N vezes em um CSV temporário (ver
+benchmark_motores.py). O ganho só aparece em máquinas com vários núcleos e
+arquivos grandes: abrir os processos e juntar os pedaços tem custo fixo.
+
+Uso:
+    python scripts/benchmark_leitura.py --escala 10 100 --processos 1 2 4 8
+    PROCESSOS_LEITURA=4 streamlit run 01_Home.py   # processos usados pelo dashboard
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from benchmark_motores import gerar_csv_escalado  # noqa: E402
+from utils.carrega_dados import ler_dataset  # noqa: E402
+
+
+def ler(caminho, processos):
+    return ler_dataset(caminho, caminho_quarentena=None, motor='pandas', processos=processos)
+
+
+def conferir(referencia, resultado):
+    """Falha se a leitura em paralelo divergir da leitura única"""
+    pd.testing.assert_frame_equal(referencia['dados'], resultado['dados'])
+    if referencia['qualidade'] != resultado['qualidade']:
+        raise AssertionError('Resumo de qualidade diferente da leitura única')
+
+
+def medir(caminho, processos, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        ler(caminho, processos)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da leitura do CSV por quantidade de processos')
+    parser.add_argument('--escala', type=int, nargs='+', default=[1, 10],
+                        help='Quantas vezes replicar o dataset em cada cenário')
+    parser.add_argument('--processos', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Quantidades de processos a medir (1 é a leitura única)')
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='Execuções de cada cenário (vale a mediana)')
+    parser.add_argument('--json', dest='saida_json', help='Arquivo para salvar os resultados')
+    args = parser.parse_args()
+
+    # O dataset é lido por caminho relativo à raiz do projeto
+    os.chdir(RAIZ)
+
+    print(f'{os.cpu_count()} núcleos disponíveis.')
+    resultados = []
+    print(f"{'Escala':>6} {'MB':>7} {'Linhas':>10} {'Processos':>9} {'Mediana (s)':>12} "
+          f"{'Mínimo (s)':>11} {'Ganho':>6}")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for escala in args.escala:
+            caminho = gerar_csv_escalado(escala, diretorio)
+            megabytes = os.path.getsize(caminho) / 1024 ** 2
+            referencia = ler(caminho, 1)
+            linhas = len(referencia['dados'])
+
+            base = None
+            for processos in args.processos:
+                if processos > 1:
+                    conferir(referencia, ler(caminho, processos))
+                mediana, minimo = medir(caminho, processos, args.repeticoes)
+                base = base or mediana
+                resultado = {
+                    'escala': escala, 'megabytes': megabytes, 'linhas': linhas, 'processos': processos,
+                    'mediana_s': mediana, 'minimo_s': minimo, 'ganho': base / mediana,
+                }
+                resultados.append(resultado)
+                print(f"{escala:>6} {megabytes:>7.1f} {linhas:>10,} {processos:>9} {mediana:>12.3f} "
+                      f"{minimo:>11.3f} {resultado['ganho']:>5.1f}x")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark dos motores da camada de dados (pandas e Polars).
+
+Executa as mesmas operações de utils/carrega_dados.py com cada motor sobre o
+mesmo arquivo: leitura e limpeza do CSV, contagem de gêneros, co-ocorrência
+de gêneros e normalização das tabelas. Os caches são ignorados, e os
+resultados dos dois motores são comparados antes de medir.
+
+Com --escala N o dataset é replicado N vezes (com nomes de música distintos,
+para não ser removido pela deduplicação) em um CSV temporário.
+
+Uso:
+    python scripts/benchmark_motores.py --escala 1 10 50 --repeticoes 5
+    MOTOR_DADOS=polars streamlit run 01_Home.py   # motor escolhido na implantação
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from utils.carrega_dados import (CAMINHO_DATASET, analisar_coocorrencia, contar_generos,  # noqa: E402
+                                 ler_dataset, normalizar_tabelas, pl)
+
+OPERACOES = ['leitura', 'generos', 'coocorrencia', 'tabelas']
+
+
+# =============================================
+# DADOS
+# =============================================
+
+def gerar_csv_escalado(escala, diretorio):
+    """CSV com o dataset repetido 'escala' vezes; o original quando escala == 1"""
+    if escala == 1:
+        return CAMINHO_DATASET
+
+    original = pd.read_csv(CAMINHO_DATASET)
+    copias = [
+        original.assign(track_name=original['track_name'] + ('' if i == 0 else f' ({i})'))
+        for i in range(escala)
+    ]
+    caminho = os.path.join(diretorio, f'spotify_x{escala}.csv')
+    pd.concat(copias, ignore_index=True).to_csv(caminho, index=False)
+    return caminho
+
+
+# =============================================
+# OPERAÇÕES
+# =============================================
+
+def executar(operacao, motor, caminho, df):
+    """Uma execução da operação, sem passar pelos caches"""
+    if operacao == 'leitura':
+        return ler_dataset(caminho, caminho_quarentena=None, motor=motor)['dados']
+    if operacao == 'generos':
+        return contar_generos.__wrapped__(df, motor=motor)
+    if operacao == 'coocorrencia':
+        return analisar_coocorrencia.__wrapped__(df, motor=motor)
+    return normalizar_tabelas(df, motor=motor)
+
+
+def conferir(operacao, referencia, resultado):
+    """Falha se os motores divergirem (na co-ocorrência, a ordem dos empates pode variar)"""
+    if operacao == 'coocorrencia':
+        chave = ['Genero1', 'Genero2']
+        referencia = referencia.sort_values(chave).reset_index(drop=True)
+        resultado = resultado.sort_values(chave).reset_index(drop=True)
+    if isinstance(referencia, dict):
+        for chave in referencia:
+            pd.testing.assert_frame_equal(referencia[chave], resultado[chave])
+    else:
+        pd.testing.assert_frame_equal(referencia, resultado)
+
+
+def medir(operacao, motor, caminho, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar(operacao, motor, caminho, df)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), min(tempos)
+
+
+# =============================================
+# EXECUÇÃO
+# =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos motores pandas e Polars')
+    parser.add_argument('--escala', type=int, nargs='+', default=[1, 10],
+                        help='Quantas vezes replicar o dataset em cada cenário')
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='Execuções de cada operação (vale a mediana)')
+    parser.add_argument('--operacoes', nargs='+', choices=OPERACOES, default=OPERACOES)
+    parser.add_argument('--json', dest='saida_json', help='Arquivo para salvar os resultados')
+    args = parser.parse_args()
+
+    # O dataset é lido por caminho relativo à raiz do projeto
+    os.chdir(RAIZ)
+
+    motores = ['pandas'] if pl is None else ['pandas', 'polars']
+    if pl is None:
+        print('Polars não instalado: medindo apenas o motor pandas.')
+    else:
+        print(f'Polars {pl.__version__} com {pl.thread_pool_size()} threads.')
+
+    resultados = []
+    print(f"{'Escala':>6} {'Linhas':>9} {'Operação':>13} {'Motor':>7} {'Mediana (s)':>12} "
+          f"{'Mínimo (s)':>11} {'Ganho':>6}")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for escala in args.escala:
+            caminho = gerar_csv_escalado(escala, diretorio)
+            df = ler_dataset(caminho, caminho_quarentena=None, motor='pandas')['dados']
+
+            for operacao in args.operacoes:
+                referencia = executar(operacao, 'pandas', caminho, df)
+                for motor in motores[1:]:
+                    conferir(operacao, referencia, executar(operacao, motor, caminho, df))
+
+                base = None
+                for motor in motores:
+                    mediana, minimo = medir(operacao, motor, caminho, df, args.repeticoes)
+                    base = base or mediana
+                    resultado = {
+                        'escala': escala, 'linhas': len(df), 'operacao': operacao, 'motor': motor,
+                        'mediana_s': mediana, 'minimo_s': minimo, 'ganho': base / mediana,
+                    }
+                    resultados.append(resultado)
+                    print(f"{escala:>6} {len(df):>9,} {operacao:>13} {motor:>7} {mediana:>12.3f} "
+                          f"{minimo:>11.3f} {resultado['ganho']:>5.1f}x")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+"""
+Exportação offline do relatório estático do dashboard.
+
+Calcula os agregados de todas as páginas sem abrir uma sessão do Streamlit,
+renderiza os gráficos e as interpretações automáticas em HTML e JSON e gera
+sub-relatórios por artista e por gênero em paralelo (pool de processos).
+
+Uso:
+    python scripts/gerar_relatorio.py --saida relatorio --artistas 20 --generos 20
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from utils.carrega_dados import (analisar_coocorrencia, carregar_dados, carregar_tabelas,  # noqa: E402
+                                 classificar_segmento, contar_generos, filtrar_por_genero,
+                                 limpar_nomes_artistas)
+from utils.correlacao import VARIAVEIS_CORRELACAO, correlacoes_bootstrap  # noqa: E402
+from utils.cubo import construir_cubo, consultar_cubo  # noqa: E402
+from utils.interpretacao import (categorizar_duracao, interpretar_artista,  # noqa: E402
+                                 interpretar_correlacoes, interpretar_duracao,
+                                 interpretar_lancamentos)
+from utils.modelo import NOMES_ATRIBUTOS, treinar_modelo_popularidade  # noqa: E402
+from utils.similares import buscar_similares, construir_indice_similares  # noqa: E402
+from utils.top_k import construir_indices_top_k, consultar_top_k  # noqa: E402
+
+MAPEAMENTO_NOMES = {
+    'track_popularity': 'Popularidade da Música',
+    'artist_popularity': 'Popularidade do Artista',
+    'track_duration_min': 'Duração da Música (min)',
+    'artist_followers': 'Seguidores do Artista'
+}
+
+
+def secao(titulo, textos=(), figuras=(), tabelas=()):
+    """Uma seção do relatório: textos em markdown, figuras plotly e tabelas (título, DataFrame)"""
+    return {'titulo': titulo, 'textos': list(textos), 'figuras': list(figuras), 'tabelas': list(tabelas)}
+
+
+# =============================================
+# RELATÓRIO GERAL (TODAS AS PÁGINAS)
+# =============================================
+
+def secoes_visao_geral(df):
+    df = df.assign(duration_category_str=categorizar_duracao(df['track_duration_min']))
+
+    fig_duracao = px.box(
+        df, x='duration_category_str', y='track_popularity',
+        title='Distribuição da Popularidade por Duração da Música',
+        labels={'track_popularity': 'Popularidade', 'duration_category_str': 'Duração (minutos)'},
+        color='duration_category_str', color_discrete_sequence=px.colors.qualitative.Set3
+    )
+
+    df_albuns = df['album_type'].value_counts().reset_index()
+    df_albuns.columns = ['Tipo_Album', 'Quantidade']
+    fig_albuns = px.bar(df_albuns, x='Tipo_Album', y='Quantidade',
+                        title='Quantidade de Músicas por Tipo de Álbum')
+
+    df_artistas = consultar_top_k(construir_indices_top_k(df), 'artistas', 'popularidade', n=10)
+    fig_artistas = px.bar(df_artistas, y='artist_name', x='artist_popularity', orientation='h',
+                          title='Top 10 Artistas por Popularidade Média',
+                          labels={'artist_name': 'Artista', 'artist_popularity': 'Popularidade Média'})
+
+    df_anos = consultar_cubo(construir_cubo(df), ['release_year'])[['release_year', 'musicas']]
+    df_anos.columns = ['Ano', 'Quantidade']
+    fig_anos = px.line(df_anos, x='Ano', y='Quantidade',
+                       title='Distribuição de Lançamentos de Músicas por Ano')
+
+    resumo = pd.DataFrame([{
+        'Artistas Únicos': len(carregar_tabelas()['artistas']),
+        'Álbuns Únicos': df['album_name'].nunique(),
+        'Popularidade Máxima': df['track_popularity'].max(),
+        'Período Analisado': f"{df['release_year'].min()}-{df['release_year'].max()}",
+    }])
+
+    return [
+        secao('Popularidade por Duração', [interpretar_duracao(df)], [fig_duracao]),
+        secao('Tipos de Álbum e Top Artistas', figuras=[fig_albuns, fig_artistas]),
+        secao('Lançamentos por Ano', [interpretar_lancamentos(df_anos)], [fig_anos]),
+        secao('Resumo Estatístico', tabelas=[('Métricas', resumo)]),
+    ]
+
+
+def secoes_popularidade(df):
+    # Mesmas correlações do dashboard: Spearman com intervalos por bootstrap
+    correlacoes = correlacoes_bootstrap(df, VARIAVEIS_CORRELACAO)
+    df_corr_pt, df_inferior_pt, df_superior_pt = (
+        matriz['spearman'].rename(index=MAPEAMENTO_NOMES, columns=MAPEAMENTO_NOMES)
+        for matriz in (correlacoes['matrizes'], correlacoes['inferior'], correlacoes['superior'])
+    )
+
+    fig_corr = px.imshow(df_corr_pt, text_auto='.2f', aspect='auto', color_continuous_scale='RdBu_r',
+                         title='Matriz de Correlação (Spearman) entre Variáveis Musicais')
+
+    # Inclinação das linhas de tendência de cada variável contra a popularidade da música
+    inclinacoes = pd.DataFrame([
+        {'Variável': MAPEAMENTO_NOMES[coluna],
+         'Inclinação': np.polyfit(df[coluna], df['track_popularity'], 1)[0]}
+        for coluna in ['artist_popularity', 'artist_followers', 'track_duration_min']
+    ])
+
+    return [
+        secao('Correlação entre Variáveis',
+              [interpretar_correlacoes(df_corr_pt, df_inferior_pt, df_superior_pt),
+               f"Intervalos de confiança de 95% por bootstrap percentil "
+               f"({correlacoes['n_bootstrap']} reamostragens de {correlacoes['amostras']:,} músicas)."],
+              [fig_corr],
+              [('Tendências da Popularidade da Música', inclinacoes)]),
+    ]
+
+
+def secoes_generos(df):
+    df_contagem = contar_generos(df)
+
+    fig_top = px.bar(df_contagem.head(10), x='Quantidade', y='Genero', orientation='h',
+                     title='Top 10 Gêneros Musicais')
+    fig_pizza = px.pie(df_contagem.head(15), values='Quantidade', names='Genero',
+                       title='Distribuição dos 15 Gêneros Principais', hole=0.4)
+
+    return [
+        secao('Panorama dos Gêneros', figuras=[fig_top, fig_pizza]),
+        secao('Gêneros que Frequentemente Aparecem Juntos',
+              tabelas=[('Co-ocorrências', analisar_coocorrencia(df).head(15))]),
+    ]
+
+
+def secoes_insights(df):
+    df_ano = consultar_cubo(construir_cubo(df), ['release_year'], {'release_year': (2010, None)})
+
+    fig_temporal = go.Figure()
+    fig_temporal.add_trace(go.Scatter(x=df_ano['release_year'], y=df_ano['media_track_popularity'],
+                                      name='Popularidade Média', mode='lines+markers'))
+    fig_temporal.add_trace(go.Scatter(x=df_ano['release_year'], y=df_ano['media_track_duration_min'],
+                                      name='Duração Média', yaxis='y2'))
+    fig_temporal.add_trace(go.Bar(x=df_ano['release_year'], y=df_ano['musicas'],
+                                  name='Lançamentos', yaxis='y3', marker_color='rgba(100, 149, 237, 0.6)'))
+    fig_temporal.update_layout(
+        title=f"Evolução do Mercado Musical ({df_ano['release_year'].min()}-{df_ano['release_year'].max()})",
+        yaxis=dict(title='Popularidade Média', side='left'),
+        yaxis2=dict(title='Duração Média (minutos)', overlaying='y', side='right'),
+        yaxis3=dict(title='Quantidade de Lançamentos', overlaying='y', side='right', position=0.85),
+    )
+
+    df_segmentos = df.assign(segmento_estrategico=classificar_segmento(df),
+                             percentual_explicito=(df['explicit'] == 'Sim') * 100.0)
+    segment_stats = df_segmentos.groupby('segmento_estrategico').agg(
+        Popularidade_Média=('track_popularity', 'mean'),
+        Total_Músicas=('track_popularity', 'count'),
+        Duração_Média=('track_duration_min', 'mean'),
+        Artistas_Únicos=('artist_name', 'nunique'),
+        Percentual_Explicito=('percentual_explicito', 'mean'),
+    ).round(2).sort_values('Popularidade_Média', ascending=False).reset_index()
+
+    modelo = treinar_modelo_popularidade(df)
+    coeficientes = pd.DataFrame({
+        'Atributo': [NOMES_ATRIBUTOS[a] for a in modelo['coeficientes'].index],
+        'Coeficiente': modelo['coeficientes'].round(4).to_numpy(),
+    })
+
+    return [
+        secao('Evolução Temporal das Características Musicais', figuras=[fig_temporal]),
+        secao('Segmentação Estratégica do Mercado Musical', tabelas=[('Segmentos', segment_stats)]),
+        secao('Modelo de Potencial de Popularidade',
+              [f"Regressão linear com R² = **{modelo['r2']:.2f}** sobre **{modelo['amostras']:,}** músicas."],
+              tabelas=[('Coeficientes', coeficientes)]),
+    ]
+
+
+# =============================================
+# SUB-RELATÓRIOS POR ARTISTA E GÊNERO
+# =============================================
+
+def secoes_artista(df, artista):
+    df_artista = df[limpar_nomes_artistas(df['artist_name']) == artista]
+
+    df_ano = df_artista['release_year'].value_counts().sort_index().reset_index()
+    df_ano.columns = ['Ano', 'Quantidade']
+    df_album = df_artista.groupby('album_name')['track_popularity'].mean().reset_index()
+
+    fig_pop = px.bar(df_artista.sort_values('track_popularity', ascending=False),
+                     x='track_name', y='track_popularity', title=f'Popularidade das Músicas de {artista}')
+    fig_ano = px.line(df_ano, x='Ano', y='Quantidade', markers=True,
+                      title=f'Linha do Tempo de Lançamentos — {artista}')
+    fig_album = px.bar(df_album.sort_values('track_popularity', ascending=False),
+                       x='album_name', y='track_popularity', title=f'Popularidade Média dos Álbuns — {artista}')
+    fig_dur = px.histogram(df_artista, x='track_duration_min', nbins=20,
+                           title=f'Duração das Músicas — {artista}')
+
+    metricas = pd.DataFrame([{
+        'Seguidores': df_artista['artist_followers'].max(),
+        'Popularidade do Artista': df_artista['artist_popularity'].max(),
+        'Músicas no Dataset': len(df_artista),
+    }])
+    similares = buscar_similares(construir_indice_similares(df), artista, k=10)
+
+    return [
+        secao('Métricas do Artista', tabelas=[('Métricas', metricas)]),
+        secao('Músicas, Álbuns e Lançamentos', figuras=[fig_pop, fig_ano, fig_album, fig_dur]),
+        secao('Interpretação Automática do Artista',
+              [interpretar_artista(artista, df_artista, df_album, df_ano)]),
+        secao('Artistas Semelhantes', tabelas=[('Artistas Semelhantes', similares)]),
+    ]
+
+
+def secoes_genero(df, genero):
+    df_genero = filtrar_por_genero(df, genero)
+
+    metricas = pd.DataFrame([{
+        'Artistas Únicos': df_genero['artist_name'].nunique(),
+        'Total de Músicas': len(df_genero),
+        'Popularidade Média': round(df_genero['track_popularity'].mean(), 1),
+        'Duração Média (min)': round(df_genero['track_duration_min'].mean(), 1),
+    }])
+
+    df_artistas = consultar_top_k(construir_indices_top_k(df), 'artistas', 'popularidade_musicas',
+                                  escopo='genero', valor=genero)
+    fig_artistas = px.bar(df_artistas, x='popularidade_media_musicas', y='artist_name', orientation='h',
+                          title=f'Top 10 Artistas do {genero} por Popularidade Média',
+                          labels={'popularidade_media_musicas': 'Popularidade Média', 'artist_name': 'Artista'})
+
+    return [
+        secao('Métricas do Gênero', tabelas=[('Métricas', metricas)]),
+        secao('Top Artistas do Gênero', figuras=[fig_artistas]),
+    ]
+
+
+# =============================================
+# RENDERIZAÇÃO (HTML + JSON)
+# =============================================
+
+def markdown_para_html(texto):
+    """Conversão mínima do markdown das interpretações (títulos, listas, negrito e itálico)"""
+    linhas_html = []
+    em_lista = False
+
+    for linha in texto.strip().splitlines():
+        linha = html.escape(linha.strip())
+        linha = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', linha)
+        linha = re.sub(r'\*(.+?)\*', r'<em>\1</em>', linha)
+
+        if linha.startswith('- '):
+            if not em_lista:
+                linhas_html.append('<ul>')
+                em_lista = True
+            linhas_html.append(f'<li>{linha[2:]}</li>')
+            continue
+
+        if em_lista:
+            linhas_html.append('</ul>')
+            em_lista = False
+
+        if linha.startswith('#'):
+            nivel = min(len(linha) - len(linha.lstrip('#')) + 1, 6)
+            linhas_html.append(f'<h{nivel}>{linha.lstrip("# ")}</h{nivel}>')
+        elif linha:
+            linhas_html.append(f'<p>{linha}</p>')
+
+    if em_lista:
+        linhas_html.append('</ul>')
+    return '\n'.join(linhas_html)
+
+
+def nome_arquivo(texto):
+    """Nome de arquivo seguro para artistas e gêneros"""
+    return re.sub(r'[^a-z0-9]+', '-', texto.lower()).strip('-') or 'sem-nome'
+
+
+def nomes_arquivos(textos):
+    """
+    Nome de arquivo de cada texto, sem repetições: textos que só diferem em
+    pontuação ou acentos ganham um sufixo numérico (-2, -3...)
+    """
+    nomes = {}
+    usados = set()
+    for texto in textos:
+        base = nome_arquivo(texto)
+        nome, sufixo = base, 1
+        while nome in usados:
+            sufixo += 1
+            nome = f'{base}-{sufixo}'
+        usados.add(nome)
+        nomes[texto] = nome
+    return nomes
+
+
+def salvar_relatorio(titulo, secoes, destino, links=()):
+    """Grava destino.html e destino.json com as seções do relatório"""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+
+    partes = [f'<h1>{html.escape(titulo)}</h1>', f'<p>Gerado em {date.today():%d/%m/%Y}</p>']
+    for item in secoes:
+        partes.append(f'<h2>{html.escape(item["titulo"])}</h2>')
+        partes.extend(markdown_para_html(texto) for texto in item['textos'])
+        partes.extend(fig.to_html(full_html=False, include_plotlyjs=False) for fig in item['figuras'])
+        for titulo_tabela, tabela in item['tabelas']:
+            partes.append(f'<h3>{html.escape(titulo_tabela)}</h3>')
+            partes.append(tabela.to_html(index=False, border=0, classes='tabela'))
+
+    for titulo_links, itens in links:
+        partes.append(f'<h2>{html.escape(titulo_links)}</h2><ul>')
+        partes.extend(f'<li><a href="{caminho}">{html.escape(nome)}</a></li>' for nome, caminho in itens)
+        partes.append('</ul>')
+
+    destino.with_suffix('.html').write_text(f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(titulo)}</title>
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<style>
+body {{ font-family: sans-serif; max-width: 1100px; margin: 0 auto; padding: 1rem; }}
+.tabela {{ border-collapse: collapse; }}
+.tabela td, .tabela th {{ padding: 0.25rem 0.75rem; border-bottom: 1px solid #ddd; }}
+</style>
+</head>
+<body>
+{chr(10).join(partes)}
+</body>
+</html>
+""", encoding='utf-8')
+
+    dados = {
+        'titulo': titulo,
+        'gerado_em': date.today().isoformat(),
+        'secoes': [{
+            'titulo': item['titulo'],
+            'textos': item['textos'],
+            'figuras': [json.loads(fig.to_json()) for fig in item['figuras']],
+            'tabelas': [{'titulo': t, 'linhas': json.loads(tab.to_json(orient='records'))}
+                        for t, tab in item['tabelas']],
+        } for item in secoes],
+    }
+    destino.with_suffix('.json').write_text(json.dumps(dados, ensure_ascii=False), encoding='utf-8')
+
+
+# =============================================
+# EXECUÇÃO EM PARALELO
+# =============================================
+
+_df_processo = None
+
+
+def _iniciar_processo(df):
+    # Cada processo recebe o dataset uma única vez, na criação do pool
+    global _df_processo
+    _df_processo = df
+
+
+def _gerar_sub_relatorio(tipo, nome, destino):
+    if tipo == 'artista':
+        salvar_relatorio(f'Artista: {nome}', secoes_artista(_df_processo, nome), destino)
+    else:
+        salvar_relatorio(f'Gênero: {nome}', secoes_genero(_df_processo, nome), destino)
+    return tipo, nome
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera o relatório estático do dashboard')
+    parser.add_argument('--saida', default='relatorio', help='Diretório de saída')
+    parser.add_argument('--artistas', type=int, default=20, help='Quantidade de artistas com sub-relatório')
+    parser.add_argument('--generos', type=int, default=20, help='Quantidade de gêneros com sub-relatório')
+    parser.add_argument('--processos', type=int, default=os.cpu_count(), help='Tamanho do pool de processos')
+    args = parser.parse_args()
+
+    # As funções de carga leem o dataset por caminho relativo à raiz do projeto
+    os.chdir(RAIZ)
+    inicio = time.perf_counter()
+
+    df = carregar_dados()
+    saida = Path(args.saida) / date.today().isoformat()
+
+    # Artistas mais populares (nome padronizado, como na página de artista) e gêneros mais comuns
+    top_artistas = consultar_top_k(construir_indices_top_k(df), 'artistas', 'popularidade', n=args.artistas)
+    artistas = limpar_nomes_artistas(top_artistas['artist_name']).dropna().unique().tolist()
+    generos = contar_generos(df)['Genero'].head(args.generos).tolist()
+
+    arquivos_artistas = nomes_arquivos(artistas)
+    arquivos_generos = nomes_arquivos(generos)
+    tarefas = [('artista', nome, saida / 'artistas' / arquivos_artistas[nome]) for nome in artistas]
+    tarefas += [('genero', nome, saida / 'generos' / arquivos_generos[nome]) for nome in generos]
+
+    with ProcessPoolExecutor(max_workers=args.processos, initializer=_iniciar_processo,
+                             initargs=(df,)) as executor:
+        futuros = [executor.submit(_gerar_sub_relatorio, *tarefa) for tarefa in tarefas]
+
+        # O relatório geral é montado no processo principal enquanto o pool trabalha
+        secoes = (secoes_visao_geral(df) + secoes_popularidade(df)
+                  + secoes_generos(df) + secoes_insights(df))
+
+        for futuro in futuros:
+            futuro.result()
+
+    links = [
+        ('Relatórios por Artista', [(n, f'artistas/{arquivos_artistas[n]}.html') for n in artistas]),
+        ('Relatórios por Gênero', [(n, f'generos/{arquivos_generos[n]}.html') for n in generos]),
+    ]
+    salvar_relatorio('Relatório do Dashboard Spotify', secoes, saida / 'index', links)
+
+    print(f'Relatório gerado em {saida} ({len(tarefas)} sub-relatórios, '
+          f'{time.perf_counter() - inicio:.1f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Serviço HTTP/JSON com os agregados do dashboard, fora do Streamlit.
+
+Sobe o mesmo serviço de utils/api.py em um processo próprio, com a recarga
+do dataset em segundo plano (a versão servida troca quando o CSV muda). Para
+compartilhar os caches com o app, rode o Streamlit com API_DADOS_PORTA.
+
+Rotas:
+    /api/versao
+    /api/top-artistas?escopo=global|genero|ano|segmento&valor=...&metrica=...&n=10
+    /api/top-musicas?escopo=...&valor=...&metrica=popularidade|seguidores&n=10
+    /api/generos?limite=50
+    /api/generos/coocorrencia?minimo=5&limite=50
+    /api/tendencias-anuais
+    /api/artistas/<nome do artista>
+
+Uso:
+    python scripts/servidor_api.py --porta 8765 --trabalhadores 8
+    curl -H 'Accept-Encoding: gzip' http://127.0.0.1:8765/api/generos --compressed
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from utils.api import HOST_PADRAO, PORTA_PADRAO, TRABALHADORES_PADRAO, criar_servidor  # noqa: E402
+from utils.carrega_dados import versao_ativa  # noqa: E402
+from utils.recarga import aquecer_versao, iniciar_monitoramento  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API JSON local com os agregados do dashboard')
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--trabalhadores', type=int, default=TRABALHADORES_PADRAO,
+                        help='Threads do pool que atende as requisições')
+    parser.add_argument('--sem-aquecimento', action='store_true',
+                        help='Não pré-calcula os artefatos antes de aceitar conexões')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    # O dataset é lido por caminho relativo à raiz do projeto
+    os.chdir(RAIZ)
+
+    if not args.sem_aquecimento:
+        aquecer_versao(versao_ativa())
+    iniciar_monitoramento()
+
+    servidor = criar_servidor(args.host, args.porta, args.trabalhadores)
+    logging.info('API de dados em http://%s:%s/api/versao', args.host, servidor.server_address[1])
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""
+Teste de carga do dashboard com sessões simultâneas.
+
+Simula N analistas navegando pelas páginas reais do app (01_Home.py e pages/*)
+usando o AppTest do Streamlit, com interações roteirizadas nos widgets
+(seleção de artista, seleção/comparação de gêneros e botão do simulador).
+
+Para cada quantidade de sessões informada, relata a latência de rerun
+(p50/p95), a vazão (reruns por segundo) e a memória residente (RSS) do processo,
+além da mediana de cada etapa do roteiro.
+
+Widgets dentro de um st.fragment disparam, no navegador, só o rerun do
+fragmento. O AppTest sempre reexecuta o script inteiro, então essas interações
+são medidas pedindo o rerun do fragmento pela chave (key) dele; se a página não
+tiver o fragmento, a interação vira um rerun completo, como antes.
+
+O rerun de fragmentos depende de internos do AppTest (o RerunData do runner
+local e o registro de fragmentos por chave), que não fazem parte da API
+pública. Ele só é ativado nas versões do Streamlit listadas em
+VERSOES_STREAMLIT_SUPORTADAS; em outras, o script avisa no início e mede
+essas interações como reruns completos.
+
+Uso:
+    python scripts/teste_carga.py --sessoes 1 2 4 8 --rodadas 3
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import streamlit
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+try:
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+except ImportError:  # interno do Streamlit; ver VERSOES_STREAMLIT_SUPORTADAS
+    RerunData = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+PAGINA_HOME = RAIZ / '01_Home.py'
+PAGINA_VISAO_GERAL = RAIZ / 'pages' / '02_Visao_Geral.py'
+PAGINA_ARTISTA = RAIZ / 'pages' / '03_Analise_por_Artista.py'
+PAGINA_POPULARIDADE = RAIZ / 'pages' / '04_Popularidade.py'
+PAGINA_GENEROS = RAIZ / 'pages' / '05_Generos_Musicais.py'
+PAGINA_INSIGHTS = RAIZ / 'pages' / '05_Insights_Avancados.py'
+PAGINA_COMPARACAO = RAIZ / 'pages' / '06_Comparacao_Snapshots.py'
+
+
+# =============================================
+# RERUN DE FRAGMENTOS
+# =============================================
+
+# Versões (maior.menor) em que o rerun de fragmentos pelo AppTest foi verificado
+VERSOES_STREAMLIT_SUPORTADAS = ('1.66',)
+
+# Fila de fragmentos do próximo rerun de cada sessão (uma sessão por thread)
+_fragmentos_da_thread = threading.local()
+_rerun_fragmentos = {'ativo': False}
+
+
+def _dados_rerun(**kwargs):
+    fila = getattr(_fragmentos_da_thread, 'fila', None)
+    if fila:
+        kwargs['fragment_id_queue'] = list(fila)
+    return RerunData(**kwargs)
+
+
+def motivo_sem_fragmentos():
+    """Por que o rerun de fragmentos não pode ser usado nesta instalação (None se pode)"""
+    versao = '.'.join(streamlit.__version__.split('.')[:2])
+    if versao not in VERSOES_STREAMLIT_SUPORTADAS:
+        return (f'Streamlit {streamlit.__version__} não verificado '
+                f'(suportadas: {", ".join(VERSOES_STREAMLIT_SUPORTADAS)})')
+    if RerunData is None or not hasattr(local_script_runner, 'RerunData'):
+        return 'RerunData não encontrado nos internos do Streamlit'
+    if 'fragment_id_queue' not in {campo.name for campo in dataclasses.fields(RerunData)}:
+        return 'RerunData sem o campo fragment_id_queue'
+    return None
+
+
+def ativar_rerun_de_fragmentos():
+    """Ativa o rerun de fragmentos se a versão for suportada; senão avisa e mantém reruns completos"""
+    motivo = motivo_sem_fragmentos()
+    if motivo:
+        print(f'Aviso: rerun de fragmentos desativado ({motivo}); '
+              f'interações em fragmentos serão medidas como reruns completos.')
+        return
+    local_script_runner.RerunData = _dados_rerun
+    _rerun_fragmentos['ativo'] = True
+
+
+def ids_fragmento(app, chave):
+    """Ids registrados para o fragmento com essa chave na última execução do app"""
+    if not _rerun_fragmentos['ativo']:
+        return []
+    registro = getattr(app._fragment_storage, '_ids_by_target_key', None)
+    if registro is None:
+        raise RuntimeError('O registro de fragmentos do AppTest mudou; '
+                           'atualize ids_fragmento para esta versão do Streamlit')
+    return list(registro.get(chave, ()))
+
+
+# =============================================
+# MEDIÇÕES
+# =============================================
+
+def memoria_rss_mb():
+    """Memória residente atual do processo em MB (pico, se /proc não existir; NaN sem os dois)"""
+    try:
+        with open('/proc/self/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return float('nan')
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # No macOS o valor vem em bytes, no Linux em KB
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+class Medidor:
+    """Acumula as latências de rerun de todas as sessões de forma thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = []
+        self.erros = []
+
+    def executar(self, app, rotulo, fragmento=None):
+        """Rerun do app; com 'fragmento', só o fragmento dessa chave (se existir)"""
+        _fragmentos_da_thread.fila = ids_fragmento(app, fragmento) if fragmento else None
+        try:
+            inicio = time.perf_counter()
+            app.run()
+            duracao = time.perf_counter() - inicio
+        finally:
+            _fragmentos_da_thread.fila = None
+
+        with self._lock:
+            self.latencias.append((rotulo, duracao))
+            for excecao in app.exception:
+                self.erros.append((rotulo, excecao.message))
+
+
+# =============================================
+# ROTEIRO DE UMA SESSÃO
+# =============================================
+
+def abrir_pagina(caminho, timeout):
+    return AppTest.from_file(str(caminho), default_timeout=timeout)
+
+
+def widget(elementos, rotulo):
+    """Widget com esse rótulo (ou None se a página não o exibiu)"""
+    return next((elemento for elemento in elementos if elemento.label == rotulo), None)
+
+
+def simular_sessao(medidor, rodadas, timeout, semente):
+    """Percorre todas as páginas repetindo as interações de um analista"""
+    aleatorio = random.Random(semente)
+
+    for _ in range(rodadas):
+        app = abrir_pagina(PAGINA_HOME, timeout)
+        medidor.executar(app, 'home')
+
+        # Visão geral: troca a métrica do ranking por escopo
+        app = abrir_pagina(PAGINA_VISAO_GERAL, timeout)
+        medidor.executar(app, 'visao_geral')
+        metrica = widget(app.radio, 'Ordenar por:')
+        if metrica:
+            metrica.set_value('Seguidores')
+            medidor.executar(app, 'visao_geral:ranking', fragmento='visao_geral_ranking')
+
+        # Página de artista: carga inicial + busca + troca de artista no selectbox
+        app = abrir_pagina(PAGINA_ARTISTA, timeout)
+        medidor.executar(app, 'artista')
+        if app.text_input and app.selectbox:
+            artista = aleatorio.choice(app.selectbox[0].options)
+            app.text_input[0].input(artista[:3])
+            medidor.executar(app, 'artista:busca')
+        if app.selectbox:
+            seletor = app.selectbox[0]
+            seletor.set_value(aleatorio.choice(seletor.options))
+            medidor.executar(app, 'artista:selectbox')
+        similares = widget(app.slider, 'Quantidade de artistas:')
+        if similares:
+            similares.set_value(aleatorio.randint(5, 30))
+            medidor.executar(app, 'artista:similares', fragmento='artista_similares')
+
+        # Popularidade: troca o método de correlação
+        app = abrir_pagina(PAGINA_POPULARIDADE, timeout)
+        medidor.executar(app, 'popularidade')
+        metodo = widget(app.radio, 'Método de correlação:')
+        if metodo:
+            metodo.set_value('pearson')
+            medidor.executar(app, 'popularidade:metodo', fragmento='popularidade_correlacao')
+
+        # Página de gêneros: escolhe um gênero e altera a comparação
+        app = abrir_pagina(PAGINA_GENEROS, timeout)
+        medidor.executar(app, 'generos')
+        if app.selectbox:
+            seletor = app.selectbox[0]
+            seletor.set_value(aleatorio.choice(seletor.options[1:]))
+            medidor.executar(app, 'generos:selectbox')
+        if app.main.multiselect:
+            comparacao = app.main.multiselect[0]
+            escolhidos = aleatorio.sample(comparacao.options, k=min(3, len(comparacao.options)))
+            comparacao.set_value(escolhidos)
+            medidor.executar(app, 'generos:multiselect', fragmento='generos_comparacao')
+
+        # Página de insights: aciona o simulador de popularidade
+        app = abrir_pagina(PAGINA_INSIGHTS, timeout)
+        medidor.executar(app, 'insights')
+        simulador = widget(app.main.button, '🎯 Calcular Potencial de Popularidade')
+        if simulador:
+            simulador.click()
+            medidor.executar(app, 'insights:simulador', fragmento='insights_simulador')
+
+        # Comparação de snapshots: troca a métrica dos artistas
+        app = abrir_pagina(PAGINA_COMPARACAO, timeout)
+        medidor.executar(app, 'comparacao')
+        metrica = widget(app.radio, 'Métrica:')
+        if metrica:
+            metrica.set_value('delta_seguidores')
+            medidor.executar(app, 'comparacao:metrica', fragmento='comparacao_artistas')
+
+
+def executar_cenario(n_sessoes, rodadas, timeout, semente):
+    """Dispara N sessões em paralelo e consolida as métricas do cenário"""
+    medidor = Medidor()
+    rss_inicial = memoria_rss_mb()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessoes) as executor:
+        futuros = [
+            executor.submit(simular_sessao, medidor, rodadas, timeout, semente + i)
+            for i in range(n_sessoes)
+        ]
+        for futuro in futuros:
+            futuro.result()
+    duracao_total = time.perf_counter() - inicio
+
+    latencias = np.array([duracao for _, duracao in medidor.latencias])
+
+    por_etapa = {}
+    for rotulo, duracao in medidor.latencias:
+        por_etapa.setdefault(rotulo, []).append(duracao)
+
+    return {
+        'sessoes': n_sessoes,
+        'reruns': len(latencias),
+        'p50_ms': float(np.percentile(latencias, 50) * 1000),
+        'p95_ms': float(np.percentile(latencias, 95) * 1000),
+        'vazao_reruns_s': len(latencias) / duracao_total,
+        'rss_inicial_mb': rss_inicial,
+        'rss_final_mb': memoria_rss_mb(),
+        'erros': len(medidor.erros),
+        'exemplos_erros': medidor.erros[:3],
+        'etapas_p50_ms': {rotulo: float(np.median(duracoes) * 1000) for rotulo, duracoes in por_etapa.items()},
+    }
+
+
+# =============================================
+# EXECUÇÃO
+# =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga das páginas do dashboard')
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Quantidades de sessões simultâneas a testar')
+    parser.add_argument('--rodadas', type=int, default=2,
+                        help='Quantas vezes cada sessão percorre todas as páginas')
+    parser.add_argument('--timeout', type=float, default=120,
+                        help='Tempo máximo (s) de cada rerun')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--json', dest='saida_json', help='Arquivo para salvar os resultados')
+    args = parser.parse_args()
+
+    # As páginas leem o dataset por caminho relativo à raiz do projeto
+    os.chdir(RAIZ)
+    ativar_rerun_de_fragmentos()
+
+    # Aquece o cache para que o primeiro cenário não pague a leitura do CSV
+    executar_cenario(1, 1, args.timeout, args.semente)
+
+    resultados = []
+    print(f"{'Sessões':>8} {'Reruns':>7} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+          f"{'Reruns/s':>9} {'RSS (MB)':>9} {'Erros':>6}")
+
+    for n_sessoes in args.sessoes:
+        resultado = executar_cenario(n_sessoes, args.rodadas, args.timeout, args.semente)
+        resultados.append(resultado)
+        print(f"{resultado['sessoes']:>8} {resultado['reruns']:>7} {resultado['p50_ms']:>10.1f} "
+              f"{resultado['p95_ms']:>10.1f} {resultado['vazao_reruns_s']:>9.2f} "
+              f"{resultado['rss_final_mb']:>9.1f} {resultado['erros']:>6}")
+        for rotulo, mensagem in resultado['exemplos_erros']:
+            print(f"    erro em {rotulo}: {mensagem}")
+
+    # Mediana de cada etapa do roteiro, por quantidade de sessões
+    print()
+    print(f"{'Etapa (p50 ms)':<22}" + ''.join(f"{str(r['sessoes']) + ' sess.':>10}" for r in resultados))
+    for rotulo in resultados[0]['etapas_p50_ms']:
+        print(f"{rotulo:<22}" + ''.join(f"{r['etapas_p50_ms'].get(rotulo, float('nan')):>10.1f}"
+                                        for r in resultados))
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
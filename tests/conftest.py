@@ -0,0 +1,47 @@
+"""
+Configuração comum dos testes.
+
+Os testes usam DataFrames sintéticos pequenos no formato do dataset limpo;
+os módulos de utils/ são importados a partir da raiz do projeto.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def gerar_dataset(linhas=500, semente=0):
+    """Dataset limpo sintético com as colunas usadas pelas páginas"""
+    aleatorio = np.random.default_rng(semente)
+    artistas = [f'Artista {i}' for i in range(40)]
+    generos = ['pop', 'rock', 'indie pop', 'hip hop', 'jazz', 'N/A']
+    artista = aleatorio.choice(artistas, linhas)
+    anos = aleatorio.integers(1990, 2025, linhas)
+
+    return pd.DataFrame({
+        'track_name': [f'Música {i}' for i in range(linhas)],
+        'artist_name': artista,
+        'artist_popularity': aleatorio.integers(0, 101, linhas),
+        'artist_followers': aleatorio.integers(0, 5_000_000, linhas),
+        'artist_genres': [', '.join(aleatorio.choice(generos, aleatorio.integers(1, 3), replace=False))
+                          for _ in range(linhas)],
+        'album_name': [f'Álbum {a} {i % 7}' for i, a in enumerate(artista)],
+        'album_release_date': pd.to_datetime(anos.astype(str), format='%Y'),
+        'album_type': aleatorio.choice(['album', 'single', 'compilation'], linhas),
+        'track_popularity': aleatorio.integers(0, 101, linhas),
+        'track_duration_min': aleatorio.uniform(1, 8, linhas).round(2),
+        'explicit': aleatorio.choice(['Sim', 'Não'], linhas),
+        'release_year': pd.array(anos, dtype='Int16'),
+        'release_date_precision': np.full(linhas, 1, dtype='int8'),
+    })
+
+
+@pytest.fixture
+def dataset():
+    return gerar_dataset()
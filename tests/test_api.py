@@ -0,0 +1,116 @@
+import gzip
+import http.client
+import itertools
+import json
+import threading
+from urllib.parse import quote
+
+import pytest
+
+import utils.api as api
+
+_versoes = itertools.count()
+
+
+@pytest.fixture
+def servidor(dataset, monkeypatch):
+    """Serviço numa porta livre, com o dataset sintético numa versão própria do teste"""
+    estado = {'versao': f'teste-{next(_versoes)}', 'leituras': 0}
+
+    def dados(versao):
+        estado['leituras'] += 1
+        return dataset
+
+    monkeypatch.setattr(api, 'versao_ativa', lambda: estado['versao'])
+    monkeypatch.setattr(api, '_dados', dados)
+
+    instancia = api.criar_servidor(porta=0, trabalhadores=2)
+    threading.Thread(target=instancia.serve_forever, args=(0.05,), daemon=True).start()
+    yield instancia, estado
+    instancia.shutdown()
+    instancia.server_close()
+
+
+def consultar(instancia, caminho, **cabecalhos):
+    conexao = http.client.HTTPConnection(*instancia.server_address[:2], timeout=10)
+    try:
+        conexao.request('GET', caminho, headers=cabecalhos)
+        resposta = conexao.getresponse()
+        return resposta.status, dict(resposta.getheaders()), resposta.read()
+    finally:
+        conexao.close()
+
+
+def test_etag_igual_devolve_304_sem_ler_os_dados(servidor):
+    instancia, estado = servidor
+    status, cabecalhos, corpo = consultar(instancia, '/api/versao')
+    assert status == 200
+    assert json.loads(corpo)['musicas'] == 500
+    assert cabecalhos['X-Versao-Dataset'] == estado['versao']
+
+    leituras = estado['leituras']
+    status, cabecalhos_304, corpo = consultar(instancia, '/api/versao',
+                                              **{'If-None-Match': f'W/"outro", {cabecalhos["ETag"]}'})
+    assert (status, corpo) == (304, b'')
+    assert cabecalhos_304['ETag'] == cabecalhos['ETag']
+    assert estado['leituras'] == leituras
+
+
+def test_nova_versao_muda_o_etag(servidor):
+    instancia, estado = servidor
+    _, cabecalhos, _ = consultar(instancia, '/api/versao')
+
+    estado['versao'] += '-nova'
+    status, novos, corpo = consultar(instancia, '/api/versao', **{'If-None-Match': cabecalhos['ETag']})
+    assert status == 200
+    assert novos['ETag'] != cabecalhos['ETag']
+    assert json.loads(corpo)['versao'] == estado['versao']
+
+
+def test_etag_depende_da_consulta(servidor):
+    instancia, _ = servidor
+    _, a, _ = consultar(instancia, '/api/generos?limite=2')
+    _, b, _ = consultar(instancia, '/api/generos?limite=3')
+    _, c, _ = consultar(instancia, '/api/generos/?limite=2')
+    assert a['ETag'] != b['ETag']
+    assert a['ETag'] == c['ETag']
+
+
+def test_resposta_comprimida_com_gzip(servidor):
+    instancia, _ = servidor
+    nome = quote('Artista 1')
+    _, _, simples = consultar(instancia, f'/api/artistas/{nome}')
+    status, cabecalhos, comprimido = consultar(instancia, f'/api/artistas/{nome}', **{'Accept-Encoding': 'gzip'})
+
+    assert len(simples) >= api.GZIP_MINIMO
+    assert status == 200
+    assert cabecalhos['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(comprimido) == simples
+
+
+def test_artista_pelo_nome_padronizado(servidor, dataset):
+    instancia, _ = servidor
+    # Nomes com símbolos e caixa diferentes viram o mesmo artista no dashboard
+    dataset.loc[dataset['artist_name'] == 'Artista 1', 'artist_name'] = '*artista 1*'
+    dataset.loc[dataset['artist_name'] == 'Artista 2', 'artist_name'] = '*artista 1'
+    musicas = int(dataset['artist_name'].str.startswith('*artista 1').sum())
+
+    for nome in ('Artista 1', '*artista 1*'):
+        status, _, corpo = consultar(instancia, f'/api/artistas/{quote(nome)}')
+        assert status == 200
+        assert json.loads(corpo)['artista'] == 'Artista 1'
+        assert json.loads(corpo)['musicas'] == musicas
+
+
+@pytest.mark.parametrize('caminho, status', [
+    ('/api/inexistente', 404),
+    ('/api/artistas/Ninguém', 404),
+    ('/api/generos?limite=abc', 400),
+    ('/api/generos?limite=0', 400),
+])
+def test_erros_sem_etag(servidor, caminho, status):
+    instancia, _ = servidor
+    recebido, cabecalhos, corpo = consultar(instancia, quote(caminho, safe='/?='))
+    assert recebido == status
+    assert 'ETag' not in cabecalhos
+    assert 'erro' in json.loads(corpo)
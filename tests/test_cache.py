@@ -0,0 +1,165 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from utils import cache as modulo_cache
+from utils.cache import CacheLimitado, aplicar_orcamento_global, cache_limitado, tamanho_bytes
+
+
+@pytest.fixture(autouse=True)
+def caches_isolados(monkeypatch):
+    """Cada teste vê só os caches que criar"""
+    monkeypatch.setattr(modulo_cache, 'CACHES', {})
+    yield
+
+
+def test_lru_por_quantidade_de_entradas():
+    cache = CacheLimitado('teste', max_entradas=2)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    cache.obter('a')
+    cache.guardar('c', 3)
+
+    assert cache.contem('a') and cache.contem('c') and not cache.contem('b')
+    assert cache.despejos == 1
+
+
+def test_lru_por_bytes():
+    df = pd.DataFrame({'x': range(1000)})
+    cache = CacheLimitado('teste', max_bytes=int(tamanho_bytes(df) * 2.5))
+    for chave in 'abc':
+        cache.guardar(chave, df)
+    assert not cache.contem('a') and cache.contem('b') and cache.contem('c')
+
+
+def test_valor_maior_que_o_limite_e_recusado_com_aviso(caplog):
+    cache = CacheLimitado('teste', max_bytes=10)
+    cache.guardar('a', pd.DataFrame({'x': range(1000)}))
+
+    assert not cache.contem('a')
+    assert cache.recusados == 1 and cache.despejos == 0
+    assert 'não guardado' in caplog.text
+
+
+def test_sem_limite_de_bytes_guarda_valores_grandes():
+    cache = CacheLimitado('teste', max_bytes=None)
+    cache.guardar('a', pd.DataFrame({'x': range(100_000)}))
+    assert cache.contem('a')
+
+
+def test_ttl():
+    cache = CacheLimitado('teste', ttl=0.05)
+    cache.guardar('a', 1)
+    time.sleep(0.1)
+    assert cache.obter('a') == (False, None)
+    assert cache.expirados == 1
+
+
+def test_orcamento_global_despeja_o_menos_recente_entre_caches():
+    df = pd.DataFrame({'x': range(1000)})
+    tamanho = tamanho_bytes(df)
+    primeiro, segundo = CacheLimitado('primeiro'), CacheLimitado('segundo')
+    fixo = CacheLimitado('fixo', fixo=True)
+    modulo_cache.CACHES.update({c.nome: c for c in (primeiro, segundo, fixo)})
+
+    fixo.guardar('dataset', df)
+    primeiro.guardar('a', df)
+    segundo.guardar('b', df)
+    primeiro.obter('a')
+    aplicar_orcamento_global(orcamento=int(tamanho * 2.5))
+
+    # 'b' era a entrada menos recente fora do cache fixo
+    assert fixo.contem('dataset') and primeiro.contem('a') and not segundo.contem('b')
+
+
+def test_decorador_copia_e_conta_acertos():
+    chamadas = []
+
+    @cache_limitado
+    def dobrar(df):
+        chamadas.append(1)
+        return df * 2
+
+    df = pd.DataFrame({'x': [1, 2]})
+    resultado = dobrar(df)
+    resultado.loc[0, 'x'] = 99
+    assert dobrar(df)['x'].tolist() == [2, 4]
+    assert len(chamadas) == 1
+    assert dobrar.cache.acertos == 1 and dobrar.em_cache(df)
+    assert modulo_cache.CACHES[dobrar.cache.nome] is dobrar.cache
+
+
+def test_falhas_simultaneas_calculam_uma_vez():
+    chamadas = []
+    inicio = threading.Barrier(8)
+
+    @cache_limitado(copiar=False)
+    def lento(x):
+        chamadas.append(x)
+        time.sleep(0.2)
+        return x * 10
+
+    def sessao():
+        inicio.wait()
+        return lento(3)
+
+    threads_resultados = []
+    threads = [threading.Thread(target=lambda: threads_resultados.append(sessao())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert threads_resultados == [30] * 8
+    assert len(chamadas) == 1
+    assert lento.cache.esperas + lento.cache.acertos == 7
+
+
+def test_erro_do_calculo_chega_a_quem_espera():
+    cache = CacheLimitado('teste')
+    liberar = threading.Event()
+    erros = []
+
+    def falhar():
+        liberar.wait()
+        raise ValueError('falhou')
+
+    def consultar(calcular):
+        try:
+            cache.obter_ou_calcular('a', calcular)
+        except ValueError as erro:
+            erros.append(erro)
+
+    lider = threading.Thread(target=consultar, args=(falhar,))
+    lider.start()
+    while not cache._em_calculo:
+        time.sleep(0.001)
+    seguidor = threading.Thread(target=consultar, args=(lambda: 1,))
+    seguidor.start()
+    while cache.esperas == 0:
+        time.sleep(0.001)
+    liberar.set()
+    lider.join()
+    seguidor.join()
+
+    # O seguidor recebe a exceção do líder em vez de calcular de novo
+    assert len(erros) == 2 and not cache.contem('a')
+
+
+def test_funcao_redefinida_reaproveita_o_cache():
+    # Como uma função decorada dentro de uma página, redefinida a cada rerun
+    chamadas = []
+
+    def definir():
+        @cache_limitado
+        def quadrado(x):
+            chamadas.append(x)
+            return x * x
+        return quadrado
+
+    assert definir()(3) == 9
+    assert definir()(3) == 9
+    assert chamadas == [3]
+    assert len([nome for nome in modulo_cache.CACHES if nome.endswith('quadrado')]) == 1
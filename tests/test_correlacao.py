@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+import utils.correlacao as correlacao
+from utils.correlacao import VARIAVEIS_CORRELACAO, correlacoes_bootstrap, postos_medios, tamanho_lote
+
+
+def test_tamanho_lote_respeita_o_orcamento():
+    por_reamostra = 10_000 * 8 * (correlacao.ARRAYS_POR_LINHA + correlacao.ARRAYS_POR_COLUNA * 4)
+    lote = tamanho_lote(10_000, 4, 500, orcamento=64 * por_reamostra, trabalhadores=2)
+    assert lote == 32
+    assert tamanho_lote(10_000_000, 4, 500, orcamento=1024, trabalhadores=4) == 1
+    # Nunca maior que a parte de cada thread
+    assert tamanho_lote(100, 4, 500, orcamento=1024 ** 3, trabalhadores=4) == 125
+
+
+def test_postos_medios_iguais_ao_rank_do_pandas():
+    valores = np.array([3.0, 1.0, 3.0, 2.0, 5.0, 1.0])
+    _, codigos = np.unique(valores, return_inverse=True)
+    indices = np.random.default_rng(0).integers(0, len(valores), size=(4, len(valores)))
+
+    postos = postos_medios(codigos, int(codigos.max()) + 1, indices)
+    esperados = np.stack([pd.Series(valores[linha]).rank().to_numpy() for linha in indices])
+    assert np.allclose(postos, esperados)
+
+
+def test_resultado_nao_depende_do_lote(dataset, monkeypatch):
+    referencia = correlacoes_bootstrap.__wrapped__(dataset, VARIAVEIS_CORRELACAO, n_bootstrap=60)
+    monkeypatch.setattr(correlacao, 'tamanho_lote', lambda *args: 7)
+    outro = correlacoes_bootstrap.__wrapped__(dataset, VARIAVEIS_CORRELACAO, n_bootstrap=60)
+
+    for limite in ('inferior', 'superior'):
+        for metodo in ('pearson', 'spearman'):
+            pd.testing.assert_frame_equal(referencia[limite][metodo], outro[limite][metodo])
+    pd.testing.assert_frame_equal(referencia['matrizes']['spearman'],
+                                  dataset[VARIAVEIS_CORRELACAO].corr(method='spearman'))
@@ -0,0 +1,105 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from utils.carrega_dados import analisar_coocorrencia, contar_generos
+from utils.dag import GRAFO, GrafoDerivados, derivado
+
+_nomes = itertools.count()
+
+
+@pytest.fixture
+def grafo():
+    """Fonte -> (soma, dobro da soma) e fonte -> contagem, com as chamadas de cada nó"""
+    grafo = GrafoDerivados(f'teste{next(_nomes)}')
+    grafo.fonte('dados')
+    grafo.projecao('valores', 'dados', ['valor'])
+    grafo.projecao('grupos', 'dados', ['grupo'])
+
+    @grafo.no('soma', ['valores'])
+    def _soma(valores):
+        return int(valores['valor'].sum())
+
+    @grafo.no('dobro', ['soma'])
+    def _dobro(soma):
+        return 2 * soma
+
+    @grafo.no('contagem', ['grupos'])
+    def _contagem(grupos):
+        return grupos['grupo'].value_counts().to_dict()
+
+    return grafo
+
+
+def dados(valores, grupos):
+    return pd.DataFrame({'valor': valores, 'grupo': grupos})
+
+
+def test_avaliacao_preguicosa(grafo):
+    assert grafo.avaliar('dobro', dados=dados([1, 2], ['a', 'b'])) == 6
+    assert grafo.execucoes['soma'] == 1
+    assert grafo.execucoes['contagem'] == 0
+
+
+def test_mudar_uma_coluna_recalcula_so_os_nos_dela(grafo):
+    grafo.avaliar('dobro', dados=dados([1, 2], ['a', 'b']))
+    grafo.avaliar('contagem', dados=dados([1, 2], ['a', 'b']))
+
+    assert grafo.avaliar('contagem', dados=dados([5, 7], ['a', 'b'])) == {'a': 1, 'b': 1}
+    assert grafo.avaliar('dobro', dados=dados([5, 7], ['a', 'b'])) == 24
+    assert grafo.execucoes['contagem'] == 1
+    assert grafo.execucoes['soma'] == 2
+    assert grafo.execucoes['dobro'] == 2
+
+
+def test_corte_antecipado_quando_o_resultado_nao_muda(grafo):
+    grafo.avaliar('dobro', dados=dados([1, 2], ['a', 'b']))
+    # Valores diferentes com a mesma soma: 'dobro' não é recalculado
+    assert grafo.avaliar('dobro', dados=dados([2, 1], ['a', 'b'])) == 6
+    assert grafo.execucoes['soma'] == 2
+    assert grafo.execucoes['dobro'] == 1
+
+
+def test_nova_versao_recalcula_o_no(grafo):
+    entrada = dados([1, 2], ['a', 'b'])
+    grafo.avaliar('dobro', dados=entrada)
+    grafo.avaliar('contagem', dados=entrada)
+
+    assert grafo.dependentes('soma') == ['dobro']
+    grafo.definir_versao('soma', 2)
+    grafo.avaliar('dobro', dados=entrada)
+    grafo.avaliar('contagem', dados=entrada)
+    # A soma é refeita; como o resultado não mudou, o dobro continua valendo
+    assert (grafo.execucoes['soma'], grafo.execucoes['dobro'], grafo.execucoes['contagem']) == (2, 1, 1)
+
+    grafo.definir_versao('dobro', 2)
+    grafo.avaliar('dobro', dados=entrada)
+    assert (grafo.execucoes['soma'], grafo.execucoes['dobro']) == (2, 2)
+
+
+def test_valor_despejado_e_recalculado(grafo):
+    entrada = dados([1, 2], ['a', 'b'])
+    grafo.avaliar('dobro', dados=entrada)
+    grafo._cache.limpar()
+
+    assert grafo.avaliar('dobro', dados=entrada) == 6
+    assert grafo.execucoes['dobro'] == 2
+
+
+def test_nos_de_generos_iguais_as_funcoes_do_motor(dataset):
+    pd.testing.assert_frame_equal(derivado('contagem_generos', dataset), contar_generos(dataset))
+    pd.testing.assert_frame_equal(derivado('coocorrencia_generos', dataset), analisar_coocorrencia(dataset))
+
+
+def test_popularidade_nao_recalcula_os_generos(dataset):
+    derivado('contagem_generos', dataset)
+    antes = GRAFO.execucoes['contagem_generos']
+
+    alterado = dataset.assign(track_popularity=dataset['track_popularity'] // 2)
+    derivado('contagem_generos', alterado)
+    assert GRAFO.execucoes['contagem_generos'] == antes
+
+    generos = dataset.assign(artist_genres=dataset['artist_genres'].str.replace('jazz', 'blues'))
+    assert 'blues' in derivado('contagem_generos', generos)['Genero'].tolist()
+    assert GRAFO.execucoes['contagem_generos'] == antes + 1
@@ -0,0 +1,35 @@
+import threading
+
+from utils.estatisticas_rapidas import gravar_estatisticas_rapidas, ler_estatisticas_rapidas
+
+
+def test_sidecar_da_versao(dataset, tmp_path):
+    caminho = str(tmp_path / 'estatisticas.json')
+    gravar_estatisticas_rapidas(dataset, 'v1', caminho=caminho)
+
+    estatisticas = ler_estatisticas_rapidas('v1', caminho=caminho)
+    assert estatisticas['metricas']['linhas'] == len(dataset)
+    assert sum(estatisticas['graficos']['musicas_por_tipo_album'].values()) == len(dataset)
+    assert ler_estatisticas_rapidas('v2', caminho=caminho) is None
+
+
+def test_gravacoes_simultaneas_nao_corrompem_o_sidecar(dataset, tmp_path):
+    caminho = str(tmp_path / 'estatisticas.json')
+    erros = []
+
+    def gravar(origem):
+        try:
+            for _ in range(5):
+                gravar_estatisticas_rapidas(dataset, origem, caminho=caminho)
+        except Exception as erro:
+            erros.append(erro)
+
+    threads = [threading.Thread(target=gravar, args=(f'v{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not erros
+    assert any(ler_estatisticas_rapidas(f'v{i}', caminho=caminho) for i in range(4))
+    assert [p.name for p in tmp_path.iterdir()] == ['estatisticas.json']
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import gerar_dataset
+from utils.filtros import _indexar, aplicar_filtros, construir_bitmaps, filtros_ativos
+
+
+def mascara_pandas(df, filtros):
+    """Mesma seleção dos filtros globais, com máscaras do pandas"""
+    mascara = pd.Series(True, index=df.index)
+    if filtros.get('filtro_tipos_album'):
+        mascara &= df['album_type'].isin(filtros['filtro_tipos_album'])
+    if filtros.get('filtro_explicit'):
+        mascara &= df['explicit'].isin(filtros['filtro_explicit'])
+    if filtros.get('filtro_generos'):
+        generos = df['artist_genres'].str.split(',').apply(lambda lista: {g.strip() for g in lista})
+        mascara &= generos.apply(lambda g: bool(g & set(filtros['filtro_generos'])))
+    if filtros.get('filtro_anos') is not None:
+        inicio, fim = filtros['filtro_anos']
+        mascara &= df['release_year'].between(inicio, fim).fillna(False)
+    return df[mascara.to_numpy(dtype=bool)]
+
+
+@pytest.mark.parametrize('filtros', [
+    {'filtro_tipos_album': ['single']},
+    {'filtro_explicit': ['Sim'], 'filtro_anos': (1995, 2005)},
+    {'filtro_generos': ['jazz', 'indie pop'], 'filtro_tipos_album': ['album', 'compilation']},
+    {'filtro_generos': ['gênero inexistente']},
+    {'filtro_anos': (2024, 2024), 'filtro_generos': ['rock']},
+])
+def test_filtros_iguais_as_mascaras_do_pandas(dataset, filtros):
+    pd.testing.assert_frame_equal(aplicar_filtros(dataset, filtros), mascara_pandas(dataset, filtros))
+
+
+def test_sem_filtros_retorna_o_proprio_df(dataset):
+    filtros = {'filtro_tipos_album': [], 'filtro_anos': None}
+    assert not filtros_ativos(filtros)
+    assert aplicar_filtros(dataset, filtros) is dataset
+
+
+def test_valores_raros_guardam_posicoes():
+    n = 10_000
+    valores = np.where(np.arange(n) % 1000 == 0, 'raro', 'comum')
+    indice = _indexar(valores, np.arange(n), n)
+
+    assert indice['raro'].dtype == np.int32
+    assert indice['raro'].tolist() == list(range(0, n, 1000))
+    assert indice['comum'].dtype == np.uint8
+    assert indice['comum'].nbytes == n // 8
+
+
+def test_muitos_generos_nao_ocupam_linhas_vezes_generos():
+    df = gerar_dataset(linhas=20_000, semente=3)
+    df['artist_genres'] = [f'gênero {i % 5000}, pop' for i in range(len(df))]
+    indices = construir_bitmaps(df)
+
+    bytes_generos = sum(linhas.nbytes for linhas in indices['genero'].values())
+    assert len(indices['genero']) == 5001
+    assert bytes_generos < 4 * 2 * len(df) + len(df) // 8
+    filtros = {'filtro_generos': ['gênero 7', 'gênero 4999']}
+    pd.testing.assert_frame_equal(aplicar_filtros(df, filtros), mascara_pandas(df, filtros))
@@ -0,0 +1,11 @@
+import utils.payload as payload
+
+
+def test_tamanho_tabela_sem_o_serializador_do_streamlit(dataset, monkeypatch):
+    arrow = payload.tamanho_tabela(dataset)
+    monkeypatch.setattr(payload, 'convert_anything_to_arrow_bytes', None)
+    estimado = payload.tamanho_tabela(dataset)
+
+    # A estimativa pela memória fica na mesma ordem de grandeza e cresce com as linhas
+    assert arrow / 10 < estimado < arrow * 10
+    assert payload.tamanho_tabela(dataset.head(50)) < estimado
@@ -0,0 +1,56 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import RAIZ
+from utils.amostras import construir_amostras
+from utils.busca import construir_indice_busca
+from utils.carrega_dados import assinatura_arquivo
+from utils.correlacao import correlacoes_bootstrap
+from utils.recarga import aquecer_versao
+from utils.similares import construir_indice_similares
+from utils.top_k import construir_indices_top_k
+
+AQUECIDOS = [construir_indices_top_k, construir_indice_busca, construir_indice_similares]
+AMOSTRAGEM = [construir_amostras, correlacoes_bootstrap]
+
+
+@pytest.fixture(scope='module')
+def versao_aquecida():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # O app lê o dataset por caminho relativo à raiz do projeto
+        monkeypatch.chdir(RAIZ)
+        aquecer_versao(assinatura_arquivo())
+        yield
+
+
+def falhas_de(funcoes):
+    return {funcao.__name__: funcao.cache.estatisticas()['falhas'] for funcao in funcoes}
+
+
+@pytest.mark.parametrize('pagina', ['pages/02_Visao_Geral.py', 'pages/03_Analise_por_Artista.py'])
+def test_paginas_usam_os_indices_aquecidos(versao_aquecida, monkeypatch, pagina):
+    monkeypatch.chdir(RAIZ)
+    falhas = falhas_de(AQUECIDOS)
+
+    app = AppTest.from_file(str(RAIZ / pagina), default_timeout=120)
+    app.run()
+
+    assert not app.exception
+    assert falhas_de(AQUECIDOS) == falhas
+
+
+@pytest.mark.parametrize('pagina, chave', [
+    ('pages/04_Popularidade.py', 'popularidade'),
+    ('pages/05_Insights_Avancados.py', 'insights'),
+])
+def test_modo_aproximado_usa_as_amostras_aquecidas(versao_aquecida, monkeypatch, pagina, chave):
+    monkeypatch.chdir(RAIZ)
+    falhas = falhas_de(AMOSTRAGEM)
+
+    app = AppTest.from_file(str(RAIZ / pagina), default_timeout=120)
+    app.session_state[f'modo_aproximado_{chave}'] = True
+    app.run()
+
+    assert not app.exception
+    # O recorte do período (Insights) é feito sobre a amostra da seleção, sem sortear outra
+    assert falhas_de(AMOSTRAGEM) == falhas
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from utils.filtros import aplicar_filtros
+from utils.sketches import HyperLogLog, KLL, mesclar_celulas, resumir_bloco, sketches_por_celula
+
+
+def test_hyperloglog_dentro_do_erro():
+    valores = [f'item {i}' for i in range(50_000)]
+    hll = HyperLogLog().adicionar(valores)
+    assert abs(hll.estimativa() - 50_000) / 50_000 < 3 * hll.erro_relativo
+
+
+def test_hyperloglog_mesclado_igual_ao_da_uniao():
+    a = HyperLogLog().adicionar([f'x{i}' for i in range(3_000)])
+    b = HyperLogLog().adicionar([f'x{i}' for i in range(2_000, 6_000)])
+    uniao = HyperLogLog().adicionar([f'x{i}' for i in range(6_000)])
+    assert np.array_equal(a.mesclar(b).registradores, uniao.registradores)
+
+
+def test_kll_erro_de_posto():
+    valores = np.random.default_rng(1).normal(size=100_000)
+    kll = KLL()
+    for bloco in np.array_split(valores, 10):
+        kll.adicionar(bloco)
+
+    probabilidades = np.array([0.1, 0.25, 0.5, 0.75, 0.9])
+    postos = np.searchsorted(np.sort(valores), kll.quantis(probabilidades)) / len(valores)
+    assert np.all(np.abs(postos - probabilidades) < 2 * kll.erro_rank)
+    assert kll.quantis([0, 1]).tolist() == [valores.min(), valores.max()]
+
+
+def test_celulas_mescladas_respeitam_os_filtros(dataset):
+    celulas = sketches_por_celula(dataset, ['album_type'])
+    filtros = {'filtro_tipos_album': ['album', 'single'], 'filtro_explicit': ['Sim'],
+               'filtro_anos': (2000, 2010)}
+
+    resumo = mesclar_celulas(celulas, filtros)
+    esperado = aplicar_filtros(dataset, filtros)
+    assert resumo['linhas'] == len(esperado)
+    assert resumo['popularidade_max'] == esperado['track_popularity'].max()
+    assert (resumo['ano_min'], resumo['ano_max']) == (esperado['release_year'].min(),
+                                                      esperado['release_year'].max())
+    assert set(resumo['quantis']['album_type']) == {'album', 'single'}
+    assert sum(k.n for k in resumo['quantis']['album_type'].values()) == len(esperado)
+
+
+def test_mesclagem_nao_altera_as_celulas(dataset):
+    celulas = sketches_por_celula(dataset)
+    antes = {celula: resumo['artistas'].registradores.copy() for celula, resumo in celulas.items()}
+    mesclar_celulas(celulas, {})
+    mesclar_celulas(celulas, {})
+    assert all(np.array_equal(celulas[c]['artistas'].registradores, r) for c, r in antes.items())
+
+
+def test_sem_celulas_selecionadas(dataset):
+    assert mesclar_celulas(sketches_por_celula(dataset), {'filtro_anos': (1800, 1801)}) is None
+
+
+def test_resumo_sem_grupos():
+    bloco = pd.DataFrame({'artist_name': ['a', 'b'], 'album_name': ['x', 'x'],
+                          'track_popularity': [10, 20], 'release_year': pd.array([2000, None], dtype='Int16')})
+    resumo = resumir_bloco(bloco)
+    assert resumo['linhas'] == 2 and resumo['ano_min'] == 2000 and resumo['quantis'] == {}
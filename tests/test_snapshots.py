@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import RAIZ
+from utils.snapshots import COLUNAS_CHAVE, comparar_snapshots, internar_chaves
+
+CAMINHO_PRINCIPAL = RAIZ / 'dataset' / 'spotify_data clean.csv'
+
+
+@pytest.fixture(scope='module')
+def csv_principal():
+    # Texto exatamente como no arquivo, para regravar sem alterar os valores
+    return pd.read_csv(CAMINHO_PRINCIPAL, dtype=str, keep_default_na=False)
+
+
+def gravar_amostra(csv, diretorio, fracao=0.9, aumento=0):
+    """Export com parte das músicas (todas as linhas de cada uma) e a popularidade das faixas aumentada"""
+    musica = csv.groupby(COLUNAS_CHAVE, sort=False).ngroup()
+    mantidas = np.random.default_rng(0).random(musica.max() + 1) < fracao
+    amostra = csv[mantidas[musica]].copy()
+    popularidade = pd.to_numeric(amostra['track_popularity']) + aumento
+    amostra['track_popularity'] = popularidade.clip(upper=100).astype(str)
+    caminho = diretorio / 'amostra.csv'
+    amostra.to_csv(caminho, index=False)
+    return str(caminho)
+
+
+def test_internar_chaves_iguais_para_os_mesmos_valores():
+    a = pd.DataFrame({'artist_name': ['x', 'y', None], 'album_name': ['a', 'b', 'c'], 'track_name': ['1', '2', '3']})
+    b = pd.DataFrame({'artist_name': ['y', 'x', 'x'], 'album_name': ['b', 'a', 'b'], 'track_name': ['2', '1', '1']})
+    chave_a, chave_b = internar_chaves(a, b)
+
+    assert chave_a[0] == chave_b[1] and chave_a[1] == chave_b[0]
+    assert len(np.unique(np.concatenate([chave_a, chave_b]))) == 4
+
+
+@pytest.mark.parametrize('aumento', [0, 1])
+def test_amostra_do_dataset_nao_tem_musicas_novas(csv_principal, tmp_path, aumento):
+    amostra = gravar_amostra(csv_principal, tmp_path, aumento=aumento)
+    resumo = comparar_snapshots(str(CAMINHO_PRINCIPAL), amostra)['resumo']
+
+    assert resumo['situacao_musicas'].get('nova', 0) == 0
+    assert resumo['situacao_musicas']['mantida'] == resumo['musicas_depois']
+    assert resumo['situacao_artistas'].get('nova', 0) == 0
+    # Os seguidores não mudaram: artistas mantidos têm delta zero
+    assert resumo['delta_total_seguidores'] == 0
+
+
+def test_popularidade_alterada_aparece_no_delta(csv_principal, tmp_path):
+    amostra = gravar_amostra(csv_principal, tmp_path, aumento=1)
+    musicas = comparar_snapshots(str(CAMINHO_PRINCIPAL), amostra)['musicas']
+
+    mantidas = musicas[musicas['situacao'] == 'mantida']
+    esperado = (mantidas['popularidade_antes'] + 1).clip(upper=100) - mantidas['popularidade_antes']
+    assert (mantidas['delta_popularidade'] == esperado).all()
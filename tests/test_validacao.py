@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+from utils.validacao import MOTIVO_DATA_INVALIDA, validar_dados
+
+
+@pytest.fixture
+def lidos(dataset):
+    """(df convertido, df original) com duplicatas e uma data ilegível"""
+    df = dataset.head(50).copy()
+    df['track_id'] = [f'id{i}' for i in range(len(df))]
+
+    # Mesma música no single (menos popular) e repetição exata de uma linha
+    single = df.iloc[[0]].assign(album_type='single', track_popularity=df['track_popularity'].iloc[0] - 1,
+                                 track_id='id-single')
+    df = pd.concat([df, single, df.iloc[[1]]], ignore_index=True)
+    df.loc[2, 'release_year'] = pd.NA
+    df.loc[2, 'album_release_date'] = pd.NaT
+    return df, df.copy()
+
+
+@pytest.mark.parametrize('politica, duplicadas', [('nenhuma', 0), ('linha', 1), ('faixa', 1), ('musica', 2)])
+def test_politicas_de_deduplicacao(lidos, politica, duplicadas):
+    df, original = lidos
+    validas, resumo = validar_dados(df, original, politica=politica, caminho_quarentena=None)
+
+    assert resumo['linhas_duplicadas'] == duplicadas
+    assert len(validas) == len(df) - duplicadas
+    assert resumo['politica_deduplicacao'] == politica
+
+
+def test_musica_mantem_a_versao_mais_popular(lidos):
+    df, original = lidos
+    validas, _ = validar_dados(df, original, politica='musica', caminho_quarentena=None)
+    linhas = validas[validas['track_name'] == df.loc[0, 'track_name']]
+    assert linhas['album_type'].tolist() == [df.loc[0, 'album_type']]
+
+
+def test_data_ilegivel_mantida_por_padrao(lidos):
+    df, original = lidos
+    validas, resumo = validar_dados(df, original, politica='nenhuma', caminho_quarentena=None,
+                                    rejeitar_datas_invalidas=False)
+    assert validas['release_year'].isna().sum() == 1
+    assert resumo['datas_invalidas_mantidas'] == 1
+    assert MOTIVO_DATA_INVALIDA not in resumo['rejeitadas_por_motivo']
+
+
+def test_data_ilegivel_em_quarentena_quando_pedido(lidos, tmp_path):
+    df, original = lidos
+    caminho = tmp_path / 'quarentena.csv'
+    validas, resumo = validar_dados(df, original, politica='nenhuma', caminho_quarentena=str(caminho),
+                                    rejeitar_datas_invalidas=True)
+
+    assert not validas['release_year'].isna().any()
+    assert resumo['rejeitadas_por_motivo'] == {MOTIVO_DATA_INVALIDA: 1}
+    assert pd.read_csv(caminho)['motivo'].tolist() == [MOTIVO_DATA_INVALIDA]
+
+
+def test_politica_desconhecida(lidos):
+    with pytest.raises(ValueError):
+        validar_dados(*lidos, politica='album', caminho_quarentena=None)
+
+
+def test_seguidores_ausentes_nao_sao_rejeitados(lidos):
+    df, original = lidos
+    df.loc[3, 'artist_followers'] = None
+    df.loc[4, 'artist_followers'] = -1
+    validas, resumo = validar_dados(df, original, politica='nenhuma', caminho_quarentena=None)
+
+    assert resumo['rejeitadas_por_motivo'] == {'seguidores negativos': 1}
+    assert 3 in validas.index and 4 not in validas.index
+    assert resumo['nulos_por_coluna']['artist_followers'] == 1
+
+
+def test_duracao_longa_e_valida(lidos):
+    df, original = lidos
+    df.loc[3, 'track_duration_min'] = 0
+    df.loc[4, 'track_duration_min'] = 300
+    validas, resumo = validar_dados(df, original, politica='nenhuma', caminho_quarentena=None)
+
+    assert resumo['rejeitadas_por_motivo'] == {'duração ausente ou não positiva': 1}
+    assert 4 in validas.index
+
+
+def test_quarentena_nao_gravada_por_padrao(lidos, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'dataset').mkdir()
+    _, resumo = validar_dados(*lidos, politica='musica')
+
+    assert resumo['arquivo_quarentena'] is None
+    assert not (tmp_path / 'dataset' / 'quarentena.csv').exists()
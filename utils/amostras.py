@@ -0,0 +1,232 @@
+"""
+Modo aproximado: amostras estratificadas com intervalos de confiança.
+
+O dataset é dividido em estratos (tipo de álbum x década de lançamento x
+segmento estratégico) e, para cada tamanho de TAMANHOS_AMOSTRA, sorteia-se
+uma amostra com alocação proporcional (mínimo de 2 músicas por estrato, para
+que a variância possa ser estimada). Por causa desse mínimo a amostra não é
+autoponderada: estratos pequenos ficam sobrerrepresentados, e só os
+estimadores abaixo usam a coluna peso. Gráficos e correlações calculados
+direto sobre as linhas sorteadas são descritivos da amostra.
+
+Médias, proporções e contagens por grupo usam os estimadores do desenho
+estratificado, com a variância por linearização e o fator de correção de
+população finita. Quando a amostra inclui o estrato inteiro, a variância
+daquele estrato é zero.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.cache import cache_limitado
+from utils.carrega_dados import classificar_segmento
+
+TAMANHOS_AMOSTRA = (1_000, 5_000, 20_000, 100_000, 500_000)
+MINIMO_POR_ESTRATO = 2
+NIVEL_CONFIANCA = 0.95
+
+
+# =============================================
+# AMOSTRAGEM
+# =============================================
+
+def estratos_de(df):
+    """Código do estrato de cada linha (tipo de álbum x década x segmento)"""
+    decada = (df['release_year'] // 10 * 10).astype('float64').fillna(-1).to_numpy()
+    chaves = pd.DataFrame({
+        'album_type': df['album_type'].fillna('desconhecido').to_numpy(),
+        'decada': decada,
+        'segmento': classificar_segmento(df).to_numpy(),
+    })
+    return chaves.groupby(['album_type', 'decada', 'segmento'], sort=False).ngroup().to_numpy()
+
+
+def _alocar(tamanhos_estratos, tamanho):
+    """Alocação proporcional, com o mínimo por estrato e sem passar do tamanho de cada estrato"""
+    proporcional = np.rint(tamanho * tamanhos_estratos / tamanhos_estratos.sum()).astype(np.int64)
+    return np.minimum(np.maximum(proporcional, MINIMO_POR_ESTRATO), tamanhos_estratos)
+
+
+@cache_limitado(max_entradas=8, copiar=False)
+def construir_amostras(df, semente=0):
+    """
+    Amostras estratificadas de cada tamanho menor que o dataset.
+
+    Retorna {tamanho: amostra}, onde cada amostra é um dicionário com
+    'dados' (as linhas sorteadas, com as colunas _estrato e peso),
+    'estratos' (N e n de cada estrato) e 'populacao'. Somente leitura.
+    """
+    estrato = estratos_de(df)
+    tamanhos_estratos = np.bincount(estrato)
+
+    # Uma única ordem aleatória: a amostra de cada tamanho pega as primeiras
+    # linhas de cada estrato, então as amostras menores estão contidas nas maiores
+    ordem = np.lexsort((np.random.default_rng(semente).random(len(df)), estrato))
+    posicao_no_estrato = np.empty(len(df), dtype=np.int64)
+    inicio_estrato = np.concatenate([[0], np.cumsum(tamanhos_estratos)[:-1]])
+    posicao_no_estrato[ordem] = np.arange(len(df)) - inicio_estrato[estrato[ordem]]
+
+    amostras = {}
+    for tamanho in TAMANHOS_AMOSTRA:
+        if tamanho >= len(df):
+            break
+        alocados = _alocar(tamanhos_estratos, tamanho)
+        selecionadas = np.flatnonzero(posicao_no_estrato < alocados[estrato])
+
+        dados = df.iloc[selecionadas].assign(
+            _estrato=estrato[selecionadas],
+            peso=(tamanhos_estratos / np.maximum(alocados, 1))[estrato[selecionadas]],
+        )
+        amostras[tamanho] = {
+            'dados': dados,
+            'estratos': pd.DataFrame({'N': tamanhos_estratos, 'n': alocados}),
+            'populacao': len(df),
+        }
+    return amostras
+
+
+# =============================================
+# ESTIMADORES
+# =============================================
+
+def _grupos(amostra, por):
+    """Rótulo de grupo de cada linha; NaN exclui a linha de todos os grupos"""
+    if por is None:
+        return np.zeros(len(amostra['dados']))
+    if isinstance(por, str):
+        return amostra['dados'][por].to_numpy()
+    return np.asarray(por)
+
+
+def _totais(amostra, valores, grupos):
+    """
+    Total estimado de 'valores' em cada grupo e sua variância.
+
+    Em cada estrato h: total = N_h * média e
+    variância = N_h² (1 - n_h/N_h) s²_h / n_h, onde s²_h considera as linhas
+    do estrato fora do grupo como zero.
+    """
+    dados = pd.DataFrame({
+        'grupo': grupos,
+        'estrato': amostra['dados']['_estrato'].to_numpy(),
+        'u': valores,
+        'u2': valores * valores,
+    })
+    somas = dados.groupby(['grupo', 'estrato'], sort=True)[['u', 'u2']].sum()
+
+    estratos = somas.index.get_level_values('estrato')
+    N = amostra['estratos']['N'].to_numpy(dtype=float)[estratos]
+    n = amostra['estratos']['n'].to_numpy(dtype=float)[estratos]
+
+    s2 = (somas['u2'] - somas['u'] ** 2 / n) / np.maximum(n - 1, 1)
+    resultado = pd.DataFrame({
+        'total': N / n * somas['u'],
+        'variancia': N ** 2 * (1 - n / N) * s2.clip(lower=0) / n,
+    }, index=somas.index)
+    return resultado.groupby(level='grupo').sum()
+
+
+def _intervalo(estimativa, variancia, n_amostra, nivel):
+    z = NormalDist().inv_cdf(0.5 + nivel / 2)
+    erro_padrao = np.sqrt(variancia)
+    return pd.DataFrame({
+        'estimativa': estimativa,
+        'erro_padrao': erro_padrao,
+        'margem': z * erro_padrao,
+        'inferior': estimativa - z * erro_padrao,
+        'superior': estimativa + z * erro_padrao,
+        'n_amostra': n_amostra,
+    })
+
+
+def estimar_contagens(amostra, por=None, nivel=NIVEL_CONFIANCA):
+    """Quantidade estimada de músicas em cada grupo, com intervalo de confiança"""
+    grupos = _grupos(amostra, por)
+    totais = _totais(amostra, np.ones(len(grupos)), grupos)
+    n_amostra = pd.Series(grupos).value_counts().reindex(totais.index)
+    return _intervalo(totais['total'], totais['variancia'], n_amostra, nivel)
+
+
+def estimar_medias(amostra, coluna, por=None, nivel=NIVEL_CONFIANCA):
+    """
+    Média estimada da coluna em cada grupo (estimador de razão), com
+    intervalo de confiança pela variância linearizada.
+    """
+    grupos = _grupos(amostra, por)
+    valores = pd.to_numeric(amostra['dados'][coluna], errors='coerce').to_numpy(dtype=float)
+    validos = ~np.isnan(valores)
+    if not validos.all():
+        # Valor ausente: a linha fica fora de todos os grupos
+        grupos = np.where(validos, grupos, None)
+    valores = np.nan_to_num(valores)
+
+    peso = amostra['dados']['peso'].to_numpy()
+    rotulos = pd.Series(grupos)
+    em_grupo = rotulos.notna().to_numpy()
+
+    soma_pesos = pd.Series(peso[em_grupo]).groupby(rotulos[em_grupo].to_numpy()).sum()
+    soma_valores = pd.Series((peso * valores)[em_grupo]).groupby(rotulos[em_grupo].to_numpy()).sum()
+    medias = soma_valores / soma_pesos
+
+    # Variável linearizada: (y - média do grupo) / tamanho estimado do grupo
+    media_da_linha = rotulos.map(medias).to_numpy(dtype=float)
+    tamanho_da_linha = rotulos.map(soma_pesos).to_numpy(dtype=float)
+    linearizada = np.where(em_grupo, (valores - media_da_linha) / tamanho_da_linha, 0.0)
+
+    variancias = _totais(amostra, linearizada, grupos)['variancia'].reindex(medias.index)
+    n_amostra = rotulos.value_counts().reindex(medias.index)
+    return _intervalo(medias, variancias, n_amostra, nivel)
+
+
+def estimar_proporcoes(amostra, condicao, por=None, nivel=NIVEL_CONFIANCA):
+    """Proporção estimada (0 a 1) das linhas que atendem à condição em cada grupo"""
+    dados = amostra['dados'].assign(_condicao=np.asarray(condicao, dtype=float))
+    return estimar_medias({**amostra, 'dados': dados}, '_condicao', por, nivel)
+
+
+# =============================================
+# CONTROLES DAS PÁGINAS
+# =============================================
+
+def _calcular_exato(chave):
+    st.session_state[chave] = False
+
+
+def controles_modo_aproximado(df, pagina):
+    """
+    Chave do modo aproximado e tamanho da amostra na barra lateral. Retorna
+    a amostra escolhida, ou None quando os cálculos devem ser exatos.
+    """
+    chave = f'modo_aproximado_{pagina}'
+    ativo = st.sidebar.toggle(
+        '⚡ Modo aproximado (amostras)', key=chave,
+        help='Calcula sobre uma amostra estratificada, com intervalos de confiança de 95%'
+    )
+    if not ativo:
+        return None
+
+    amostras = construir_amostras(df)
+    if not amostras:
+        st.sidebar.caption('A seleção é menor que a menor amostra: resultados exatos.')
+        return None
+
+    tamanhos = list(amostras)
+    tamanho = tamanhos[0]
+    if len(tamanhos) > 1:
+        tamanho = st.sidebar.select_slider(
+            'Tamanho da amostra', options=tamanhos, key=f'{chave}_tamanho', format_func='{:,}'.format
+        )
+    amostra = amostras[tamanho]
+
+    col_aviso, col_botao = st.columns([4, 1])
+    with col_aviso:
+        st.info(
+            f"⚡ **Modo aproximado:** resultados sobre uma amostra estratificada de "
+            f"{len(amostra['dados']):,} de {amostra['populacao']:,} músicas, "
+            f"com intervalos de confiança de {NIVEL_CONFIANCA:.0%}."
+        )
+    with col_botao:
+        st.button('🎯 Calcular exato', key=f'{chave}_exato', on_click=_calcular_exato, args=(chave,))
+    return amostra
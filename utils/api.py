@@ -0,0 +1,318 @@
+"""
+Serviço HTTP/JSON local com os agregados do dashboard.
+
+Outras ferramentas consultam os mesmos números das páginas (rankings,
+estatísticas de gêneros, tendências anuais e resumo de artistas) sem abrir
+uma sessão do Streamlit. O serviço usa a camada de dados e os caches do
+processo em que roda:
+
+- as requisições são atendidas por um pool fixo de threads;
+- cada resposta tem um ETag derivado da versão do dataset e da consulta, e
+  um If-None-Match igual devolve 304 sem recalcular nada;
+- com Accept-Encoding: gzip, corpos maiores que GZIP_MINIMO vão comprimidos.
+
+Dentro do app, o serviço sobe com a variável de ambiente API_DADOS_PORTA.
+Fora dele, use scripts/servidor_api.py.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+from utils.cache import CACHES, CacheLimitado, cache_limitado
+from utils.carrega_dados import (analisar_coocorrencia, dados_compartilhados, explodir_generos, limpar_nomes_artistas,
+                                 versao_ativa)
+from utils.dag import derivado
+from utils.top_k import (ESCOPOS, METRICAS_ARTISTA, METRICAS_MUSICA, TOP_K_PADRAO, construir_indices_top_k,
+                         consultar_top_k)
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8765
+TRABALHADORES_PADRAO = 8
+GZIP_MINIMO = 1024  # bytes
+
+logger = logging.getLogger(__name__)
+
+# Respostas prontas (corpo JSON e versão comprimida) por ETag
+_respostas = CacheLimitado('utils.api.respostas', max_entradas=512, max_bytes=64 * 1024 * 1024)
+CACHES[_respostas.nome] = _respostas
+
+_servidor = {'instancia': None}
+_trava_servidor = threading.Lock()
+
+
+class ErroConsulta(Exception):
+    """Consulta inválida (400) ou recurso inexistente (404)"""
+
+    def __init__(self, mensagem, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(mensagem)
+        self.status = status
+
+
+# =============================================
+# AGREGADOS
+# =============================================
+
+def _dados(versao):
+    return dados_compartilhados(versao)
+
+
+def _registros(df):
+    """Linhas do DataFrame como lista de dicionários prontos para JSON"""
+    return json.loads(df.to_json(orient='records', date_format='iso', force_ascii=False))
+
+
+def _inteiro(parametros, nome, padrao, minimo=1, maximo=1000):
+    try:
+        valor = int(parametros.get(nome, padrao))
+    except ValueError:
+        raise ErroConsulta(f'Parâmetro {nome!r} deve ser inteiro')
+    if not minimo <= valor <= maximo:
+        raise ErroConsulta(f'Parâmetro {nome!r} deve estar entre {minimo} e {maximo}')
+    return valor
+
+
+def _opcao(parametros, nome, padrao, opcoes):
+    valor = parametros.get(nome, padrao)
+    if valor not in opcoes:
+        raise ErroConsulta(f'Parâmetro {nome!r} deve ser um de: {", ".join(map(str, opcoes))}')
+    return valor
+
+
+@cache_limitado(max_entradas=4)
+def estatisticas_generos(df):
+    """Músicas, artistas, popularidade média e seguidores médios de cada gênero"""
+    generos = explodir_generos(df)
+    linhas = df.loc[generos.index, ['artist_name', 'track_popularity', 'artist_followers']]
+    estatisticas = linhas.assign(genero=generos.to_numpy()).groupby('genero').agg(
+        musicas=('artist_name', 'size'),
+        artistas=('artist_name', 'nunique'),
+        popularidade_media=('track_popularity', 'mean'),
+        seguidores_medios=('artist_followers', 'mean'),
+    )
+    return estatisticas.sort_values('musicas', ascending=False, kind='stable').reset_index()
+
+
+def rota_versao(versao, parametros):
+    df = _dados(versao)
+    return {'versao': versao, 'musicas': len(df), 'artistas': int(df['artist_name'].nunique())}
+
+
+def rota_top_artistas(versao, parametros):
+    escopo = _opcao(parametros, 'escopo', 'global', ESCOPOS)
+    metrica = _opcao(parametros, 'metrica', 'popularidade', list(METRICAS_ARTISTA))
+    valor = parametros.get('valor', 'Todos')
+    if escopo == 'ano':
+        valor = _inteiro(parametros, 'valor', 0, minimo=0, maximo=9999)
+
+    indices = construir_indices_top_k(_dados(versao))
+    ranking = consultar_top_k(indices, 'artistas', metrica, escopo, valor, n=_inteiro(parametros, 'n', 10, maximo=TOP_K_PADRAO))
+    return {'escopo': escopo, 'valor': valor, 'metrica': metrica, 'artistas': _registros(ranking)}
+
+
+def rota_top_musicas(versao, parametros):
+    escopo = _opcao(parametros, 'escopo', 'global', ESCOPOS)
+    metrica = _opcao(parametros, 'metrica', 'popularidade', list(METRICAS_MUSICA))
+    valor = parametros.get('valor', 'Todos')
+    if escopo == 'ano':
+        valor = _inteiro(parametros, 'valor', 0, minimo=0, maximo=9999)
+
+    indices = construir_indices_top_k(_dados(versao))
+    ranking = consultar_top_k(indices, 'musicas', metrica, escopo, valor, n=_inteiro(parametros, 'n', 10, maximo=TOP_K_PADRAO))
+    return {'escopo': escopo, 'valor': valor, 'metrica': metrica, 'musicas': _registros(ranking)}
+
+
+def rota_generos(versao, parametros):
+    limite = _inteiro(parametros, 'limite', 50, maximo=100_000)
+    return {'generos': _registros(estatisticas_generos(_dados(versao)).head(limite))}
+
+
+def rota_coocorrencia(versao, parametros):
+    minimo = _inteiro(parametros, 'minimo', 5, maximo=100_000)
+    limite = _inteiro(parametros, 'limite', 50, maximo=100_000)
+    return {'minimo': minimo, 'pares': _registros(analisar_coocorrencia(_dados(versao), minimo).head(limite))}
+
+
+def rota_tendencias_anuais(versao, parametros):
+    anos = derivado('agregados_anuais', _dados(versao))
+    colunas = ['release_year', 'musicas', 'media_track_popularity', 'media_track_duration_min',
+               'media_artist_popularity', 'percentual_explicito']
+    return {'anos': _registros(anos[colunas])}
+
+
+def rota_artista(versao, parametros, nome):
+    df = _dados(versao)
+    # Mesmos nomes padronizados do dashboard; o nome pedido também é padronizado,
+    # então o nome original do CSV continua funcionando
+    nome_limpo = limpar_nomes_artistas(pd.Series([nome], dtype='string')).iloc[0]
+    do_artista = derivado('artistas_limpos', df).eq(nome_limpo).fillna(False).to_numpy()
+    df_artista = df[do_artista]
+    if pd.isna(nome_limpo) or df_artista.empty:
+        raise ErroConsulta(f'Artista não encontrado: {nome!r}', HTTPStatus.NOT_FOUND)
+    nome = nome_limpo
+
+    albuns = (
+        df_artista.groupby('album_name')['track_popularity'].agg(['mean', 'size'])
+        .rename(columns={'mean': 'popularidade_media', 'size': 'musicas'})
+        .sort_values('popularidade_media', ascending=False)
+        .reset_index()
+    )
+    lancamentos = df_artista['release_year'].value_counts().sort_index()
+    return {
+        'artista': nome,
+        'seguidores': int(df_artista['artist_followers'].max()),
+        'popularidade': int(df_artista['artist_popularity'].max()),
+        'musicas': len(df_artista),
+        'popularidade_media_musicas': float(df_artista['track_popularity'].mean()),
+        'generos': sorted(explodir_generos(df_artista).unique().tolist()),
+        'top_musicas': _registros(
+            df_artista.nlargest(10, 'track_popularity')[['track_name', 'album_name', 'track_popularity']]
+        ),
+        'albuns': _registros(albuns),
+        'lancamentos_por_ano': {str(int(ano)): int(n) for ano, n in lancamentos.items()},
+    }
+
+
+# Caminho -> função(versao, parametros); /api/artistas/<nome> é tratado à parte
+ROTAS = {
+    '/api/versao': rota_versao,
+    '/api/top-artistas': rota_top_artistas,
+    '/api/top-musicas': rota_top_musicas,
+    '/api/generos': rota_generos,
+    '/api/generos/coocorrencia': rota_coocorrencia,
+    '/api/tendencias-anuais': rota_tendencias_anuais,
+}
+PREFIXO_ARTISTA = '/api/artistas/'
+
+
+def resolver(caminho, parametros, versao):
+    """Objeto JSON da consulta na versão informada"""
+    if caminho.startswith(PREFIXO_ARTISTA):
+        return rota_artista(versao, parametros, unquote(caminho[len(PREFIXO_ARTISTA):]))
+    if caminho not in ROTAS:
+        raise ErroConsulta(f'Rota desconhecida: {caminho}', HTTPStatus.NOT_FOUND)
+    return ROTAS[caminho](versao, parametros)
+
+
+def calcular_etag(versao, caminho, parametros):
+    """ETag fraco da consulta: muda só quando a versão do dataset ou a consulta mudam"""
+    h = hashlib.blake2b(digest_size=12)
+    h.update(json.dumps([versao, caminho, sorted(parametros.items())], ensure_ascii=False).encode())
+    return f'W/"{h.hexdigest()}"'
+
+
+def responder(caminho, parametros, versao, etag):
+    """(corpo JSON, corpo gzip ou None) da consulta, calculados uma vez por ETag"""
+    encontrado, resposta = _respostas.obter(etag)
+    if not encontrado:
+        corpo = json.dumps(resolver(caminho, parametros, versao), ensure_ascii=False).encode()
+        comprimido = gzip.compress(corpo, compresslevel=6) if len(corpo) >= GZIP_MINIMO else None
+        resposta = (corpo, comprimido)
+        _respostas.guardar(etag, resposta)
+    return resposta
+
+
+# =============================================
+# SERVIDOR HTTP
+# =============================================
+
+class ManipuladorApi(BaseHTTPRequestHandler):
+    server_version = 'SpotifyDashboardAPI/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        # Parâmetros repetidos: vale o último
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(url.query).items()}
+        caminho = url.path.rstrip('/') or '/'
+
+        # O ETag só depende da versão e da consulta: 304 sem calcular a resposta
+        versao = versao_ativa()
+        etag = calcular_etag(versao, caminho, parametros)
+        cabecalhos = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding',
+                      'X-Versao-Dataset': versao}
+        if etag in [e.strip() for e in self.headers.get('If-None-Match', '').split(',')]:
+            self._enviar(HTTPStatus.NOT_MODIFIED, b'', cabecalhos)
+            return
+
+        try:
+            corpo, comprimido = responder(caminho, parametros, versao, etag)
+        except ErroConsulta as erro:
+            self._enviar(erro.status, json.dumps({'erro': str(erro)}, ensure_ascii=False).encode())
+            return
+        except Exception:
+            logger.exception('Falha ao responder %s', self.path)
+            self._enviar(HTTPStatus.INTERNAL_SERVER_ERROR, b'{"erro": "erro interno"}')
+            return
+
+        if comprimido is not None and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            corpo = comprimido
+            cabecalhos['Content-Encoding'] = 'gzip'
+        self._enviar(HTTPStatus.OK, corpo, cabecalhos)
+
+    def _enviar(self, status, corpo, cabecalhos=None):
+        self.send_response(status)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if corpo:
+            self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        logger.debug('%s - %s', self.address_string(), formato % args)
+
+
+class ServidorApi(HTTPServer):
+    """HTTPServer que atende cada conexão em um pool fixo de threads"""
+
+    def __init__(self, endereco, trabalhadores=TRABALHADORES_PADRAO):
+        super().__init__(endereco, ManipuladorApi)
+        self.pool = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='api')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+
+def criar_servidor(host=HOST_PADRAO, porta=PORTA_PADRAO, trabalhadores=TRABALHADORES_PADRAO):
+    return ServidorApi((host, porta), trabalhadores)
+
+
+def iniciar_api_em_segundo_plano():
+    """
+    Sobe o serviço em uma thread do processo do app quando API_DADOS_PORTA
+    estiver definida (uma única vez por processo). Assim a API compartilha
+    os caches com as páginas.
+    """
+    porta = os.environ.get('API_DADOS_PORTA')
+    if not porta:
+        return None
+
+    with _trava_servidor:
+        if _servidor['instancia'] is None:
+            servidor = criar_servidor(os.environ.get('API_DADOS_HOST', HOST_PADRAO), int(porta))
+            threading.Thread(target=servidor.serve_forever, name='api-dados', daemon=True).start()
+            _servidor['instancia'] = servidor
+            logger.info('API de dados em http://%s:%s', *servidor.server_address[:2])
+        return _servidor['instancia']
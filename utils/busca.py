@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from utils.cache import cache_limitado
+from utils.carrega_dados import limpar_nomes_artistas
+
+# Fração mínima dos trigramas da consulta que um nome precisa conter
+LIMIAR_TRIGRAMAS = 0.4
+
+RESULTADOS_POR_PAGINA = 20
+
+
+# =============================================
+# NORMALIZAÇÃO E TRIGRAMAS
+# =============================================
+
+def normalizar_nomes(serie):
+    """Remove acentos, converte para minúsculas e compacta espaços"""
+    return (
+        serie.astype(str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.replace(r'[^a-z0-9]+', ' ', regex=True)
+        .str.strip()
+    )
+
+
+def gerar_trigramas(texto, consulta=False):
+    """
+    Trigramas de cada palavra com dois espaços à esquerda e um à direita.
+
+    Na consulta a última palavra não recebe o espaço final, pois o usuário
+    ainda pode estar digitando.
+    """
+    palavras = texto.split()
+    trigramas = set()
+    for i, palavra in enumerate(palavras):
+        final = '' if consulta and i == len(palavras) - 1 else ' '
+        palavra = f'  {palavra}{final}'
+        trigramas.update(palavra[j:j + 3] for j in range(len(palavra) - 2))
+    return trigramas
+
+
+# =============================================
+# CONSTRUÇÃO DO ÍNDICE
+# =============================================
+
+def _itens_por_entidade(df):
+    """Tabela de itens pesquisáveis (nome, detalhe e popularidade) por entidade"""
+    artistas = (
+        df.assign(nome=limpar_nomes_artistas(df['artist_name']))
+        .dropna(subset=['nome'])
+        .groupby('nome', as_index=False)
+        .agg(popularidade=('artist_popularity', 'max'))
+        .assign(detalhe='')
+    )
+
+    albuns = (
+        df.dropna(subset=['album_name'])
+        .groupby(['album_name', 'artist_name'], as_index=False)
+        .agg(popularidade=('track_popularity', 'mean'))
+        .rename(columns={'album_name': 'nome', 'artist_name': 'detalhe'})
+    )
+
+    musicas = (
+        df.groupby(['track_name', 'artist_name'], as_index=False)
+        .agg(popularidade=('track_popularity', 'max'))
+        .rename(columns={'track_name': 'nome', 'artist_name': 'detalhe'})
+    )
+
+    return {'artistas': artistas, 'albuns': albuns, 'musicas': musicas}
+
+
+def _indexar(itens):
+    # Ordenar por popularidade deixa os empates já na ordem de exibição
+    itens = itens.sort_values('popularidade', ascending=False, kind='stable').reset_index(drop=True)
+    chaves = normalizar_nomes(itens['nome'])
+
+    # Índice de prefixo: chaves ordenadas + posição do item correspondente
+    ordem = np.argsort(chaves.to_numpy(dtype=str), kind='stable')
+    chaves_ordenadas = chaves.to_numpy(dtype=str)[ordem]
+
+    # Listas invertidas de trigramas no formato CSR (ponteiros + itens)
+    trigramas = pd.Series([list(gerar_trigramas(c)) for c in chaves]).explode().dropna()
+    codigos, vocabulario = pd.factorize(trigramas, sort=True)
+    ordem_trigramas = np.argsort(codigos, kind='stable')
+    postagens = trigramas.index.to_numpy()[ordem_trigramas]
+    ponteiros = np.concatenate([[0], np.cumsum(np.bincount(codigos, minlength=len(vocabulario)))])
+
+    return {
+        'itens': itens[['nome', 'detalhe', 'popularidade']],
+        'chaves_ordenadas': chaves_ordenadas,
+        'ordem_prefixo': ordem,
+        'vocabulario': pd.Index(vocabulario),
+        'ponteiros': ponteiros,
+        'postagens': postagens,
+    }
+
+
+@cache_limitado(max_entradas=4, copiar=False)
+def construir_indice_busca(df):
+    """
+    Constrói índices de prefixo e de trigramas para nomes de artistas,
+    álbuns e músicas. É somente leitura e compartilhado entre as sessões.
+    """
+    return {entidade: _indexar(itens) for entidade, itens in _itens_por_entidade(df).items()}
+
+
+# =============================================
+# CONSULTA
+# =============================================
+
+def buscar(indice, consulta, entidade='artistas', pagina=0, por_pagina=RESULTADOS_POR_PAGINA):
+    """
+    Busca por prefixo e por trigramas, ordenando por relevância e popularidade.
+
+    Retorna a página de resultados (nome, detalhe, popularidade) e o total
+    de itens encontrados.
+    """
+    idx = indice[entidade]
+    itens = idx['itens']
+    consulta = normalizar_nomes(pd.Series([consulta])).iloc[0]
+
+    # Sem consulta: todos os itens, do mais ao menos popular
+    if not consulta:
+        total = len(itens)
+        inicio = pagina * por_pagina
+        return itens.iloc[inicio:inicio + por_pagina].reset_index(drop=True), total
+
+    relevancia = np.zeros(len(itens))
+
+    # Trigramas: fração dos trigramas da consulta presentes em cada nome
+    trigramas = gerar_trigramas(consulta, consulta=True)
+    codigos = idx['vocabulario'].get_indexer(list(trigramas))
+    codigos = codigos[codigos >= 0]
+    if len(codigos):
+        inicio, fim = idx['ponteiros'][codigos], idx['ponteiros'][codigos + 1]
+        postagens = np.concatenate([idx['postagens'][i:f] for i, f in zip(inicio, fim)])
+        relevancia = np.bincount(postagens, minlength=len(itens)) / len(trigramas)
+        relevancia[relevancia < LIMIAR_TRIGRAMAS] = 0
+
+    # Prefixo do nome completo tem prioridade sobre qualquer trigrama
+    chaves = idx['chaves_ordenadas']
+    de = np.searchsorted(chaves, consulta, side='left')
+    ate = np.searchsorted(chaves, consulta + '\uffff', side='right')
+    relevancia[idx['ordem_prefixo'][de:ate]] += 1
+
+    encontrados = np.flatnonzero(relevancia > 0)
+    # Itens já estão por popularidade; a ordenação estável mantém esse desempate
+    encontrados = encontrados[np.argsort(-relevancia[encontrados].round(2), kind='stable')]
+
+    inicio = pagina * por_pagina
+    pagina_itens = itens.iloc[encontrados[inicio:inicio + por_pagina]].reset_index(drop=True)
+    return pagina_itens, len(encontrados)
@@ -0,0 +1,336 @@
+"""
+Cache de resultados com limites de memória para a camada de dados.
+
+Substitui o @st.cache_data (que cresce sem limite a cada argumento novo)
+por um cache LRU com número máximo de entradas, orçamento em bytes e TTL,
+compartilhado entre as sessões do processo e com contadores de uso.
+
+Além do orçamento de cada cache, há um orçamento global para todos os caches
+do processo (CACHE_ORCAMENTO_MB): ao passar dele, as entradas usadas há mais
+tempo, em qualquer cache, são despejadas. Caches fixos (o dataset de cada
+versão) contam no total, mas não são despejados pelo orçamento global.
+
+Falhas simultâneas da mesma chave são calculadas uma única vez: as outras
+threads esperam o resultado da primeira (single-flight).
+"""
+
+import copy
+import functools
+import hashlib
+import itertools
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRADAS_PADRAO = 32
+MAX_BYTES_PADRAO = 256 * 1024 * 1024
+ORCAMENTO_GLOBAL_BYTES = int(os.environ.get('CACHE_ORCAMENTO_MB', 2048)) * 1024 * 1024
+
+# Todos os caches criados pelo decorador, por nome da função
+CACHES = {}
+_trava_registro = threading.Lock()
+
+# Ordem de uso das entradas entre todos os caches (para o orçamento global)
+_relogio = itertools.count()
+_trava_global = threading.Lock()
+
+# Resultado de um cálculo interrompido (ex.: rerun do Streamlit na thread que calculava)
+_REPETIR = object()
+
+
+# =============================================
+# CHAVES E TAMANHOS
+# =============================================
+
+def _atualizar_hash(h, valor):
+    """Alimenta o hash com o conteúdo do valor (DataFrames são comparados pelo conteúdo)"""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        h.update(type(valor).__name__.encode())
+        h.update(repr(valor.shape).encode())
+        if isinstance(valor, pd.DataFrame):
+            h.update(repr(list(valor.columns)).encode())
+            h.update(repr(list(valor.dtypes.astype(str))).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Colunas com valores não hasheáveis (listas, dicionários)
+            h.update(pickle.dumps(valor))
+    elif isinstance(valor, np.ndarray):
+        h.update(repr((valor.dtype.str, valor.shape)).encode())
+        h.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, (list, tuple)):
+        h.update(f'{type(valor).__name__}{len(valor)}'.encode())
+        for item in valor:
+            _atualizar_hash(h, item)
+    elif isinstance(valor, dict):
+        h.update(f'dict{len(valor)}'.encode())
+        for chave in sorted(valor, key=repr):
+            _atualizar_hash(h, chave)
+            _atualizar_hash(h, valor[chave])
+    else:
+        h.update(repr(valor).encode())
+
+
+def _chave(args, kwargs):
+    h = hashlib.blake2b(digest_size=16)
+    _atualizar_hash(h, args)
+    _atualizar_hash(h, kwargs)
+    return h.hexdigest()
+
+
+def impressao_conteudo(*valores):
+    """Hash do conteúdo dos valores, o mesmo usado nas chaves do cache"""
+    return _chave(valores, {})
+
+
+def tamanho_bytes(valor):
+    """Estimativa do espaço ocupado por um resultado em memória"""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum() if isinstance(valor, pd.DataFrame) else uso)
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanho_bytes(k) + tamanho_bytes(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple, set)):
+        return sys.getsizeof(valor) + sum(tamanho_bytes(v) for v in valor)
+    if hasattr(valor, '__dict__'):
+        return sys.getsizeof(valor) + tamanho_bytes(vars(valor))
+    return sys.getsizeof(valor)
+
+
+# =============================================
+# CACHE LRU
+# =============================================
+
+class CacheLimitado:
+    """Cache LRU com limite de entradas, de bytes e tempo de vida opcional"""
+
+    def __init__(self, nome, max_entradas=MAX_ENTRADAS_PADRAO, max_bytes=MAX_BYTES_PADRAO, ttl=None,
+                 fixo=False):
+        self.nome = nome
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.fixo = fixo
+        self._entradas = OrderedDict()  # chave -> (valor, bytes, criado_em, último uso)
+        self._em_calculo = {}  # chave -> Future do cálculo em andamento
+        self._trava = threading.RLock()
+        self.bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.despejos = 0
+        self.recusados = 0
+        self.esperas = 0
+
+    def _buscar(self, chave):
+        """Entrada válida da chave (renovada no LRU) ou None; chamar com a trava"""
+        entrada = self._entradas.get(chave)
+        if entrada is not None and self.ttl is not None and time.monotonic() - entrada[2] > self.ttl:
+            self._remover(chave)
+            self.expirados += 1
+            return None
+        if entrada is not None:
+            self._entradas[chave] = (*entrada[:3], next(_relogio))
+            self._entradas.move_to_end(chave)
+        return entrada
+
+    def obter(self, chave):
+        """(True, valor) se a chave estiver no cache e dentro do TTL, senão (False, None)"""
+        with self._trava:
+            entrada = self._buscar(chave)
+            if entrada is None:
+                self.falhas += 1
+                return False, None
+            self.acertos += 1
+            return True, entrada[0]
+
+    def contem(self, chave):
+        """Se a chave está no cache (sem contar como consulta nem renovar a entrada)"""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            return entrada is not None and (self.ttl is None or time.monotonic() - entrada[2] <= self.ttl)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """
+        Valor da chave, calculando com calcular() na falha. Se outras threads
+        falharem na mesma chave durante o cálculo, elas esperam o resultado
+        (ou a exceção) da primeira em vez de calcular de novo.
+        """
+        while True:
+            with self._trava:
+                entrada = self._buscar(chave)
+                if entrada is not None:
+                    self.acertos += 1
+                    return entrada[0]
+                calculo = self._em_calculo.get(chave)
+                lider = calculo is None
+                if lider:
+                    calculo = self._em_calculo[chave] = Future()
+                    self.falhas += 1
+                else:
+                    self.esperas += 1
+
+            if not lider:
+                valor = calculo.result()
+                if valor is _REPETIR:
+                    continue
+                return valor
+
+            try:
+                valor = calcular()
+            except Exception as erro:
+                self._encerrar_calculo(chave)
+                calculo.set_exception(erro)
+                raise
+            except BaseException:
+                # A thread foi interrompida (não é um erro do cálculo): quem espera tenta de novo
+                self._encerrar_calculo(chave)
+                calculo.set_result(_REPETIR)
+                raise
+
+            self.guardar(chave, valor)
+            self._encerrar_calculo(chave)
+            calculo.set_result(valor)
+            return valor
+
+    def _encerrar_calculo(self, chave):
+        with self._trava:
+            self._em_calculo.pop(chave, None)
+
+    def guardar(self, chave, valor):
+        tamanho = tamanho_bytes(valor)
+        with self._trava:
+            if chave in self._entradas:
+                self._remover(chave)
+
+            # Resultados maiores que o orçamento inteiro não são guardados
+            if self.max_bytes is not None and tamanho > self.max_bytes:
+                self.recusados += 1
+                logger.warning('Resultado de %.1f MB maior que o limite de %.1f MB do cache %s; não guardado',
+                               tamanho / 1024 ** 2, self.max_bytes / 1024 ** 2, self.nome)
+                return
+
+            self._entradas[chave] = (valor, tamanho, time.monotonic(), next(_relogio))
+            self.bytes += tamanho
+
+            # Despeja os menos usados recentemente até caber nos limites
+            while len(self._entradas) > self.max_entradas or (
+                    self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._remover(next(iter(self._entradas)))
+                self.despejos += 1
+
+        # Fora da trava do cache: o orçamento global trava um cache de cada vez
+        aplicar_orcamento_global()
+
+    def _remover(self, chave):
+        _, tamanho, _, _ = self._entradas.pop(chave)
+        self.bytes -= tamanho
+
+    def _uso_mais_antigo(self):
+        """Último uso da entrada menos recente (None se vazio)"""
+        with self._trava:
+            primeira = next(iter(self._entradas.values()), None)
+            return None if primeira is None else primeira[3]
+
+    def _despejar_mais_antiga(self, uso):
+        """Despeja a entrada menos recente se ela ainda for a mesma (último uso igual)"""
+        with self._trava:
+            chave = next(iter(self._entradas), None)
+            if chave is not None and self._entradas[chave][3] == uso:
+                self._remover(chave)
+                self.despejos += 1
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                'cache': self.nome,
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'mb': self.bytes / 1024 ** 2,
+                'max_mb': None if self.max_bytes is None else self.max_bytes / 1024 ** 2,
+                'fixo': self.fixo,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / consultas if consultas else None,
+                'esperas': self.esperas,
+                'expirados': self.expirados,
+                'despejos': self.despejos,
+                'recusados': self.recusados,
+            }
+
+
+def aplicar_orcamento_global(orcamento=None):
+    """Despeja as entradas menos recentes entre todos os caches não fixos até o total caber no orçamento"""
+    orcamento = ORCAMENTO_GLOBAL_BYTES if orcamento is None else orcamento
+    with _trava_global:
+        while sum(cache.bytes for cache in list(CACHES.values())) > orcamento:
+            candidatos = [(cache._uso_mais_antigo(), cache) for cache in list(CACHES.values()) if not cache.fixo]
+            candidatos = [(uso, cache) for uso, cache in candidatos if uso is not None]
+            if not candidatos:
+                return
+            uso, cache = min(candidatos, key=lambda candidato: candidato[0])
+            cache._despejar_mais_antiga(uso)
+
+
+def cache_limitado(funcao=None, *, max_entradas=MAX_ENTRADAS_PADRAO, max_bytes=MAX_BYTES_PADRAO,
+                   ttl=None, copiar=True, fixo=False):
+    """
+    Decorador de cache com limites, usado no lugar de @st.cache_data.
+
+    copiar=True devolve uma cópia do resultado a cada chamada (como o
+    st.cache_data), para que as páginas possam alterar os DataFrames sem
+    afetar o cache. Use copiar=False para índices somente leitura
+    (equivalente ao st.cache_resource). fixo=True tira o cache do despejo
+    pelo orçamento global (os bytes continuam contando no total).
+
+    Funções decoradas dentro de uma página são redefinidas a cada rerun: o
+    cache já registrado com o mesmo nome é reaproveitado, e as entradas
+    sobrevivem entre as execuções da página.
+    """
+    def decorador(f):
+        nome = f'{f.__module__}.{f.__qualname__}'
+        with _trava_registro:
+            cache = CACHES.get(nome)
+            if cache is None:
+                cache = CacheLimitado(nome, max_entradas, max_bytes, ttl, fixo)
+                CACHES[nome] = cache
+
+        @functools.wraps(f)
+        def envolvida(*args, **kwargs):
+            valor = cache.obter_ou_calcular(_chave(args, kwargs), lambda: f(*args, **kwargs))
+            return copy.deepcopy(valor) if copiar else valor
+
+        envolvida.cache = cache
+        envolvida.em_cache = lambda *args, **kwargs: cache.contem(_chave(args, kwargs))
+        envolvida.clear = cache.limpar
+        return envolvida
+
+    return decorador(funcao) if funcao is not None else decorador
+
+
+def estatisticas_caches():
+    """Contadores de todos os caches do processo, um cache por linha"""
+    return pd.DataFrame([cache.estatisticas() for cache in CACHES.values()])
+
+
+def limpar_caches():
+    for cache in CACHES.values():
+        cache.limpar()
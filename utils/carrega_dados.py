@@ -1,11 +1,155 @@
+import copy
+import io
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
 import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.cache import cache_limitado
+from utils.estatisticas_rapidas import gravar_estatisticas_rapidas, ler_estatisticas_rapidas
+from utils.validacao import POLITICA_PADRAO, QUARENTENA_PADRAO, REJEITAR_DATAS_INVALIDAS, validar_dados
 
-@st.cache_data
-def carregar_dados():
-    # Carrega o dataset do Spotify
-    df_original = pd.read_csv('./dataset/spotify_data clean.csv')
-    
+try:
+    import polars as pl
+except ImportError:  # motor opcional
+    pl = None
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_DATASET = './dataset/spotify_data clean.csv'
+
+# Motores da camada de dados. O Polars é opcional: a implantação escolhe pela
+# variável de ambiente MOTOR_DADOS e, sem o pacote instalado, vale o pandas.
+MOTORES = ('pandas', 'polars')
+
+# Versões do CSV mantidas em memória (a ativa e a anterior, para sessões em andamento)
+VERSOES_MANTIDAS = 2
+
+# Leitura do CSV em paralelo (motor pandas): processos usados e tamanho mínimo
+# do arquivo para dividir a leitura; abaixo dele, abrir processos custa mais
+# do que ler o arquivo inteiro de uma vez
+PROCESSOS_LEITURA = int(os.environ.get('PROCESSOS_LEITURA', os.cpu_count() or 1))
+TAMANHO_MINIMO_PARALELO = 32 * 1024 ** 2  # bytes
+LINHAS_AMOSTRA_TIPOS = 10_000
+
+# Segmentos estratégicos do mercado, do mais ao menos consolidado
+SEGMENTOS = ['🏆 Superstars', '⭐ Estrelas', '🚀 Emergentes', '🌱 Promessas', '🎨 Independentes']
+
+# Precisão da data de lançamento (coluna release_date_precision)
+PRECISAO_INVALIDA = 0
+PRECISAO_ANO = 1
+PRECISAO_MES = 2
+PRECISAO_DIA = 3
+
+# Tamanho do texto -> (código de precisão, formato da data)
+FORMATOS_DATA = {
+    10: (PRECISAO_DIA, '%Y-%m-%d'),
+    7: (PRECISAO_MES, '%Y-%m'),
+    4: (PRECISAO_ANO, '%Y'),
+}
+
+def converter_datas_lancamento(serie):
+    """
+    Converte datas no formato "YYYY", "YYYY-MM" ou "YYYY-MM-DD".
+
+    Classifica cada valor pelo formato e converte cada grupo de uma vez com o
+    formato exato. Retorna a data, o ano (Int16) e o código de precisão.
+    """
+    texto = serie.astype('string').str.strip()
+    tamanhos = texto.str.len().fillna(0).to_numpy()
+
+    datas = np.full(len(texto), np.datetime64('NaT'), dtype='datetime64[ns]')
+    precisao = np.full(len(texto), PRECISAO_INVALIDA, dtype='int8')
+
+    for tamanho, (codigo, formato) in FORMATOS_DATA.items():
+        mascara = tamanhos == tamanho
+        if mascara.any():
+            convertidas = pd.to_datetime(texto[mascara], format=formato, errors='coerce').to_numpy()
+            datas[mascara] = convertidas
+            precisao[np.flatnonzero(mascara)[~np.isnat(convertidas)]] = codigo
+
+    # O ano vem direto do texto, sem passar pelos acessores de datetime
+    validas = precisao != PRECISAO_INVALIDA
+    anos = texto.str[:4].where(validas).astype('Int16')
+
+    return pd.DataFrame({
+        'album_release_date': datas,
+        'release_year': anos,
+        'release_date_precision': precisao,
+    }, index=serie.index)
+
+def _motor_configurado():
+    motor = os.environ.get('MOTOR_DADOS', 'pandas').strip().lower()
+    if motor not in MOTORES:
+        raise ValueError(f'Motor de dados desconhecido: {motor!r} (use {", ".join(MOTORES)})')
+    if motor == 'polars' and pl is None:
+        logger.warning('MOTOR_DADOS=polars, mas o Polars não está instalado; usando pandas')
+        return 'pandas'
+    return motor
+
+MOTOR_DADOS = _motor_configurado()
+
+def assinatura_arquivo(caminho=CAMINHO_DATASET):
+    """Identifica a versão de um arquivo pelo instante de modificação e tamanho"""
+    info = os.stat(caminho)
+    return f'{info.st_mtime_ns}-{info.st_size}'
+
+# =============================================
+# VERSÕES DO DATASET
+# =============================================
+
+# Assinatura da versão servida às novas sessões e das que ainda estão em memória
+_versoes = {'ativa': None, 'disponiveis': deque(maxlen=VERSOES_MANTIDAS)}
+_trava_versoes = threading.Lock()
+
+def versao_ativa():
+    """Assinatura da versão do CSV servida às novas sessões"""
+    with _trava_versoes:
+        if _versoes['ativa'] is None:
+            _versoes['ativa'] = assinatura_arquivo()
+            _versoes['disponiveis'].append(_versoes['ativa'])
+        return _versoes['ativa']
+
+def publicar_versao(assinatura):
+    """Troca atomicamente a versão ativa (a nova já deve estar carregada e aquecida)"""
+    with _trava_versoes:
+        if assinatura not in _versoes['disponiveis']:
+            _versoes['disponiveis'].append(assinatura)
+        _versoes['ativa'] = assinatura
+
+def versoes_disponiveis():
+    """Cópia das versões em memória, lida sob a trava que a recarga usa para escrevê-las"""
+    with _trava_versoes:
+        return tuple(_versoes['disponiveis'])
+
+def versao_sessao():
+    """
+    Versão fixada para a sessão atual do Streamlit.
+
+    Uma sessão continua na versão com que começou até pedir a atualização,
+    desde que ela ainda esteja em memória. Fora do Streamlit (scripts),
+    usa sempre a versão ativa.
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return versao_ativa()
+
+    versao = st.session_state.get('_versao_dataset')
+    if versao is None or versao not in versoes_disponiveis():
+        versao = st.session_state['_versao_dataset'] = versao_ativa()
+    return versao
+
+def atualizar_versao_sessao():
+    """Passa a sessão atual para a versão ativa"""
+    st.session_state['_versao_dataset'] = versao_ativa()
+
+def _limpar_pandas(df_original):
+    """Colunas usadas pelo dashboard, já convertidas, a partir do CSV lido"""
     df = pd.DataFrame()
     
     # Mapeamento das colunas do dataset do Spotify
@@ -25,23 +169,257 @@ def carregar_dados():
     df['explicit'] = df['explicit'].map({True: 'Sim', False: 'Não'})
     df['explicit'] = df['explicit'].fillna('Não informado')
     
-    # Converter data de lançamento para datetime
-    df['album_release_date'] = pd.to_datetime(df['album_release_date'], errors='coerce')
-    
-    # Remover linhas com valores nulos em colunas críticas
-    df.dropna(subset=['track_name', 'artist_name'], inplace=True)
+    # Converter data de lançamento mantendo ano e precisão da data
+    datas = converter_datas_lancamento(df['album_release_date'])
+    df['album_release_date'] = datas['album_release_date']
+    df['release_year'] = datas['release_year']
+    df['release_date_precision'] = datas['release_date_precision']
     
     return df
 
-@st.cache_data
+def _ler_dataset_pandas(caminho):
+    """CSV lido e limpo com o pandas; retorna (df, df_original)"""
+    # Carrega o dataset do Spotify
+    df_original = pd.read_csv(caminho)
+    return _limpar_pandas(df_original), df_original
+
+# =============================================
+# LEITURA EM PARALELO
+# =============================================
+# O arquivo é dividido em intervalos de bytes que começam e terminam em quebras
+# de linha; cada processo lê e limpa o seu intervalo, e os pedaços são
+# concatenados na ordem do arquivo. Isso só vale quando cada linha física é um
+# registro: se algum intervalo tiver um campo entre aspas com quebra de linha
+# (ou um corte no meio dele), a leitura volta a ser feita de uma vez.
+
+def _intervalos_de_bytes(caminho, partes):
+    """Intervalos [início, fim) com as linhas de dados, divididos em quebras de linha"""
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, 'rb') as arquivo:
+        arquivo.readline()  # cabeçalho
+        inicio = arquivo.tell()
+        cortes = [inicio]
+        for parte in range(1, partes):
+            arquivo.seek(max(inicio + (tamanho - inicio) * parte // partes, cortes[-1]))
+            arquivo.readline()  # termina a linha em que o corte caiu
+            cortes.append(arquivo.tell())
+    cortes.append(tamanho)
+    return [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+
+def _ler_intervalo(caminho, intervalo, colunas, tipos):
+    """
+    Lê e limpa um intervalo do CSV. Retorna (df, df_original), ou None quando
+    o número de registros não bate com o de linhas do intervalo.
+    """
+    inicio, fim = intervalo
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        dados = arquivo.read(fim - inicio)
+
+    try:
+        df_original = pd.read_csv(io.BytesIO(dados), header=None, names=colunas, dtype=tipos)
+    except pd.errors.ParserError:
+        return None
+    linhas = dados.count(b'\n') + (not dados.endswith(b'\n'))
+    if len(df_original) != linhas:
+        return None
+    return _limpar_pandas(df_original), df_original
+
+def _ler_dataset_paralelo(caminho, processos):
+    """CSV lido e limpo em vários processos; retorna (df, df_original) como _ler_dataset_pandas"""
+    # Colunas de texto lidas como texto em todos os pedaços (um pedaço sem
+    # nenhum valor viraria float); as numéricas são inferidas em cada pedaço e
+    # unificadas pelo concat, como na leitura única
+    amostra = pd.read_csv(caminho, nrows=LINHAS_AMOSTRA_TIPOS)
+    colunas = list(amostra.columns)
+    tipos = {c: 'str' for c in colunas if pd.api.types.is_string_dtype(amostra[c])}
+
+    intervalos = _intervalos_de_bytes(caminho, processos)
+    if len(intervalos) < 2:
+        return _ler_dataset_pandas(caminho)
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pedacos = list(executor.map(_ler_intervalo, repeat(caminho), intervalos, repeat(colunas), repeat(tipos)))
+
+    if any(pedaco is None for pedaco in pedacos):
+        logger.warning('CSV com registros em várias linhas; leitura feita em um único processo em %s', caminho)
+        return _ler_dataset_pandas(caminho)
+
+    df = pd.concat([pedaco[0] for pedaco in pedacos], ignore_index=True)
+    df_original = pd.concat([pedaco[1] for pedaco in pedacos], ignore_index=True)
+    return df, df_original
+
+def ler_dataset(caminho=CAMINHO_DATASET, caminho_quarentena=QUARENTENA_PADRAO, motor=None, processos=None,
+                politica=POLITICA_PADRAO, rejeitar_datas_invalidas=REJEITAR_DATAS_INVALIDAS):
+    """
+    Lê, limpa e valida um CSV no formato do export do Spotify.
+
+    Retorna o dataset válido e o resumo de qualidade da ingestão. As linhas
+    rejeitadas vão para o arquivo de quarentena, gravado só com
+    GRAVAR_QUARENTENA=1 ou um caminho explícito (None para não gravar).
+    No motor pandas, arquivos grandes são lidos em PROCESSOS_LEITURA
+    processos; 'processos' força a quantidade (1 para a leitura única).
+    'politica' e 'rejeitar_datas_invalidas' seguem validar_dados (os padrões
+    vêm do ambiente, ver utils/validacao.py).
+    """
+    if processos is None:
+        processos = PROCESSOS_LEITURA if os.path.getsize(caminho) >= TAMANHO_MINIMO_PARALELO else 1
+
+    if (motor or MOTOR_DADOS) == 'polars':
+        # O leitor do Polars já usa várias threads
+        df, df_original = _ler_dataset_polars(caminho)
+    elif processos > 1:
+        df, df_original = _ler_dataset_paralelo(caminho, processos)
+    else:
+        df, df_original = _ler_dataset_pandas(caminho)
+
+    # Remover linhas inválidas e duplicadas (registradas na quarentena, quando gravada)
+    df, qualidade = validar_dados(df, df_original, politica=politica, caminho_quarentena=caminho_quarentena,
+                                  rejeitar_datas_invalidas=rejeitar_datas_invalidas)
+
+    return {'dados': df, 'qualidade': qualidade}
+
+# O dataset de cada versão não tem limite de bytes e não é despejado pelo orçamento
+# global: sem ele, cada rerun leria e validaria o CSV de novo
+@cache_limitado(max_entradas=VERSOES_MANTIDAS, max_bytes=None, copiar=False, fixo=True)
+def ingerir_versao(assinatura):
+    """
+    Dataset principal de uma versão; a assinatura só identifica a versão no
+    cache. Grava também o sidecar de estatísticas rápidas da versão. A
+    deduplicação e as datas inválidas seguem POLITICA_DEDUPLICACAO e
+    REJEITAR_DATAS_INVALIDAS.
+    """
+    ingerido = ler_dataset(CAMINHO_DATASET)
+    gravar_estatisticas_rapidas(ingerido['dados'], assinatura, ingerido['qualidade'])
+    return ingerido
+
+# Cargas de versões em andamento em segundo plano (assinatura -> thread)
+_cargas = {}
+_trava_cargas = threading.Lock()
+
+def iniciar_carga(assinatura):
+    """Começa a ingerir a versão em uma thread, se ela ainda não estiver em memória"""
+    with _trava_cargas:
+        for versao in [v for v, carga in _cargas.items() if not carga.is_alive()]:
+            del _cargas[versao]
+        if ingerir_versao.em_cache(assinatura) or assinatura in _cargas:
+            return
+        _cargas[assinatura] = threading.Thread(
+            target=ingerir_versao, args=(assinatura,), name=f'carga-{assinatura}', daemon=True
+        )
+        _cargas[assinatura].start()
+
+def versao_carregada(assinatura):
+    """Se a versão já foi ingerida e está em memória"""
+    return ingerir_versao.em_cache(assinatura)
+
+def _aguardar_carga(assinatura):
+    # Evita ingerir a mesma versão duas vezes; se a thread falhar, o erro
+    # aparece na chamada seguinte a ingerir_versao
+    with _trava_cargas:
+        carga = _cargas.get(assinatura)
+    if carga is not None:
+        carga.join()
+
+def carregar_versao(assinatura):
+    """Cópia do dataset limpo de uma versão (as páginas podem alterá-la)"""
+    _aguardar_carga(assinatura)
+    return ingerir_versao(assinatura)['dados'].copy()
+
+def dados_compartilhados(assinatura):
+    """Dataset limpo da versão sem cópia, para consultas somente leitura (ex.: a API)"""
+    _aguardar_carga(assinatura)
+    return ingerir_versao(assinatura)['dados']
+
+def resumo_qualidade():
+    """Resumo da validação da versão do dataset usada pela sessão"""
+    versao = versao_sessao()
+    _aguardar_carga(versao)
+    return copy.deepcopy(ingerir_versao(versao)['qualidade'])
+
+def estatisticas_rapidas():
+    """
+    Sidecar de estatísticas da versão da sessão, ou None se ainda não existir.
+    Também inicia a carga do dataset completo em segundo plano.
+    """
+    versao = versao_sessao()
+    iniciar_carga(versao)
+    return ler_estatisticas_rapidas(versao)
+
+def carregar_dados():
+    """Dataset limpo na versão da sessão atual"""
+    return carregar_versao(versao_sessao())
+
+def normalizar_tabelas(df, motor=None):
+    """
+    Separa o dataset largo em tabelas de artistas, álbuns e músicas ligadas
+    por chaves inteiras (artist_id, album_id).
+
+    Os atributos do artista, repetidos em cada música, passam a ser guardados
+    uma única vez. Quando variam entre músicas do mesmo artista, vale o maior
+    valor de popularidade e de seguidores.
+    """
+    artist_id, nomes_artistas = pd.factorize(df['artist_name'])
+    artist_id = artist_id.astype('int32')
+
+    if (motor or MOTOR_DADOS) == 'polars':
+        artistas = _agregar_artistas_polars(df)
+    else:
+        artistas = (
+            df.assign(artist_id=artist_id)
+            .groupby('artist_id')
+            .agg(
+                artist_popularity=('artist_popularity', 'max'),
+                artist_followers=('artist_followers', 'max'),
+                artist_genres=('artist_genres', 'first'),
+                qtd_musicas=('track_name', 'count'),
+            )
+        )
+        artistas.insert(0, 'artist_name', nomes_artistas)
+        artistas = artistas.reset_index()
+
+    colunas_album = ['album_name', 'album_type', 'album_release_date', 'release_year', 'release_date_precision']
+    chave_album = df[colunas_album].assign(artist_id=artist_id)
+    album_id, _ = pd.factorize(pd.MultiIndex.from_frame(chave_album))
+    album_id = album_id.astype('int32')
+
+    albuns = (
+        chave_album.assign(album_id=album_id)
+        .drop_duplicates('album_id')
+        [['album_id', 'artist_id'] + colunas_album]
+        .reset_index(drop=True)
+        .astype({'album_type': 'category'})
+    )
+
+    musicas = pd.DataFrame({
+        'track_id': np.arange(len(df), dtype='int32'),
+        'artist_id': artist_id,
+        'album_id': album_id,
+        'track_name': df['track_name'].to_numpy(),
+        'track_popularity': df['track_popularity'].to_numpy(),
+        'track_duration_min': df['track_duration_min'].to_numpy(),
+        'explicit': pd.Categorical(df['explicit']),
+    })
+
+    return {'artistas': artistas, 'albuns': albuns, 'musicas': musicas}
+
+@cache_limitado(max_entradas=VERSOES_MANTIDAS, max_bytes=None, fixo=True)
+def carregar_tabelas_versao(assinatura):
+    return normalizar_tabelas(carregar_versao(assinatura))
+
+def carregar_tabelas():
+    """Tabelas normalizadas (artistas, álbuns e músicas) do dataset carregado"""
+    return carregar_tabelas_versao(versao_sessao())
+
+@cache_limitado
 def obter_tipos_album():
     return ['album', 'single', 'compilation']
 
-@st.cache_data
+@cache_limitado
 def obter_status_explicit():
     return ['Sim', 'Não']
 
-@st.cache_data
+@cache_limitado
 def obter_generos_artistas(df):
     # Extrair e limpar gêneros
     generos = df['artist_genres'].dropna().unique()
@@ -55,10 +433,194 @@ def obter_generos_artistas(df):
     
     return sorted(list(set([g for g in todos_generos if g and g != 'N/A'])))
 
-@st.cache_data
+@cache_limitado
 def obter_artistas(df):
     return sorted(df['artist_name'].unique().tolist())
 
-@st.cache_data
+@cache_limitado
 def obter_albuns(df):
-    return sorted(df['album_name'].unique().tolist())
\ No newline at end of file
+    return sorted(df['album_name'].unique().tolist())
+
+def classificar_segmento(df):
+    """Classifica cada linha em um segmento estratégico pelas regras de negócio"""
+    conditions = [
+        (df['artist_popularity'] >= 80) & (df['artist_followers'] >= 5000000),
+        (df['artist_popularity'] >= 65) & (df['artist_followers'] >= 1000000),
+        (df['artist_popularity'] >= 50) & (df['artist_followers'] >= 100000),
+        (df['artist_popularity'] >= 35) & (df['artist_followers'] >= 10000),
+    ]
+    return pd.Series(np.select(conditions, SEGMENTOS[:4], default=SEGMENTOS[4]), index=df.index)
+
+def explodir_generos(df):
+    """Retorna uma Series com um gênero por linha, indexada pela linha original do df"""
+    generos = df['artist_genres'].dropna()
+    generos = generos[generos != 'N/A'].str.split(',').explode().str.strip()
+    return generos[(generos != '') & (generos != 'N/A')].rename('genero')
+
+def filtrar_por_genero(df, genero_alvo):
+    """Músicas de todos os artistas que têm o gênero informado"""
+    generos = explodir_generos(df)
+    artistas_do_genero = df.loc[generos.index[generos == genero_alvo], 'artist_name']
+    return df[df['artist_name'].isin(artistas_do_genero)]
+
+@cache_limitado
+def contar_generos(df, motor=None):
+    """Frequência de cada gênero (uma ocorrência por música), em ordem decrescente"""
+    if (motor or MOTOR_DADOS) == 'polars':
+        return _contar_generos_polars(df)
+
+    contagem = explodir_generos(df).value_counts()
+    return pd.DataFrame({
+        'Genero': contagem.index,
+        'Quantidade': contagem.to_numpy()
+    })
+
+@cache_limitado
+def analisar_coocorrencia(df, minimo=5, motor=None):
+    """Pares de gêneros que aparecem juntos no mesmo artista pelo menos 'minimo' vezes"""
+    if (motor or MOTOR_DADOS) == 'polars':
+        return _analisar_coocorrencia_polars(df, minimo)
+
+    generos = explodir_generos(df).rename_axis('linha').reset_index()
+
+    # Junta cada gênero com os demais gêneros da mesma linha
+    pares = generos.merge(generos, on='linha', suffixes=('1', '2'))
+    pares = pares[pares['genero1'] < pares['genero2']]
+
+    contagem = pares.groupby(['genero1', 'genero2']).size()
+    contagem = contagem[contagem >= minimo].sort_values(ascending=False)
+
+    return pd.DataFrame({
+        'Genero1': contagem.index.get_level_values(0),
+        'Genero2': contagem.index.get_level_values(1),
+        'Coocorrencias': contagem.to_numpy()
+    })
+
+# Versão da regra de limpar_nomes_artistas: altere ao mudar a regra, para que
+# o grafo de derivados (utils/dag.py) recalcule os nomes limpos e o que vem deles
+VERSAO_LIMPEZA_NOMES = 1
+
+def limpar_nomes_artistas(serie):
+    """
+    Padroniza nomes de artistas: remove símbolos no início e no fim
+    (preservando os internos), mantém siglas em caixa alta e aplica
+    Title Case nos demais. Nomes vazios viram nulos.
+    """
+    nomes = serie.str.strip()
+    nomes = nomes.str.replace(r'^[^a-zA-Z0-9]+', '', regex=True)
+    nomes = nomes.str.replace(r'[^a-zA-Z0-9]+$', '', regex=True)
+    nomes = nomes.where(nomes.str.isupper().eq(True), nomes.str.title())
+    return nomes.where(nomes != '')
+
+# =============================================
+# MOTOR POLARS (OPCIONAL)
+# =============================================
+# Mesmas operações em LazyFrames: o Polars executa o plano em várias threads
+# (POLARS_MAX_THREADS) e empurra filtros e projeções para perto da leitura.
+# Os resultados voltam como os DataFrames pandas que as páginas já usam.
+
+def _ler_dataset_polars(caminho):
+    """CSV lido e limpo com o Polars; retorna (df, df_original) em pandas"""
+    # Todas as colunas são lidas: a validação e a quarentena usam o CSV original
+    try:
+        df_original = pl.read_csv(caminho, infer_schema_length=10_000)
+        original_pandas = None
+    except pl.exceptions.ComputeError:
+        # Aspas malformadas (ex.: "The 12" Singles") que o leitor do pandas tolera
+        logger.warning('CSV com aspas malformadas; leitura feita pelo pandas em %s', caminho)
+        original_pandas = pd.read_csv(caminho)
+        df_original = pl.from_pandas(original_pandas)
+    original = df_original.lazy()
+
+    texto = pl.col('album_release_date').cast(pl.String).str.strip_chars()
+    tamanho = texto.str.len_chars()
+
+    # Completa "YYYY" e "YYYY-MM" para um único formato de data
+    data = pl.lit(None, dtype=pl.Datetime('ns'))
+    precisao = pl.lit(PRECISAO_INVALIDA, dtype=pl.Int8)
+    for tamanho_texto, (codigo, _) in FORMATOS_DATA.items():
+        completa = (texto + '-01' * ((10 - tamanho_texto) // 3)).str.strptime(
+            pl.Datetime('ns'), '%Y-%m-%d', strict=False
+        )
+        data = pl.when(tamanho == tamanho_texto).then(completa).otherwise(data)
+        precisao = pl.when((tamanho == tamanho_texto) & completa.is_not_null()).then(
+            pl.lit(codigo, dtype=pl.Int8)
+        ).otherwise(precisao)
+
+    limpo = original.select(
+        'track_name', 'artist_name', 'artist_popularity', 'artist_followers', 'artist_genres',
+        'album_name',
+        data.alias('album_release_date'),
+        'album_type', 'track_popularity', 'track_duration_min',
+        pl.col('explicit').cast(pl.String).str.to_lowercase()
+        .replace_strict({'true': 'Sim', 'false': 'Não'}, default='Não informado').alias('explicit'),
+        precisao.alias('release_date_precision'),
+    ).with_columns(
+        pl.when(pl.col('release_date_precision') != PRECISAO_INVALIDA)
+        .then(texto.str.slice(0, 4).cast(pl.Int16, strict=False))
+        .alias('release_year'),
+    )
+
+    df = limpo.collect().to_pandas()
+    # Ano com nulos volta como float; mantém o Int16 anulável do motor pandas
+    df['release_year'] = df['release_year'].astype('Int16')
+    colunas = ['track_name', 'artist_name', 'artist_popularity', 'artist_followers', 'artist_genres',
+               'album_name', 'album_release_date', 'album_type', 'track_popularity',
+               'track_duration_min', 'explicit', 'release_year', 'release_date_precision']
+    return df[colunas], original_pandas if original_pandas is not None else df_original.to_pandas()
+
+def _generos_polars(df):
+    """LazyFrame (linha, genero) com um gênero por linha, como explodir_generos"""
+    return (
+        pl.from_pandas(df[['artist_genres']], include_index=False).lazy()
+        .with_row_index('linha')
+        .filter(pl.col('artist_genres').is_not_null() & (pl.col('artist_genres') != 'N/A'))
+        .select('linha', pl.col('artist_genres').str.split(',').alias('genero'))
+        .explode('genero')
+        .with_columns(pl.col('genero').str.strip_chars())
+        .filter((pl.col('genero') != '') & (pl.col('genero') != 'N/A'))
+    )
+
+def _contar_generos_polars(df):
+    # Empates na ordem da primeira ocorrência, como o value_counts do pandas
+    contagem = (
+        _generos_polars(df)
+        .group_by('genero', maintain_order=True).agg(pl.len().cast(pl.Int64).alias('Quantidade'))
+        .sort('Quantidade', descending=True, maintain_order=True)
+        .rename({'genero': 'Genero'})
+        .collect()
+    )
+    return contagem.to_pandas()
+
+def _analisar_coocorrencia_polars(df, minimo):
+    generos = _generos_polars(df)
+    contagem = (
+        generos.join(generos, on='linha', suffix='2')
+        .filter(pl.col('genero') < pl.col('genero2'))
+        .group_by('genero', 'genero2').agg(pl.len().cast(pl.Int64).alias('Coocorrencias'))
+        .filter(pl.col('Coocorrencias') >= minimo)
+        .sort(['Coocorrencias', 'genero', 'genero2'], descending=[True, False, False])
+        .rename({'genero': 'Genero1', 'genero2': 'Genero2'})
+        .collect()
+    )
+    return contagem.to_pandas()
+
+def _agregar_artistas_polars(df):
+    """Tabela de artistas de normalizar_tabelas; ids na ordem da primeira aparição (como o factorize)"""
+    artistas = (
+        pl.from_pandas(
+            df[['artist_name', 'artist_popularity', 'artist_followers', 'artist_genres', 'track_name']],
+            include_index=False,
+        ).lazy()
+        .group_by('artist_name', maintain_order=True)
+        .agg(
+            pl.col('artist_popularity').max(),
+            pl.col('artist_followers').max(),
+            pl.col('artist_genres').drop_nulls().first(),
+            pl.col('track_name').count().cast(pl.Int64).alias('qtd_musicas'),
+        )
+        .with_row_index('artist_id')
+        .with_columns(pl.col('artist_id').cast(pl.Int32))
+        .collect()
+    )
+    return artistas.to_pandas()
@@ -0,0 +1,135 @@
+"""
+Correlações de Pearson e Spearman com intervalos de confiança por bootstrap.
+
+As reamostragens são processadas em lotes de matrizes NumPy (índices
+b x n), e os lotes são distribuídos entre threads, já que as operações
+pesadas (gather, bincount e matmul) liberam o GIL. O tamanho do lote vem de
+um orçamento de memória (BOOTSTRAP_ORCAMENTO_MB) dividido entre as threads:
+datasets pequenos usam lotes grandes e datasets grandes não estouram a
+memória. Cada reamostra tem a própria semente, então o resultado não depende
+do tamanho do lote nem da quantidade de núcleos. Os postos de Spearman de
+cada reamostra são os postos médios exatos, calculados com bincount sobre os
+códigos dos valores distintos de cada coluna.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from utils.cache import cache_limitado
+
+VARIAVEIS_CORRELACAO = [
+    'track_popularity',
+    'artist_popularity',
+    'track_duration_min',
+    'artist_followers'
+]
+N_BOOTSTRAP_PADRAO = 500
+
+# Memória dos lotes processados ao mesmo tempo (índices, valores, postos e temporários)
+ORCAMENTO_LOTES_BYTES = int(os.environ.get('BOOTSTRAP_ORCAMENTO_MB', 256)) * 1024 ** 2
+TRABALHADORES = os.cpu_count() or 1
+# Arrays de 8 bytes por linha de uma reamostra: índices, códigos amostrados e
+# deslocados, postos, e valores, postos e valores centrados de cada coluna
+ARRAYS_POR_LINHA = 5
+ARRAYS_POR_COLUNA = 3
+
+
+def tamanho_lote(n, n_colunas, n_bootstrap, orcamento=ORCAMENTO_LOTES_BYTES, trabalhadores=TRABALHADORES):
+    """Reamostras por lote para que os lotes em paralelo caibam no orçamento"""
+    bytes_reamostra = n * 8 * (ARRAYS_POR_LINHA + ARRAYS_POR_COLUNA * n_colunas)
+    cabem = max(1, orcamento // (trabalhadores * bytes_reamostra))
+    # Sem lotes maiores que a parte de cada thread, para todas terem trabalho
+    return int(min(cabem, -(-n_bootstrap // trabalhadores)))
+
+
+def _codificar(X):
+    """Código denso (ordem crescente) de cada valor, por coluna, e a quantidade de distintos"""
+    codigos = np.empty(X.shape, dtype=np.int64)
+    distintos = []
+    for j in range(X.shape[1]):
+        _, codigos[:, j] = np.unique(X[:, j], return_inverse=True)
+        distintos.append(int(codigos[:, j].max()) + 1)
+    return codigos, distintos
+
+
+def postos_medios(codigos, distintos, indices):
+    """
+    Postos médios (empates recebem a média das posições) de cada reamostra.
+
+    codigos: códigos de uma coluna (n,); indices: reamostras (b, n).
+    Para cada reamostra conta quantas vezes cada código aparece; o posto de
+    um valor é (quantos são menores) + (repetições + 1) / 2.
+    """
+    b = indices.shape[0]
+    amostrados = codigos[indices]
+    deslocados = amostrados + (np.arange(b) * distintos)[:, None]
+
+    contagens = np.bincount(deslocados.ravel(), minlength=b * distintos).reshape(b, distintos)
+    menores = np.cumsum(contagens, axis=1) - contagens
+    return np.take_along_axis(menores + (contagens + 1) / 2, amostrados, axis=1)
+
+
+def _correlacoes_lote(V):
+    """Matrizes de correlação de Pearson de um lote (b, k, n) -> (b, k, k)"""
+    V = V - V.mean(axis=2, keepdims=True)
+    covariancias = np.matmul(V, V.transpose(0, 2, 1))
+    desvios = np.sqrt(np.diagonal(covariancias, axis1=1, axis2=2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return covariancias / (desvios[:, :, None] * desvios[:, None, :])
+
+
+def _processar_lote(X, codigos, distintos, indices):
+    # Layout (b, k, n): cada coluna é reamostrada de um vetor contíguo
+    colunas = range(X.shape[1])
+    valores = np.stack([X[:, j][indices] for j in colunas], axis=1)
+    postos = np.stack([postos_medios(codigos[:, j], distintos[j], indices) for j in colunas], axis=1)
+    return _correlacoes_lote(valores), _correlacoes_lote(postos)
+
+
+@cache_limitado(max_entradas=16)
+def correlacoes_bootstrap(df, colunas, n_bootstrap=N_BOOTSTRAP_PADRAO, nivel=0.95, semente=0):
+    """
+    Matrizes de correlação (Pearson e Spearman) e os limites do intervalo de
+    confiança por bootstrap percentil, para cada par de colunas.
+
+    Retorna {'matrizes': {metodo: df}, 'inferior': {metodo: df},
+    'superior': {metodo: df}, 'n_bootstrap', 'amostras'}.
+    """
+    X = np.asfortranarray(df[list(colunas)].dropna().to_numpy(dtype='float64'))
+    n = len(X)
+    codigos, distintos = _codificar(X)
+    codigos = np.asfortranarray(codigos)
+
+    # Estimativa pontual: a "reamostra" identidade
+    pearson, spearman = _processar_lote(X, codigos, distintos, np.arange(n)[None, :])
+
+    # Uma semente independente por reamostra: o resultado é o mesmo com qualquer lote
+    sementes = np.random.SeedSequence(semente).spawn(n_bootstrap)
+    lote = tamanho_lote(n, X.shape[1], n_bootstrap)
+    sementes_lotes = [sementes[inicio:inicio + lote] for inicio in range(0, n_bootstrap, lote)]
+
+    def executar(sementes_lote):
+        indices = np.stack([np.random.default_rng(s).integers(0, n, size=n) for s in sementes_lote])
+        return _processar_lote(X, codigos, distintos, indices)
+
+    with ThreadPoolExecutor(max_workers=TRABALHADORES) as executor:
+        lotes = list(executor.map(executar, sementes_lotes))
+
+    distribuicoes = {
+        'pearson': np.concatenate([p for p, _ in lotes]),
+        'spearman': np.concatenate([s for _, s in lotes]),
+    }
+    alfa = (1 - nivel) / 2
+
+    def matriz(valores):
+        return pd.DataFrame(valores, index=list(colunas), columns=list(colunas))
+
+    return {
+        'matrizes': {'pearson': matriz(pearson[0]), 'spearman': matriz(spearman[0])},
+        'inferior': {m: matriz(np.nanquantile(d, alfa, axis=0)) for m, d in distribuicoes.items()},
+        'superior': {m: matriz(np.nanquantile(d, 1 - alfa, axis=0)) for m, d in distribuicoes.items()},
+        'n_bootstrap': n_bootstrap,
+        'amostras': n,
+    }
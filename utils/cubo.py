@@ -0,0 +1,72 @@
+import pandas as pd
+from utils.cache import cache_limitado
+from utils.carrega_dados import PRECISAO_MES, classificar_segmento
+
+# Dimensões do cubo, da mais para a menos granular no tempo
+DIMENSOES = ['release_year', 'release_month', 'album_type', 'explicit', 'segmento']
+
+# Medidas numéricas: cada célula guarda a soma e a quantidade de valores válidos
+MEDIDAS = ['track_popularity', 'track_duration_min', 'artist_popularity', 'artist_followers']
+
+
+@cache_limitado
+def construir_cubo(df):
+    """
+    Pré-agrega o dataset por ano, mês, tipo de álbum, conteúdo explícito e
+    segmento estratégico.
+
+    Cada célula guarda contagens e somas, de forma que médias e percentuais
+    possam ser derivados depois de qualquer agregação (roll-up) ou filtro.
+    """
+    # Datas com precisão apenas de ano ficam sem mês
+    com_mes = df['release_date_precision'] >= PRECISAO_MES
+    base = pd.DataFrame({
+        'release_year': df['release_year'],
+        'release_month': df['album_release_date'].dt.month.where(com_mes).astype('Int8'),
+        'album_type': df['album_type'],
+        'explicit': df['explicit'],
+        'segmento': classificar_segmento(df),
+        'musicas': 1,
+        'musicas_explicitas': (df['explicit'] == 'Sim').astype(int),
+    })
+
+    for medida in MEDIDAS:
+        base[f'soma_{medida}'] = df[medida]
+        base[f'n_{medida}'] = df[medida].notna().astype(int)
+
+    # dropna=False preserva as músicas sem data ou sem tipo de álbum
+    return base.groupby(DIMENSOES, dropna=False, observed=True).sum().reset_index()
+
+
+def _filtrar(cubo, filtros):
+    """Aplica filtros: lista de valores aceitos ou tupla (mínimo, máximo)"""
+    mascara = pd.Series(True, index=cubo.index)
+    for dimensao, valores in filtros.items():
+        if isinstance(valores, tuple):
+            minimo, maximo = valores
+            if minimo is not None:
+                mascara &= cubo[dimensao] >= minimo
+            if maximo is not None:
+                mascara &= cubo[dimensao] <= maximo
+        else:
+            mascara &= cubo[dimensao].isin(valores)
+    return cubo[mascara.fillna(False)]
+
+
+def consultar_cubo(cubo, por, filtros=None):
+    """
+    Agrega o cubo pelas dimensões em 'por', aplicando os filtros informados.
+
+    Retorna contagens, médias de cada medida e o percentual de conteúdo
+    explícito por grupo.
+    """
+    cubo = _filtrar(cubo, filtros or {})
+
+    colunas_soma = [c for c in cubo.columns if c not in DIMENSOES]
+    resultado = cubo.groupby(por, observed=True)[colunas_soma].sum().reset_index()
+
+    for medida in MEDIDAS:
+        resultado[f'media_{medida}'] = resultado[f'soma_{medida}'] / resultado[f'n_{medida}']
+    resultado['percentual_explicito'] = resultado['musicas_explicitas'] / resultado['musicas'] * 100
+
+    return resultado
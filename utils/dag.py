@@ -0,0 +1,267 @@
+"""
+Grafo de dependências dos dados derivados do dataset.
+
+Cada artefato derivado (agregados anuais, gêneros explodidos, contagens,
+nomes limpos, faixas de duração...) é um nó com nome, dependências e versão.
+A avaliação é preguiçosa: pedir um nó calcula só ele e o que estiver
+desatualizado abaixo dele.
+
+A chave de um nó combina sua versão com a impressão digital (hash do
+conteúdo) do resultado de cada dependência. Por isso:
+
+- mudar os dados recalcula só os nós cujas entradas mudaram de fato: os nós
+  ligados direto à fonte são projeções baratas de colunas, sempre
+  reexecutadas, e a impressão delas decide o que vem depois (mudar a
+  popularidade não refaz a contagem de gêneros);
+- mudar uma regra de limpeza ou uma definição de faixas muda a versão do nó
+  (as versões abaixo vêm das próprias definições), e só ele e os nós que
+  dependem dele são recalculados.
+
+Os resultados ficam num CacheLimitado (registrado em CACHES) e são
+compartilhados: trate-os como somente leitura. Os nós chamam as funções de
+utils/ sem o cache delas (__wrapped__): a chave do nó já identifica as
+entradas, e passar pelo cache da função hashearia as colunas de novo e
+guardaria uma segunda cópia do resultado.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+
+import pandas as pd
+from utils.cache import CACHES, CacheLimitado, impressao_conteudo
+from utils.carrega_dados import (MOTOR_DADOS, VERSAO_LIMPEZA_NOMES, analisar_coocorrencia, contar_generos,
+                                 limpar_nomes_artistas)
+from utils.cubo import MEDIDAS, construir_cubo, consultar_cubo
+from utils.interpretacao import (FAIXAS_DURACAO, FAIXAS_POPULARIDADE, ROTULOS_DURACAO, ROTULOS_POPULARIDADE,
+                                 categorizar_duracao, categorizar_popularidade_artista)
+
+MAX_IMPRESSOES = 4096
+
+
+# =============================================
+# GRAFO
+# =============================================
+
+class No:
+    """Artefato derivado: função das dependências, na ordem declarada"""
+
+    def __init__(self, nome, funcao, dependencias, versao, fonte=False):
+        self.nome = nome
+        self.funcao = funcao
+        self.dependencias = list(dependencias)
+        self.versao = str(versao)
+        self.fonte = fonte
+
+
+class GrafoDerivados:
+    """Grafo de artefatos derivados com avaliação preguiçosa e invalidação incremental"""
+
+    def __init__(self, nome, max_entradas=128, max_bytes=None):
+        self.nos = {}
+        self._cache = CacheLimitado(f'utils.dag.{nome}', max_entradas, max_bytes or 256 * 1024 ** 2)
+        CACHES[self._cache.nome] = self._cache
+
+        # chave do nó -> impressão do resultado (sobrevive ao despejo do valor)
+        self._impressoes = OrderedDict()
+        self._trava = threading.Lock()
+        self.execucoes = Counter()
+
+    # ---------- declaração ----------
+
+    def _registrar(self, no):
+        if no.nome in self.nos:
+            raise ValueError(f'Nó já declarado: {no.nome}')
+        faltando = [d for d in no.dependencias if d not in self.nos]
+        if faltando:
+            raise ValueError(f'Dependências não declaradas de {no.nome}: {", ".join(faltando)}')
+        self.nos[no.nome] = no
+
+    def fonte(self, nome):
+        """Nó de entrada: o valor é informado a cada avaliação"""
+        self._registrar(No(nome, None, [], '', fonte=True))
+
+    def no(self, nome, dependencias, versao=1):
+        """Decorador que declara um nó calculado a partir das dependências"""
+        def decorador(funcao):
+            self._registrar(No(nome, funcao, dependencias, versao))
+            return funcao
+        return decorador
+
+    def projecao(self, nome, fonte, colunas):
+        """Nó com algumas colunas da fonte (a porta de entrada dos dados no grafo)"""
+        colunas = list(colunas)
+        self._registrar(No(nome, lambda df: df[colunas], [fonte], repr(colunas)))
+
+    def definir_versao(self, nome, versao):
+        """Muda a versão de um nó; ele e seus dependentes serão recalculados quando pedidos"""
+        self.nos[nome].versao = str(versao)
+
+    def dependentes(self, nome):
+        """Nós afetados por uma mudança em 'nome' (todos os que dependem dele, direta ou indiretamente)"""
+        # Cada nó é declarado depois das dependências: a ordem de declaração é topológica
+        afetados = []
+        for no in self.nos.values():
+            if nome in no.dependencias or set(afetados) & set(no.dependencias):
+                afetados.append(no.nome)
+        return afetados
+
+    # ---------- avaliação ----------
+
+    def avaliar(self, nome, **fontes):
+        """Valor do nó para as fontes informadas (ex.: avaliar('contagem_generos', dataset=df))"""
+        return self._valor(nome, fontes, {})
+
+    def _guardar_impressao(self, chave, impressao):
+        with self._trava:
+            self._impressoes[chave] = impressao
+            self._impressoes.move_to_end(chave)
+            while len(self._impressoes) > MAX_IMPRESSOES:
+                self._impressoes.popitem(last=False)
+
+    def _chave_e_impressao(self, nome, fontes, memo):
+        """
+        (chave, impressão) do nó. A impressão de um nó já calculado vem do
+        registro; o valor só é calculado quando ela não é conhecida.
+        """
+        if ('impressao', nome) in memo:
+            return memo[('impressao', nome)]
+
+        no = self.nos[nome]
+        if no.fonte:
+            # A fonte não é hasheada: os nós ligados a ela sempre reexecutam
+            resultado = (None, None)
+        else:
+            impressoes = [self._chave_e_impressao(d, fontes, memo)[1] for d in no.dependencias]
+            ligado_a_fonte = any(self.nos[d].fonte for d in no.dependencias)
+            chave = None if ligado_a_fonte else impressao_conteudo(nome, no.versao, impressoes)
+
+            with self._trava:
+                impressao = self._impressoes.get(chave) if chave is not None else None
+            if impressao is None:
+                valor = self._calcular(nome, chave, fontes, memo)
+                impressao = impressao_conteudo(valor)
+                if chave is not None:
+                    self._guardar_impressao(chave, impressao)
+            resultado = (chave, impressao)
+
+        memo[('impressao', nome)] = resultado
+        return resultado
+
+    def _calcular(self, nome, chave, fontes, memo):
+        no = self.nos[nome]
+        valor = no.funcao(*[self._valor(d, fontes, memo) for d in no.dependencias])
+        with self._trava:
+            self.execucoes[nome] += 1
+        if chave is not None:
+            self._cache.guardar(chave, valor)
+        memo[('valor', nome)] = valor
+        return valor
+
+    def _valor(self, nome, fontes, memo):
+        if ('valor', nome) in memo:
+            return memo[('valor', nome)]
+
+        no = self.nos[nome]
+        if no.fonte:
+            if nome not in fontes:
+                raise KeyError(f'Fonte não informada: {nome}')
+            memo[('valor', nome)] = fontes[nome]
+            return fontes[nome]
+
+        chave, _ = self._chave_e_impressao(nome, fontes, memo)
+        if ('valor', nome) in memo:
+            return memo[('valor', nome)]
+
+        encontrado, valor = self._cache.obter(chave) if chave is not None else (False, None)
+        if not encontrado:
+            # Valor despejado do cache (a impressão continua conhecida)
+            valor = self._calcular(nome, chave, fontes, memo)
+        memo[('valor', nome)] = valor
+        return valor
+
+    def estado(self):
+        """Nós do grafo com versão, dependências e quantas vezes cada um foi calculado"""
+        with self._trava:
+            execucoes = dict(self.execucoes)
+        return pd.DataFrame([
+            {
+                'no': no.nome,
+                'versao': no.versao,
+                'dependencias': ', '.join(no.dependencias),
+                'execucoes': execucoes.get(no.nome, 0),
+            }
+            for no in self.nos.values()
+        ])
+
+
+# =============================================
+# DERIVADOS DO DATASET
+# =============================================
+
+GRAFO = GrafoDerivados('derivados')
+GRAFO.fonte('dataset')
+
+# Ano de lançamento -> cubo -> agregados anuais
+GRAFO.projecao('colunas_cubo', 'dataset',
+               ['release_year', 'album_release_date', 'release_date_precision', 'album_type', 'explicit'] + MEDIDAS)
+
+
+@GRAFO.no('cubo', ['colunas_cubo'])
+def _cubo(colunas):
+    # Sem o cache de construir_cubo (ver o início do módulo)
+    return construir_cubo.__wrapped__(colunas)
+
+
+@GRAFO.no('agregados_anuais', ['cubo'])
+def _agregados_anuais(cubo):
+    return consultar_cubo(cubo, ['release_year'])
+
+
+# Gêneros -> contagens e co-ocorrências, no motor de dados configurado (a
+# versão inclui o motor para que trocar MOTOR_DADOS não reaproveite resultados)
+GRAFO.projecao('coluna_generos', 'dataset', ['artist_genres'])
+
+
+@GRAFO.no('contagem_generos', ['coluna_generos'], versao=MOTOR_DADOS)
+def _contagem_generos(coluna):
+    return contar_generos.__wrapped__(coluna)
+
+
+@GRAFO.no('coocorrencia_generos', ['coluna_generos'], versao=MOTOR_DADOS)
+def _coocorrencia_generos(coluna):
+    return analisar_coocorrencia.__wrapped__(coluna)
+
+
+# Nome do artista -> nome limpo -> lista de artistas
+GRAFO.projecao('nomes_artistas', 'dataset', ['artist_name'])
+
+
+@GRAFO.no('artistas_limpos', ['nomes_artistas'], versao=VERSAO_LIMPEZA_NOMES)
+def _artistas_limpos(nomes):
+    return limpar_nomes_artistas(nomes['artist_name'])
+
+
+@GRAFO.no('lista_artistas', ['artistas_limpos'])
+def _lista_artistas(nomes):
+    return sorted(nomes.dropna().unique().tolist())
+
+
+# Faixas (pd.cut): a versão é a própria definição das faixas
+GRAFO.projecao('duracoes', 'dataset', ['track_duration_min'])
+GRAFO.projecao('popularidades_artistas', 'dataset', ['artist_popularity'])
+
+
+@GRAFO.no('faixas_duracao', ['duracoes'], versao=(FAIXAS_DURACAO, ROTULOS_DURACAO))
+def _faixas_duracao(duracoes):
+    return categorizar_duracao(duracoes['track_duration_min'])
+
+
+@GRAFO.no('faixas_popularidade_artista', ['popularidades_artistas'],
+          versao=(FAIXAS_POPULARIDADE, ROTULOS_POPULARIDADE))
+def _faixas_popularidade_artista(popularidades):
+    return categorizar_popularidade_artista(popularidades['artist_popularity'])
+
+
+def derivado(nome, df):
+    """Artefato derivado do dataset (já filtrado) informado; somente leitura"""
+    return GRAFO.avaliar(nome, dataset=df)
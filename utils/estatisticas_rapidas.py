@@ -0,0 +1,93 @@
+"""
+Arquivo lateral (sidecar) com as estatísticas de capa do dataset.
+
+A ingestão grava um JSON pequeno com as métricas principais e os dados dos
+gráficos pequenos (tipos de álbum, lançamentos por ano, top artistas). As
+páginas leem esse arquivo em milissegundos e já mostram o resumo enquanto o
+dataset completo é carregado; as seções interativas vêm depois.
+"""
+
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+CAMINHO_ESTATISTICAS = './dataset/estatisticas_rapidas.json'
+TOP_ARTISTAS = 10
+
+
+def _valor_json(valor):
+    return None if pd.isna(valor) else valor.item() if hasattr(valor, 'item') else valor
+
+
+def calcular_metricas(df):
+    """Métricas de capa do dataset (as mesmas da Home e do Resumo Estatístico)"""
+    return {
+        'linhas': len(df),
+        'colunas': df.shape[1],
+        'artistas_unicos': int(df['artist_name'].nunique()),
+        'albuns_unicos': int(df['album_name'].nunique()),
+        'tipos_album': int(df['album_type'].nunique()),
+        'artista_mais_popular': _valor_json(df.loc[df['artist_popularity'].idxmax(), 'artist_name']),
+        'popularidade_media': _valor_json(df['track_popularity'].mean()),
+        'duracao_media': _valor_json(df['track_duration_min'].mean()),
+        'popularidade_max': _valor_json(df['track_popularity'].max()),
+        'ano_min': _valor_json(df['release_year'].min()),
+        'ano_max': _valor_json(df['release_year'].max()),
+    }
+
+
+def calcular_graficos(df):
+    """Dados já agregados dos gráficos pequenos exibidos durante a carga"""
+    tipos = df['album_type'].value_counts()
+    anos = df['release_year'].dropna().astype(int).value_counts().sort_index()
+
+    # Mesma ordem do ranking global: média decrescente, empates em ordem alfabética
+    artistas = (
+        df.groupby('artist_name')['artist_popularity'].mean()
+        .sort_values(ascending=False, kind='stable')
+        .head(TOP_ARTISTAS)
+    )
+    return {
+        'musicas_por_tipo_album': {tipo: int(n) for tipo, n in tipos.items()},
+        'lancamentos_por_ano': {str(ano): int(n) for ano, n in anos.items()},
+        'top_artistas': {artista: float(valor) for artista, valor in artistas.items()},
+    }
+
+
+def gravar_estatisticas_rapidas(df, origem, qualidade=None, caminho=CAMINHO_ESTATISTICAS):
+    """
+    Grava o sidecar da versão 'origem' de forma atômica. O temporário tem nome
+    único, então ingestões simultâneas (processos ou threads) não se misturam.
+    """
+    estatisticas = {
+        'origem': origem,
+        'metricas': calcular_metricas(df),
+        'graficos': calcular_graficos(df),
+        'qualidade': qualidade,
+    }
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+            json.dump(estatisticas, arquivo, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def ler_estatisticas_rapidas(origem, caminho=CAMINHO_ESTATISTICAS):
+    """Sidecar da versão 'origem', ou None se não existir ou for de outra versão"""
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            estatisticas = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    return estatisticas if estatisticas.get('origem') == origem else None
+
+
+def tabela_grafico(estatisticas, grafico, colunas):
+    """Dados de um gráfico do sidecar como DataFrame de duas colunas"""
+    valores = estatisticas['graficos'][grafico]
+    return pd.DataFrame(list(valores.items()), columns=colunas)
@@ -0,0 +1,255 @@
+"""
+Filtros globais da barra lateral, aplicados por índices bitmap.
+
+Para cada valor de tipo de álbum, conteúdo explícito, ano e gênero o índice
+guarda as linhas que têm aquele valor: um bitset (np.packbits) para valores
+frequentes ou a lista ordenada das posições (int32) para valores raros, o que
+ocupar menos. A maioria dos gêneros é rara, então o índice cresce com o número
+de pares (linha, gênero) e não com linhas x gêneros. Dentro de uma dimensão
+as linhas são combinadas com OU e entre dimensões com E, sem varrer as colunas
+do DataFrame a cada rerun.
+
+O índice do dataset da sessão é construído uma vez por versão (a chave é a
+assinatura, não o conteúdo do DataFrame) e traz também as opções da barra
+lateral: gêneros em ordem de frequência e o intervalo de anos.
+
+O estado fica em chaves de session_state que não pertencem a widgets, então
+a seleção acompanha o usuário entre as páginas.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.cache import cache_limitado
+from utils.carrega_dados import (VERSOES_MANTIDAS, carregar_tabelas, contar_generos, dados_compartilhados,
+                                 explodir_generos, normalizar_tabelas, obter_status_explicit, obter_tipos_album,
+                                 versao_sessao)
+from utils.payload import exibir_selecao
+
+# Chave de estado -> coluna indexada
+DIMENSOES = {
+    'filtro_tipos_album': 'album_type',
+    'filtro_explicit': 'explicit',
+    'filtro_generos': 'genero',
+}
+CHAVE_ANOS = 'filtro_anos'
+
+
+# =============================================
+# ÍNDICES BITMAP
+# =============================================
+
+# Um valor com menos de n/32 linhas ocupa menos como posições int32 (4 bytes
+# por linha) do que como bitset (n/8 bytes)
+FRACAO_ESPARSA = 1 / 32
+
+
+def _indexar(valores, posicoes, n):
+    """Linhas de cada valor distinto: bitset compactado (uint8) ou posições ordenadas (int32)"""
+    codigos, distintos = pd.factorize(valores)
+    ordem = np.argsort(codigos, kind='stable')
+    # Códigos -1 (valores nulos) ficam antes do primeiro limite e são ignorados
+    limites = np.searchsorted(codigos[ordem], np.arange(len(distintos) + 1))
+
+    indice = {}
+    for i, valor in enumerate(distintos.tolist()):
+        linhas = np.unique(posicoes[ordem[limites[i]:limites[i + 1]]]).astype(np.int32)
+        if len(linhas) < n * FRACAO_ESPARSA:
+            indice[valor] = linhas
+        else:
+            bits = np.zeros(n, dtype=bool)
+            bits[linhas] = True
+            indice[valor] = np.packbits(bits)
+    return indice
+
+
+def _indexar_dataframe(df):
+    n = len(df)
+    linhas = np.arange(n)
+    indices = {'linhas': n}
+
+    for coluna in ['album_type', 'explicit', 'release_year']:
+        indices[coluna] = _indexar(df[coluna], linhas, n)
+
+    generos = explodir_generos(df)
+    indices['genero'] = _indexar(generos.to_numpy(), df.index.get_indexer(generos.index), n)
+    return indices
+
+
+@cache_limitado(max_entradas=8, copiar=False)
+def construir_bitmaps(df):
+    """Índice por valor de album_type, explicit, release_year e gênero de um DataFrame qualquer"""
+    return _indexar_dataframe(df)
+
+
+@cache_limitado(max_entradas=VERSOES_MANTIDAS, max_bytes=None, copiar=False, fixo=True)
+def indices_da_versao(assinatura):
+    """Índice de uma versão do dataset com as opções da barra lateral; somente leitura"""
+    df = dados_compartilhados(assinatura)
+    indices = _indexar_dataframe(df)
+    anos = df['release_year'].dropna()
+    indices['anos'] = (int(anos.min()), int(anos.max()))
+    indices['generos'] = contar_generos(df)['Genero'].tolist()
+    return indices
+
+
+def _uniao(entradas, n):
+    """OU entre as linhas dos valores selecionados, como bitset; vazio quando não há nenhum"""
+    resultado = np.zeros((n + 7) // 8, dtype=np.uint8)
+    esparsas = []
+    for linhas in entradas:
+        if linhas.dtype == np.uint8:
+            resultado |= linhas
+        else:
+            esparsas.append(linhas)
+
+    if esparsas:
+        bits = np.zeros(n, dtype=bool)
+        bits[np.concatenate(esparsas)] = True
+        resultado |= np.packbits(bits)
+    return resultado
+
+
+def combinar_filtros(bitmaps, filtros):
+    """Bitset das linhas que atendem a todos os filtros ativos (E entre dimensões)"""
+    n = bitmaps['linhas']
+    resultado = np.full((n + 7) // 8, 0xFF, dtype=np.uint8)
+
+    for chave, coluna in DIMENSOES.items():
+        selecionados = filtros.get(chave)
+        if selecionados:
+            resultado &= _uniao([bitmaps[coluna][v] for v in selecionados if v in bitmaps[coluna]], n)
+
+    anos = filtros.get(CHAVE_ANOS)
+    if anos is not None:
+        ano_min, ano_max = anos
+        resultado &= _uniao([
+            linhas for ano, linhas in bitmaps['release_year'].items()
+            if not pd.isna(ano) and ano_min <= ano <= ano_max
+        ], n)
+    return resultado
+
+
+def celula_atende(valores, filtros):
+    """
+    Se uma combinação de valores ({coluna: valor}, ex.: uma partição de
+    tipo de álbum, explícito e ano) atende aos filtros das colunas presentes.
+    """
+    for chave, coluna in DIMENSOES.items():
+        selecionados = filtros.get(chave)
+        if selecionados and coluna in valores and valores[coluna] not in selecionados:
+            return False
+
+    anos = filtros.get(CHAVE_ANOS)
+    if anos is not None and 'release_year' in valores:
+        ano = valores['release_year']
+        if pd.isna(ano) or not anos[0] <= ano <= anos[1]:
+            return False
+    return True
+
+
+def aplicar_filtros(df, filtros, bitmaps=None):
+    """
+    Linhas do df selecionadas pelos filtros globais. Sem 'bitmaps' o índice
+    é construído a partir do conteúdo do df.
+    """
+    if not filtros_ativos(filtros):
+        return df
+    bits = combinar_filtros(construir_bitmaps(df) if bitmaps is None else bitmaps, filtros)
+    mascara = np.unpackbits(bits, count=len(df)).astype(bool)
+    return df[mascara]
+
+
+def filtros_salvos(ano_min, ano_max):
+    """Seleção guardada na sessão, sem desenhar os widgets (útil antes da carga dos dados)"""
+    filtros = {chave: st.session_state.get(chave) for chave in DIMENSOES}
+    anos = st.session_state.get(CHAVE_ANOS)
+    filtros[CHAVE_ANOS] = None if anos is None or tuple(anos) == (ano_min, ano_max) else tuple(anos)
+    return filtros
+
+
+def filtros_ativos(filtros):
+    return any(filtros.get(chave) for chave in DIMENSOES) or filtros.get(CHAVE_ANOS) is not None
+
+
+# =============================================
+# BARRA LATERAL
+# =============================================
+
+def _copiar_widget(chave):
+    st.session_state[chave] = st.session_state[f'_widget_{chave}']
+
+
+def _limpar_filtros():
+    for chave in [*DIMENSOES, CHAVE_ANOS]:
+        st.session_state.pop(chave, None)
+
+
+def _widget(funcao, rotulo, chave, padrao, opcoes=None, **kwargs):
+    """Widget cujo valor é guardado em uma chave comum de session_state"""
+    st.session_state.setdefault(chave, padrao)
+    st.session_state[f'_widget_{chave}'] = st.session_state[chave]
+    kwargs.update(key=f'_widget_{chave}', on_change=_copiar_widget, args=(chave,))
+    if opcoes is None:
+        return funcao(rotulo, **kwargs)
+    return exibir_selecao(funcao, rotulo, opcoes, nome=f'Filtro: {rotulo}', **kwargs)
+
+
+def barra_filtros_globais(indices):
+    """Desenha os filtros globais na barra lateral e retorna a seleção atual"""
+    ano_min, ano_max = indices['anos']
+    generos = indices['generos']
+
+    # Ajusta a seleção guardada aos valores do dataset atual (pode ter sido recarregado)
+    estado = st.session_state
+    if 'filtro_generos' in estado:
+        estado['filtro_generos'] = [g for g in estado['filtro_generos'] if g in set(generos)]
+    if CHAVE_ANOS in estado:
+        inicio, fim = estado[CHAVE_ANOS]
+        estado[CHAVE_ANOS] = (min(max(inicio, ano_min), ano_max), max(min(fim, ano_max), ano_min))
+
+    with st.sidebar.expander('🔎 Filtros globais', expanded=False):
+        _widget(st.multiselect, 'Tipo de álbum', 'filtro_tipos_album', [], obter_tipos_album())
+        _widget(st.multiselect, 'Conteúdo explícito', 'filtro_explicit', [], obter_status_explicit())
+        _widget(st.multiselect, 'Gêneros', 'filtro_generos', [], generos)
+        faixa = _widget(st.slider, 'Anos de lançamento', CHAVE_ANOS, (ano_min, ano_max),
+                        min_value=ano_min, max_value=ano_max)
+        st.button('Limpar filtros', on_click=_limpar_filtros)
+
+    filtros = {chave: st.session_state[chave] for chave in DIMENSOES}
+    # O intervalo completo de anos não filtra (mantém músicas sem data)
+    filtros[CHAVE_ANOS] = None if tuple(faixa) == (ano_min, ano_max) else tuple(faixa)
+    return filtros
+
+
+def filtrar_dados_da_pagina(df):
+    """
+    Aplica os filtros globais ao dataset da sessão (carregar_dados()), com o
+    índice da versão. Interrompe a página com um aviso quando nenhuma música
+    atende à seleção.
+    """
+    indices = indices_da_versao(versao_sessao())
+    if indices['linhas'] != len(df):
+        raise ValueError('O DataFrame da página não é o dataset da versão da sessão')
+
+    filtros = barra_filtros_globais(indices)
+    df_filtrado = aplicar_filtros(df, filtros, indices)
+
+    if filtros_ativos(filtros):
+        st.sidebar.caption(f'🔎 {len(df_filtrado):,} de {len(df):,} músicas selecionadas')
+    if df_filtrado.empty:
+        st.warning('Nenhuma música atende aos filtros globais selecionados.')
+        st.stop()
+    return df_filtrado, filtros
+
+
+@cache_limitado(max_entradas=8)
+def _tabelas_da_selecao(df):
+    return normalizar_tabelas(df)
+
+
+def tabelas_filtradas(df, filtros):
+    """Tabelas normalizadas da seleção (as da versão inteira quando não há filtros)"""
+    if not filtros_ativos(filtros):
+        return carregar_tabelas()
+    return _tabelas_da_selecao(df)
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+# Faixas de duração usadas no boxplot de popularidade da Visão Geral
+FAIXAS_DURACAO = [0, 2, 4, 6, 10, 20]
+ROTULOS_DURACAO = ['0-2min', '2-4min', '4-6min', '6-10min', '10+min']
+
+
+def categorizar_duracao(serie):
+    """Categoria de duração como texto (evita problemas de serialização)"""
+    return pd.cut(serie, bins=FAIXAS_DURACAO, labels=ROTULOS_DURACAO).astype(str)
+
+
+# Faixas de popularidade do artista (intervalos iguais entre o mínimo e o máximo)
+FAIXAS_POPULARIDADE = 5
+ROTULOS_POPULARIDADE = ['Muito Baixa', 'Baixa', 'Média', 'Alta', 'Muito Alta']
+
+
+def categorizar_popularidade_artista(serie):
+    """Categoria de popularidade do artista como texto"""
+    return pd.cut(serie, bins=FAIXAS_POPULARIDADE, labels=ROTULOS_POPULARIDADE).astype(str)
+
+
+# =============================================
+# VISÃO GERAL
+# =============================================
+
+def interpretar_duracao(df):
+    """Texto da interpretação do boxplot de popularidade por duração"""
+    popularidade = df.groupby('duration_category_str')['track_popularity']
+
+    # 1. Categoria com MAIS músicas
+    categoria_mais_comum = df['duration_category_str'].value_counts().idxmax()
+
+    # 2. Categoria com MAIOR POPULARIDADE MÉDIA
+    categoria_mais_popular = popularidade.mean().idxmax()
+
+    # 3. Categoria com MENOR popularidade mediana
+    categoria_menos_popular = popularidade.median().idxmin()
+
+    # 4. Número de outliers (acima de Q3 + 1.5 * IQR) por categoria
+    quartis = popularidade.quantile([0.25, 0.75]).unstack()
+    limite_superior = quartis[0.75] + 1.5 * (quartis[0.75] - quartis[0.25])
+    acima = df['track_popularity'] > df['duration_category_str'].map(limite_superior)
+    categoria_mais_outliers = acima.groupby(df['duration_category_str']).sum().idxmax()
+
+    return f"""
+### 🧠 Interpretação Automática do Gráfico
+
+- A maior densidade de músicas está na categoria **{categoria_mais_comum}**, indicando ser a duração mais comum do dataset.
+- As músicas **mais populares**, em média, pertencem à categoria **{categoria_mais_popular}**.
+- A categoria menos popular, analisando a mediana, é **{categoria_menos_popular}**.
+- A categoria que apresenta **mais outliers de popularidade** (músicas muito mais populares que o restante do grupo) é **{categoria_mais_outliers}**.
+- Isso sugere que músicas de duração **moderada** tendem a ter desempenho mais consistente, enquanto músicas muito curtas ou muito longas apresentam grande variabilidade.
+"""
+
+
+def interpretar_lancamentos(df_anos):
+    """Texto da interpretação da quantidade de lançamentos por ano (colunas Ano, Quantidade)"""
+    # Ano com mais e com menos lançamentos
+    ano_max = df_anos.loc[df_anos['Quantidade'].idxmax(), 'Ano']
+    qtd_max = df_anos['Quantidade'].max()
+    ano_min = df_anos.loc[df_anos['Quantidade'].idxmin(), 'Ano']
+    qtd_min = df_anos['Quantidade'].min()
+
+    # Tendência geral ao longo dos anos (aumento, queda ou estabilidade)
+    coef = np.polyfit(df_anos['Ano'].astype(float), df_anos['Quantidade'].astype(float), 1)[0]
+
+    if coef > 0:
+        tendencia = "uma **tendência geral de aumento** no número de lançamentos ao longo dos anos"
+    elif coef < 0:
+        tendencia = "uma **tendência geral de queda** no número de lançamentos ao longo dos anos"
+    else:
+        tendencia = "um **comportamento estável**, sem tendência clara de crescimento ou queda"
+
+    return f"""
+### 🧠 Interpretação Automática do Gráfico — Lançamentos ao Longo do Tempo
+
+- O ano com **maior número de lançamentos** foi **{ano_max}**, com aproximadamente **{qtd_max} músicas**.
+- O ano com **menor número de lançamentos** foi **{ano_min}**, com cerca de **{qtd_min} músicas**.
+- A análise da linha temporal indica **{tendencia}**.
+"""
+
+
+# =============================================
+# POPULARIDADE
+# =============================================
+
+def classificar_correlacao(corr):
+    """Intensidade e sentido de uma correlação, em português"""
+    if abs(corr) >= 0.7:
+        intensidade = "forte"
+    elif abs(corr) >= 0.4:
+        intensidade = "moderada"
+    else:
+        intensidade = "fraca"
+
+    tipo = "positiva" if corr > 0 else "negativa"
+    return tipo, intensidade
+
+
+def interpretar_correlacoes(df_corr, df_inferior=None, df_superior=None):
+    """
+    Uma linha de texto por par de variáveis da matriz de correlação.
+
+    Com as matrizes dos limites do intervalo de confiança, cada linha traz o
+    intervalo e avisa quando ele cruza uma faixa de intensidade ou o zero.
+    """
+    df_long = df_corr.stack().reset_index()
+    df_long.columns = ["Variável 1", "Variável 2", "Correlação"]
+    df_long = df_long[df_long["Variável 1"] < df_long["Variável 2"]]
+
+    analises = []
+    for v1, v2, corr in df_long.itertuples(index=False):
+        tipo, intensidade = classificar_correlacao(corr)
+        texto = f"- **{v1} × {v2}** → correlação **{tipo} {intensidade}** ({corr:.2f})"
+
+        if df_inferior is not None and df_superior is not None:
+            inferior, superior = df_inferior.loc[v1, v2], df_superior.loc[v1, v2]
+            texto += f", IC 95% [{inferior:.2f}, {superior:.2f}]"
+            if inferior < 0 < superior:
+                texto += " — *sem sentido definido*"
+            elif classificar_correlacao(inferior) != classificar_correlacao(superior):
+                texto += " — *intensidade incerta*"
+
+        analises.append(texto)
+
+    return "\n".join(analises)
+
+
+# =============================================
+# ANÁLISE POR ARTISTA
+# =============================================
+
+def interpretar_artista(artista, df_artista, df_album, df_ano):
+    """Principais insights de um artista a partir de suas músicas, álbuns e lançamentos por ano"""
+    musica_top = df_artista.sort_values(by="track_popularity", ascending=False).iloc[0]
+    album_top = df_album.sort_values("track_popularity", ascending=False).iloc[0]
+
+    crescimento = df_ano['Quantidade'].iloc[-1] > df_ano['Quantidade'].iloc[0]
+
+    return f"""
+### 📌 Principais insights sobre **{artista}**
+
+- 🎵 **Música mais popular:** *{musica_top['track_name']}* (popularidade {musica_top['track_popularity']})
+- 💿 **Álbum mais forte:** *{album_top['album_name']}* (popularidade média {album_top['track_popularity']:.1f})
+- 📅 Lançamentos variam de **{df_ano['Ano'].min()}** a **{df_ano['Ano'].max()}**
+- 📈 A carreira apresenta **{"crescimento" if crescimento else "queda"}** no volume de lançamentos ao longo dos anos
+"""
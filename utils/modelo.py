@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from utils.cache import cache_limitado
+
+# Atributos do modelo, na ordem das colunas da matriz de treino
+ATRIBUTOS = [
+    'artist_popularity',
+    'seguidores_milhoes',
+    'track_duration_min',
+    'album_single',
+    'album_compilation',
+    'explicito',
+]
+
+NOMES_ATRIBUTOS = {
+    'artist_popularity': 'Popularidade do artista',
+    'seguidores_milhoes': 'Seguidores do artista',
+    'track_duration_min': 'Duração da música',
+    'album_single': 'Tipo do álbum: single',
+    'album_compilation': 'Tipo do álbum: compilação',
+    'explicito': 'Conteúdo explícito',
+}
+
+# Colunas que um CSV de candidatos precisa ter para ser pontuado
+COLUNAS_CANDIDATOS = ['artist_popularity', 'artist_followers', 'track_duration_min', 'album_type', 'explicit']
+
+VALORES_VERDADEIROS = {'sim', 'true', '1', 'yes', 's'}
+
+
+def montar_matriz(df):
+    """Converte as colunas de entrada na matriz de atributos do modelo"""
+    explicito = df['explicit'].astype(str).str.strip().str.lower().isin(VALORES_VERDADEIROS)
+    tipo_album = df['album_type'].astype(str).str.strip().str.lower()
+
+    return pd.DataFrame({
+        'artist_popularity': pd.to_numeric(df['artist_popularity'], errors='coerce'),
+        'seguidores_milhoes': pd.to_numeric(df['artist_followers'], errors='coerce') / 1_000_000,
+        'track_duration_min': pd.to_numeric(df['track_duration_min'], errors='coerce'),
+        'album_single': (tipo_album == 'single').astype(float),
+        'album_compilation': (tipo_album == 'compilation').astype(float),
+        'explicito': explicito.astype(float),
+    }, index=df.index)[ATRIBUTOS]
+
+
+@cache_limitado
+def treinar_modelo_popularidade(df):
+    """
+    Ajusta uma regressão linear (mínimos quadrados) da popularidade da música.
+
+    Retorna os coeficientes, as médias dos atributos (base das contribuições)
+    e o R² do ajuste.
+    """
+    atributos = montar_matriz(df)
+    validas = atributos.notna().all(axis=1) & df['track_popularity'].notna()
+
+    X = atributos[validas].to_numpy(dtype='float64')
+    y = df.loc[validas, 'track_popularity'].to_numpy(dtype='float64')
+    X_com_intercepto = np.column_stack([np.ones(len(X)), X])
+
+    coeficientes, *_ = np.linalg.lstsq(X_com_intercepto, y, rcond=None)
+    previsto = X_com_intercepto @ coeficientes
+    r2 = 1 - ((y - previsto) ** 2).sum() / ((y - y.mean()) ** 2).sum()
+
+    return {
+        'intercepto': coeficientes[0],
+        'coeficientes': pd.Series(coeficientes[1:], index=ATRIBUTOS),
+        'medias': pd.Series(X.mean(axis=0), index=ATRIBUTOS),
+        'r2': r2,
+        'amostras': len(y),
+    }
+
+
+def pontuar_lote(modelo, df_candidatos):
+    """
+    Pontua todos os candidatos em uma única operação vetorizada.
+
+    Cada contribuição é medida em relação à música média do dataset, então
+    'base' + contribuições = popularidade estimada (antes do limite 0-100).
+    """
+    atributos = montar_matriz(df_candidatos)
+    coeficientes = modelo['coeficientes']
+
+    contribuicoes = (atributos - modelo['medias']) * coeficientes
+    base = modelo['intercepto'] + (modelo['medias'] * coeficientes).sum()
+
+    # min_count faz linhas com algum atributo inválido ficarem sem estimativa
+    estimada = base + contribuicoes.sum(axis=1, min_count=len(ATRIBUTOS))
+
+    resultado = contribuicoes.rename(columns=lambda c: f'contrib_{c}')
+    resultado.insert(0, 'base', base)
+    resultado.insert(0, 'popularidade_estimada', estimada.clip(0, 100))
+    return resultado
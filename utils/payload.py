@@ -0,0 +1,318 @@
+"""
+Medição do volume enviado ao navegador e orçamento de bytes por elemento.
+
+Os wrappers deste módulo substituem st.plotly_chart, st.dataframe e os
+widgets de seleção nas páginas. Cada um mede o tamanho serializado do que vai
+pelo websocket e registra o valor na execução atual. Gráficos e tabelas
+acima do orçamento são reduzidos automaticamente:
+
+- boxplots passam a enviar só os quartis e limites (sem os pontos);
+- histogramas viram barras com as contagens já calculadas;
+- dispersões são amostradas até caber no orçamento;
+- tabelas mostram apenas as primeiras linhas que cabem.
+
+Medir um gráfico ou tabela exige serializá-lo uma vez além do envio, então
+só os elementos com orçamento são medidos. Tabelas são medidas com o
+serializador interno do st.dataframe; se ele não existir na versão instalada
+do Streamlit, o tamanho é estimado pela memória do DataFrame. Os orçamentos vêm do ambiente
+(PAYLOAD_ORCAMENTO_GRAFICO e PAYLOAD_ORCAMENTO_TABELA, em bytes); 0 desliga a
+medição e a redução, e esses elementos aparecem no resumo sem tamanho.
+
+Seções com widgets próprios usam o decorador fragmento: interagir com elas
+reexecuta (e reenvia) só a seção, não a página inteira.
+"""
+
+import functools
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+try:
+    # Serializador usado pelo st.dataframe; é interno ao Streamlit e pode mudar entre versões
+    from streamlit.dataframe_util import convert_anything_to_arrow_bytes
+except ImportError:
+    convert_anything_to_arrow_bytes = None
+
+
+def _orcamento_configurado(variavel, padrao):
+    """Orçamento em bytes definido no ambiente; None (sem medição) quando for 0"""
+    return int(os.environ.get(variavel, padrao)) or None
+
+
+ORCAMENTO_GRAFICO = _orcamento_configurado('PAYLOAD_ORCAMENTO_GRAFICO', 250_000)   # bytes de JSON da figura
+ORCAMENTO_TABELA = _orcamento_configurado('PAYLOAD_ORCAMENTO_TABELA', 1_000_000)   # bytes Arrow do DataFrame
+ORCAMENTO_WIDGET = 50_000       # bytes das opções de um widget (apenas medido)
+
+# Margem para que a figura reduzida fique abaixo do orçamento após a serialização
+FOLGA_AMOSTRAGEM = 0.9
+
+# Histórico por página no processo: reruns e bytes enviados
+_historico = {}
+_trava_historico = threading.Lock()
+
+
+def tamanho_figura(fig):
+    return len(fig.to_json().encode())
+
+
+def iniciar_payload():
+    """
+    Começa a contabilização da execução da página. Deve ser chamada no início
+    de cada página: descarta o que ficou de uma execução interrompida por
+    st.stop() ou por uma exceção antes de exibir_resumo_payload.
+    """
+    st.session_state['_payload_execucao'] = []
+
+
+def _registrar(nome, tipo, tamanho, original=None, acao=None):
+    st.session_state.setdefault('_payload_execucao', []).append({
+        'elemento': nome,
+        'tipo': tipo,
+        'bytes': tamanho,
+        'bytes_original': tamanho if original is None else original,
+        'reducao': acao,
+    })
+
+
+# =============================================
+# REDUÇÃO DE GRÁFICOS
+# =============================================
+
+def _box_agregado(traco):
+    """Troca as amostras de um go.Box pelos quartis e limites de cada categoria"""
+    horizontal = traco.orientation == 'h'
+    valores = np.asarray(traco.x if horizontal else traco.y, dtype=float)
+    categorias = traco.y if horizontal else traco.x
+    grupos = pd.Series(valores).groupby(
+        np.asarray(categorias) if categorias is not None else np.zeros(len(valores)), sort=False
+    )
+
+    q1, mediana, q3 = (grupos.quantile(q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    lowerfence = np.maximum(grupos.min(), q1 - 1.5 * iqr)
+    upperfence = np.minimum(grupos.max(), q3 + 1.5 * iqr)
+
+    agregado = go.Box(traco)
+    agregado.update(x=None, y=None, boxpoints=False, q1=q1, median=mediana, q3=q3,
+                    lowerfence=lowerfence, upperfence=upperfence, mean=grupos.mean())
+    if categorias is not None:
+        agregado.update(**{'y' if horizontal else 'x': q1.index.tolist()})
+    return agregado
+
+
+def _valores_histograma(traco):
+    return pd.to_numeric(pd.Series(traco.x), errors='coerce').dropna()
+
+
+def _histograma_agregado(traco, bordas):
+    """Troca um go.Histogram numérico por barras com as contagens"""
+    contagens, _ = np.histogram(_valores_histograma(traco), bins=bordas)
+
+    return go.Bar(
+        x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, width=np.diff(bordas),
+        name=traco.name, marker=traco.marker.to_plotly_json(), legendgroup=traco.legendgroup,
+        showlegend=traco.showlegend, offsetgroup=traco.offsetgroup,
+        xaxis=traco.xaxis, yaxis=traco.yaxis,
+    )
+
+
+def _amostrar(valor, indices, n):
+    """Aplica a amostragem a todo array do traço com uma posição por ponto"""
+    if isinstance(valor, dict):
+        return {chave: _amostrar(v, indices, n) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)) and len(valor) == n:
+        return np.asarray(valor, dtype=object if isinstance(valor, (list, tuple)) else None)[indices]
+    return valor
+
+
+def _dispersao_amostrada(traco, fracao, semente=0):
+    dados = traco.to_plotly_json()
+    n = len(dados.get('x') if dados.get('x') is not None else dados.get('y', []))
+    if n == 0:
+        return traco
+
+    tamanho = max(1, int(n * fracao))
+    indices = np.sort(np.random.default_rng(semente).choice(n, size=tamanho, replace=False))
+    return type(traco)(_amostrar(dados, indices, n))
+
+
+def reduzir_figura(fig, orcamento):
+    """Figura reduzida para caber no orçamento e a descrição das reduções aplicadas"""
+    acoes = []
+    tracos = list(fig.data)
+
+    # Mesmas faixas para todos os histogramas (barras empilhadas ou sobrepostas alinhadas)
+    histogramas = [t for t in tracos if t.type == 'histogram' and t.x is not None and t.y is None]
+    if histogramas:
+        valores = pd.concat([_valores_histograma(t) for t in histogramas])
+        bordas = np.histogram_bin_edges(valores, bins=histogramas[0].nbinsx or 'auto')
+
+    # 1) Agregações que preservam a leitura do gráfico
+    for i, traco in enumerate(tracos):
+        if traco.type == 'box' and (traco.y is not None or traco.x is not None):
+            tracos[i] = _box_agregado(traco)
+            acoes.append('box agregado')
+        elif traco.type == 'histogram' and traco.x is not None and traco.y is None:
+            tracos[i] = _histograma_agregado(traco, bordas)
+            acoes.append('histograma agregado')
+
+    reduzida = go.Figure(data=tracos, layout=fig.layout)
+    tamanho = tamanho_figura(reduzida)
+
+    # 2) Amostragem das dispersões, se ainda não couber
+    if tamanho > orcamento:
+        fracao = FOLGA_AMOSTRAGEM * orcamento / tamanho
+        amostrados = [
+            _dispersao_amostrada(t, fracao) if t.type in ('scatter', 'scattergl') else t
+            for t in reduzida.data
+        ]
+        if any(t.type in ('scatter', 'scattergl') for t in reduzida.data):
+            reduzida = go.Figure(data=amostrados, layout=fig.layout)
+            acoes.append(f'amostra de {fracao:.0%} dos pontos')
+
+    return reduzida, acoes
+
+
+# =============================================
+# WRAPPERS DAS PÁGINAS
+# =============================================
+
+def exibir_grafico(fig, nome, orcamento=ORCAMENTO_GRAFICO, **kwargs):
+    """st.plotly_chart com medição do JSON e redução automática acima do orçamento"""
+    original = tamanho = tamanho_figura(fig) if orcamento is not None else None
+    acoes = []
+
+    if original is not None and original > orcamento:
+        fig, acoes = reduzir_figura(fig, orcamento)
+        tamanho = tamanho_figura(fig)
+
+    _registrar(nome, 'gráfico', tamanho, original, ', '.join(acoes) or None)
+    kwargs.setdefault('use_container_width', True)
+    resultado = st.plotly_chart(fig, **kwargs)
+    if acoes:
+        st.caption(f'📦 Gráfico reduzido para limitar o volume enviado ao navegador ({", ".join(sorted(set(acoes)))}).')
+    return resultado
+
+
+def tamanho_tabela(df):
+    """Bytes Arrow do DataFrame; sem o serializador do Streamlit, a memória ocupada pelas colunas"""
+    if convert_anything_to_arrow_bytes is None:
+        return int(df.memory_usage(deep=True).sum())
+    return len(convert_anything_to_arrow_bytes(df))
+
+
+def exibir_tabela(df, nome, orcamento=ORCAMENTO_TABELA, **kwargs):
+    """st.dataframe com medição em bytes Arrow e corte de linhas acima do orçamento"""
+    original = tamanho = tamanho_tabela(df) if orcamento is not None else None
+    acao = None
+
+    if original is not None and original > orcamento and len(df) > 1:
+        linhas = max(1, int(len(df) * FOLGA_AMOSTRAGEM * orcamento / original))
+        total = len(df)
+        df = df.head(linhas)
+        tamanho = tamanho_tabela(df)
+        acao = f'primeiras {linhas:,} de {total:,} linhas'
+
+    _registrar(nome, 'tabela', tamanho, original, acao)
+    kwargs.setdefault('use_container_width', True)
+    resultado = st.dataframe(df, **kwargs)
+    if acao:
+        st.caption(f'📦 Exibindo as {acao} para limitar o volume enviado ao navegador.')
+    return resultado
+
+
+def exibir_selecao(widget, rotulo, opcoes, nome=None, **kwargs):
+    """Widget de seleção (selectbox, multiselect, radio) com medição das opções enviadas"""
+    opcoes = list(opcoes)
+    formatar = kwargs.get('format_func', str)
+    tamanho = len(json.dumps([str(formatar(o)) for o in opcoes], ensure_ascii=False).encode())
+
+    acao = 'acima do orçamento de widget' if tamanho > ORCAMENTO_WIDGET else None
+    _registrar(nome or rotulo, 'widget', tamanho, acao=acao)
+    return widget(rotulo, opcoes, **kwargs)
+
+
+# =============================================
+# FRAGMENTOS
+# =============================================
+
+def _execucao_parcial():
+    """True quando a execução atual é só de fragmentos (não da página inteira)"""
+    contexto = get_script_run_ctx()
+    return bool(contexto and contexto.fragment_ids_this_run)
+
+
+def fragmento(pagina, chave):
+    """
+    st.fragment com a contabilização do payload. A função decorada recebe os
+    dados como argumentos; ao interagir com um widget dela, só ela é
+    reexecutada, com os argumentos da última execução completa da página.
+
+    O volume de cada execução parcial entra no histórico da página. O resumo
+    da barra lateral só muda na próxima execução completa, porque fragmentos
+    não escrevem na barra lateral.
+    """
+    def decorador(funcao):
+        @st.fragment(key=chave)
+        @functools.wraps(funcao)
+        def secao(*args, **kwargs):
+            resultado = funcao(*args, **kwargs)
+            if _execucao_parcial():
+                _acumular_historico(pagina, pd.DataFrame(st.session_state.pop('_payload_execucao', [])))
+            return resultado
+        return secao
+    return decorador
+
+
+# =============================================
+# RELATÓRIOS
+# =============================================
+
+def _acumular_historico(pagina, execucao):
+    """Soma uma execução (completa ou de fragmento) ao histórico da página"""
+    if execucao.empty:
+        return 0
+
+    # Elementos sem orçamento não são medidos (bytes None)
+    total = int(pd.to_numeric(execucao['bytes']).fillna(0).sum())
+    with _trava_historico:
+        historico = _historico.setdefault(pagina, {'reruns': 0, 'bytes_total': 0, 'bytes_max': 0, 'reducoes': 0})
+        historico['reruns'] += 1
+        historico['bytes_total'] += total
+        historico['bytes_max'] = max(historico['bytes_max'], total)
+        historico['reducoes'] += int(execucao['reducao'].notna().sum())
+    return total
+
+
+def exibir_resumo_payload(pagina):
+    """
+    Mostra na barra lateral o que a execução atual enviou e acumula o total
+    no histórico da página. Deve ser chamada no fim da página.
+    """
+    execucao = pd.DataFrame(st.session_state.pop('_payload_execucao', []))
+    total = _acumular_historico(pagina, execucao)
+    if execucao.empty:
+        return
+
+    with st.sidebar.expander(f'📦 Payload da página ({total / 1024:,.0f} KB)'):
+        st.dataframe(
+            execucao.assign(kb=pd.to_numeric(execucao['bytes']) / 1024)[['elemento', 'tipo', 'kb', 'reducao']],
+            hide_index=True,
+            column_config={'kb': st.column_config.NumberColumn('KB', format='%.1f')},
+        )
+
+
+def relatorio_payload():
+    """Bytes enviados por rerun em cada página, desde o início do processo"""
+    with _trava_historico:
+        linhas = [{'pagina': pagina, **valores} for pagina, valores in _historico.items()]
+
+    relatorio = pd.DataFrame(linhas, columns=['pagina', 'reruns', 'bytes_total', 'bytes_max', 'reducoes'])
+    relatorio['kb_por_rerun'] = relatorio['bytes_total'] / relatorio['reruns'].clip(lower=1) / 1024
+    return relatorio
@@ -0,0 +1,116 @@
+"""
+Recarga do dataset em segundo plano.
+
+Uma thread acompanha a assinatura do CSV. Quando o arquivo muda (e para de
+mudar entre duas verificações), a nova versão é carregada e os artefatos
+derivados são aquecidos fora do caminho das requisições. Só então a versão
+ativa é trocada, de uma vez. Sessões em andamento continuam na versão com que
+começaram até pedirem a atualização.
+"""
+
+import logging
+import threading
+import time
+
+import streamlit as st
+from utils.amostras import construir_amostras
+from utils.api import iniciar_api_em_segundo_plano
+from utils.busca import construir_indice_busca
+from utils.carrega_dados import (analisar_coocorrencia, assinatura_arquivo, atualizar_versao_sessao,
+                                 carregar_tabelas_versao, carregar_versao, contar_generos,
+                                 publicar_versao, versao_ativa, versao_sessao)
+from utils.correlacao import VARIAVEIS_CORRELACAO, correlacoes_bootstrap
+from utils.dag import derivado
+from utils.filtros import indices_da_versao
+from utils.modelo import treinar_modelo_popularidade
+from utils.similares import construir_indice_similares
+from utils.sketches import sketches_da_versao
+from utils.top_k import construir_indices_top_k
+
+INTERVALO_VERIFICACAO = 10  # segundos
+
+logger = logging.getLogger(__name__)
+
+_monitor = {'thread': None, 'ultima_recarga': None, 'ultimo_erro': None}
+_trava_monitor = threading.Lock()
+
+
+def aquecer_versao(assinatura):
+    """Carrega uma versão do CSV e pré-calcula os artefatos usados pelas páginas"""
+    df = carregar_versao(assinatura)
+    carregar_tabelas_versao(assinatura)
+
+    for nome in ('agregados_anuais', 'contagem_generos', 'coocorrencia_generos', 'lista_artistas',
+                 'faixas_duracao', 'faixas_popularidade_artista'):
+        derivado(nome, df)
+    construir_indices_top_k(df)
+    contar_generos(df)
+    analisar_coocorrencia(df)
+    treinar_modelo_popularidade(df)
+    correlacoes_bootstrap(df, VARIAVEIS_CORRELACAO)
+    for amostra in construir_amostras(df).values():
+        correlacoes_bootstrap(amostra['dados'], VARIAVEIS_CORRELACAO)
+    construir_indice_busca(df)
+    construir_indice_similares(df)
+    sketches_da_versao(assinatura)
+    indices_da_versao(assinatura)
+
+
+def _monitorar(intervalo):
+    candidata = None
+    while True:
+        time.sleep(intervalo)
+        try:
+            assinatura = assinatura_arquivo()
+            if assinatura == versao_ativa():
+                candidata = None
+                continue
+
+            # Espera o arquivo ficar estável por uma verificação (cópia em andamento)
+            if assinatura != candidata:
+                candidata = assinatura
+                continue
+
+            inicio = time.perf_counter()
+            aquecer_versao(assinatura)
+
+            # Descarta se o arquivo mudou de novo durante a carga
+            if assinatura_arquivo() != assinatura:
+                continue
+
+            publicar_versao(assinatura)
+            _monitor['ultima_recarga'] = time.time()
+            _monitor['ultimo_erro'] = None
+            candidata = None
+            logger.info('Dataset recarregado (%s) em %.1fs', assinatura, time.perf_counter() - inicio)
+        except Exception as erro:
+            # Mantém a versão atual; tenta de novo na próxima verificação
+            _monitor['ultimo_erro'] = repr(erro)
+            logger.exception('Falha ao recarregar o dataset')
+
+
+def iniciar_monitoramento(intervalo=INTERVALO_VERIFICACAO):
+    """Inicia a thread de recarga uma única vez por processo"""
+    with _trava_monitor:
+        if _monitor['thread'] is None or not _monitor['thread'].is_alive():
+            versao_ativa()
+            _monitor['thread'] = threading.Thread(
+                target=_monitorar, args=(intervalo,), name='recarga-dataset', daemon=True
+            )
+            _monitor['thread'].start()
+
+
+def acompanhar_versao_dataset():
+    """
+    Garante o monitoramento (e a API de dados, se configurada) e avisa na
+    barra lateral quando a sessão está numa versão anterior do dataset, com
+    um botão para atualizar.
+    """
+    iniciar_monitoramento()
+    iniciar_api_em_segundo_plano()
+
+    if versao_sessao() != versao_ativa():
+        st.sidebar.info('🔄 Uma nova versão do dataset está disponível.')
+        if st.sidebar.button('Atualizar dados'):
+            atualizar_versao_sessao()
+            st.rerun()
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from utils.cache import cache_limitado
+from utils.carrega_dados import explodir_generos, limpar_nomes_artistas
+
+# Peso de cada bloco de atributos na similaridade final
+PESO_GENEROS = 0.7
+PESO_NUMERICO = 0.3
+
+ATRIBUTOS_NUMERICOS = ['artist_popularity', 'log_seguidores', 'duracao_mediana']
+
+
+def _tabela_artistas(df):
+    """Uma linha por artista (nome padronizado) com atributos numéricos e gêneros"""
+    nomes = limpar_nomes_artistas(df['artist_name'])
+    base = df.assign(artista=nomes).dropna(subset=['artista'])
+
+    artistas = base.groupby('artista').agg(
+        artist_popularity=('artist_popularity', 'max'),
+        artist_followers=('artist_followers', 'max'),
+        duracao_mediana=('track_duration_min', 'median'),
+    )
+    artistas['log_seguidores'] = np.log1p(artistas['artist_followers'])
+
+    generos = explodir_generos(base).to_frame().assign(artista=base['artista'])
+    generos = generos.drop_duplicates(['artista', 'genero'])
+
+    return artistas, generos
+
+
+@cache_limitado(max_entradas=4, copiar=False)
+def construir_indice_similares(df):
+    """
+    Constrói a matriz de atributos por artista: vetor esparso de gêneros
+    (pesos IDF, formato CSR) mais atributos numéricos padronizados.
+
+    As linhas são normalizadas para norma 1, de modo que o produto escalar
+    entre dois artistas é a similaridade de cosseno.
+    """
+    artistas, generos = _tabela_artistas(df)
+    nomes = artistas.index
+    n_artistas = len(nomes)
+
+    # Bloco de gêneros: gêneros raros pesam mais que gêneros muito comuns
+    id_artista = nomes.get_indexer(generos['artista'])
+    id_genero, vocabulario = pd.factorize(generos['genero'])
+    artistas_por_genero = np.bincount(id_genero, minlength=len(vocabulario))
+    idf = np.log(n_artistas / artistas_por_genero)
+    pesos = idf[id_genero]
+
+    norma_generos = np.sqrt(np.bincount(id_artista, weights=pesos ** 2, minlength=n_artistas))
+    pesos = pesos / np.where(norma_generos > 0, norma_generos, 1)[id_artista] * np.sqrt(PESO_GENEROS)
+
+    # Bloco numérico: z-scores com norma 1 por artista
+    numerico = artistas[ATRIBUTOS_NUMERICOS].to_numpy(dtype='float64')
+    numerico = (numerico - numerico.mean(axis=0)) / numerico.std(axis=0).clip(min=1e-9)
+    norma_numerica = np.linalg.norm(numerico, axis=1, keepdims=True)
+    numerico = numerico / np.where(norma_numerica > 0, norma_numerica, 1) * np.sqrt(PESO_NUMERICO)
+
+    # Renormaliza o vetor completo (artistas sem gênero ficam só com o bloco numérico)
+    norma_total = np.sqrt(
+        np.bincount(id_artista, weights=pesos ** 2, minlength=n_artistas)
+        + (numerico ** 2).sum(axis=1)
+    )
+    norma_total = np.where(norma_total > 0, norma_total, 1)
+    pesos = pesos / norma_total[id_artista]
+    numerico = numerico / norma_total[:, None]
+
+    # CSR por artista (gêneros de cada artista) e por gênero (listas invertidas)
+    ordem_artista = np.argsort(id_artista, kind='stable')
+    ordem_genero = np.argsort(id_genero, kind='stable')
+
+    return {
+        'artistas': artistas,
+        'vocabulario': np.asarray(vocabulario),
+        'numerico': numerico,
+        'ptr_artista': np.concatenate([[0], np.cumsum(np.bincount(id_artista, minlength=n_artistas))]),
+        'generos_do_artista': id_genero[ordem_artista],
+        'pesos_do_artista': pesos[ordem_artista],
+        'ptr_genero': np.concatenate([[0], np.cumsum(artistas_por_genero)]),
+        'artistas_do_genero': id_artista[ordem_genero],
+        'pesos_do_genero': pesos[ordem_genero],
+    }
+
+
+def buscar_similares(indice, artista, k=10):
+    """
+    Retorna os k artistas mais semelhantes (similaridade de cosseno) com os
+    gêneros em comum, ou um DataFrame vazio se o artista não estiver no índice.
+    """
+    posicao = indice['artistas'].index.get_indexer([artista])[0]
+    if posicao < 0:
+        return pd.DataFrame(columns=['Artista', 'Similaridade', 'Gêneros em Comum',
+                                     'Popularidade', 'Seguidores'])
+
+    # Bloco numérico: produto escalar denso com todos os artistas
+    similaridade = indice['numerico'] @ indice['numerico'][posicao]
+
+    # Bloco de gêneros: percorre só as listas invertidas dos gêneros do artista
+    inicio, fim = indice['ptr_artista'][posicao], indice['ptr_artista'][posicao + 1]
+    generos = indice['generos_do_artista'][inicio:fim]
+    pesos = indice['pesos_do_artista'][inicio:fim]
+    for genero, peso in zip(generos, pesos):
+        de, ate = indice['ptr_genero'][genero], indice['ptr_genero'][genero + 1]
+        np.add.at(similaridade, indice['artistas_do_genero'][de:ate],
+                  peso * indice['pesos_do_genero'][de:ate])
+
+    similaridade[posicao] = -np.inf
+    k = min(k, len(similaridade) - 1)
+    melhores = np.argpartition(-similaridade, k)[:k]
+    melhores = melhores[np.argsort(-similaridade[melhores])]
+
+    # Gêneros em comum de cada vizinho, para explicar a recomendação
+    generos_alvo = set(generos)
+    em_comum = []
+    for vizinho in melhores:
+        de, ate = indice['ptr_artista'][vizinho], indice['ptr_artista'][vizinho + 1]
+        comuns = generos_alvo.intersection(indice['generos_do_artista'][de:ate])
+        em_comum.append(', '.join(sorted(indice['vocabulario'][list(comuns)])))
+
+    vizinhos = indice['artistas'].iloc[melhores]
+    return pd.DataFrame({
+        'Artista': vizinhos.index,
+        'Similaridade': similaridade[melhores].round(3),
+        'Gêneros em Comum': em_comum,
+        'Popularidade': vizinhos['artist_popularity'].to_numpy(),
+        'Seguidores': vizinhos['artist_followers'].to_numpy(),
+    })
@@ -0,0 +1,319 @@
+"""
+Sketches mescláveis para contagens distintas (HyperLogLog) e quantis (KLL).
+
+Cada bloco (partição, pedaço de CSV ou lote em streaming) gera seus próprios
+sketches, que são combinados depois com custo proporcional ao tamanho do
+sketch e não ao dos dados.
+
+No dashboard, os blocos são as células dos filtros globais (tipo de álbum x
+explícito x ano): os sketches de cada célula são calculados uma vez por
+versão do dataset, e o modo aproximado só mescla as células selecionadas.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+from utils.cache import cache_limitado
+from utils.carrega_dados import VERSOES_MANTIDAS, dados_compartilhados
+from utils.dag import derivado
+from utils.filtros import celula_atende
+
+TAMANHO_BLOCO_PADRAO = 100_000
+
+# Células dos sketches da versão e grupos dos boxplots da Visão Geral. Com
+# centenas de células, a precisão 12 (erro típico de 1.6%) mantém os
+# HyperLogLogs em 4 KB cada
+DIMENSOES_CELULAS = ['album_type', 'explicit', 'release_year']
+COLUNAS_GRUPO = ('duration_category_str', 'artist_popularity_cat_str')
+PRECISAO_CELULAS = 12
+
+
+def _hash64(valores):
+    """Hash de 64 bits vetorizado, estável entre processos"""
+    return pd.util.hash_pandas_object(pd.Series(valores), index=False).to_numpy(dtype=np.uint64)
+
+
+def _zeros_a_esquerda(x):
+    """Quantidade de bits zero à esquerda de cada uint64 (busca binária vetorizada)"""
+    zeros = np.zeros(len(x), dtype=np.int64)
+    for deslocamento in (32, 16, 8, 4, 2, 1):
+        vazio = (x >> np.uint64(64 - deslocamento)) == 0
+        zeros += vazio * deslocamento
+        x = np.where(vazio, x << np.uint64(deslocamento), x)
+    return zeros + (x == 0)
+
+
+# =============================================
+# HYPERLOGLOG
+# =============================================
+
+class HyperLogLog:
+    """Estimador de cardinalidade com erro relativo típico de 1.04 / sqrt(2^precisao)"""
+
+    def __init__(self, precisao=14):
+        self.precisao = precisao
+        self.registradores = np.zeros(2 ** precisao, dtype=np.uint8)
+
+    def adicionar(self, valores):
+        valores = pd.Series(valores).dropna()
+        if valores.empty:
+            return self
+
+        hashes = _hash64(valores)
+        indices = (hashes >> np.uint64(64 - self.precisao)).astype(np.int64)
+        restante = hashes << np.uint64(self.precisao)
+        posicoes = np.minimum(_zeros_a_esquerda(restante) + 1, 64 - self.precisao + 1)
+
+        np.maximum.at(self.registradores, indices, posicoes.astype(np.uint8))
+        return self
+
+    def mesclar(self, outro):
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+        return self
+
+    @property
+    def erro_relativo(self):
+        return 1.04 / math.sqrt(len(self.registradores))
+
+    def estimativa(self):
+        m = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.sum(2.0 ** -self.registradores.astype(np.float64))
+
+        # Correção para cardinalidades pequenas (contagem linear)
+        vazios = np.count_nonzero(self.registradores == 0)
+        if estimativa <= 2.5 * m and vazios > 0:
+            estimativa = m * math.log(m / vazios)
+        return estimativa
+
+
+# =============================================
+# KLL (QUANTIS)
+# =============================================
+
+class KLL:
+    """
+    Sketch de quantis KLL: níveis de amostras com peso 2^nível, compactados
+    ao exceder a capacidade. Erro de posto normalizado de cerca de 3.3 / k.
+    """
+
+    def __init__(self, k=200, semente=0):
+        self.k = k
+        self.niveis = [np.empty(0)]
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self._aleatorio = np.random.default_rng(semente)
+
+    def _capacidade(self, nivel):
+        altura = len(self.niveis)
+        return max(2, int(math.ceil(self.k * (2 / 3) ** (altura - 1 - nivel))))
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+
+                itens = np.sort(itens)
+                # Com quantidade ímpar, o último item permanece no nível atual
+                sobra = itens[-1:] if len(itens) % 2 else itens[:0]
+                pares = itens[:len(itens) - len(sobra)]
+                promovidos = pares[self._aleatorio.integers(2)::2]
+
+                self.niveis[nivel] = sobra
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+                # Recomeça: a altura mudou e as capacidades dos níveis baixos também
+                nivel = 0
+                continue
+            nivel += 1
+
+    def adicionar(self, valores):
+        valores = np.asarray(pd.Series(valores).dropna(), dtype=np.float64)
+        if len(valores) == 0:
+            return self
+
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+        return self
+
+    def mesclar(self, outro):
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+
+        self.n += outro.n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self._compactar()
+        return self
+
+    @property
+    def erro_rank(self):
+        return 3.3 / self.k
+
+    def quantis(self, probabilidades):
+        if self.n == 0:
+            return np.full(len(probabilidades), np.nan)
+
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(i), 2.0 ** nivel) for nivel, i in enumerate(self.niveis)])
+        ordem = np.argsort(itens, kind='stable')
+        acumulado = np.cumsum(pesos[ordem])
+
+        posicoes = np.searchsorted(acumulado, np.asarray(probabilidades) * acumulado[-1], side='left')
+        resultado = itens[ordem][np.minimum(posicoes, len(itens) - 1)]
+
+        # Extremos são exatos
+        resultado = np.where(np.asarray(probabilidades) <= 0, self.minimo, resultado)
+        return np.where(np.asarray(probabilidades) >= 1, self.maximo, resultado)
+
+
+# =============================================
+# RESUMO APROXIMADO POR BLOCOS
+# =============================================
+
+def estatisticas_box(sketch):
+    """Quartis e limites (1.5 * IQR) no formato dos parâmetros de go.Box"""
+    q1, mediana, q3 = sketch.quantis([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    return {
+        'q1': q1,
+        'median': mediana,
+        'q3': q3,
+        'lowerfence': max(sketch.minimo, q1 - 1.5 * iqr),
+        'upperfence': min(sketch.maximo, q3 + 1.5 * iqr),
+    }
+
+
+def resumir_bloco(bloco, colunas_grupo=(), precisao=14):
+    """Sketches de um único bloco de linhas"""
+    resumo = {
+        'linhas': len(bloco),
+        'artistas': HyperLogLog(precisao).adicionar(bloco['artist_name']),
+        'albuns': HyperLogLog(precisao).adicionar(bloco['album_name']),
+        'popularidade_max': bloco['track_popularity'].max(),
+        'ano_min': bloco['release_year'].min(),
+        'ano_max': bloco['release_year'].max(),
+        'quantis': {},
+    }
+    for coluna in colunas_grupo:
+        resumo['quantis'][coluna] = {
+            grupo: KLL().adicionar(valores)
+            for grupo, valores in bloco.groupby(coluna, observed=True)['track_popularity']
+        }
+    return resumo
+
+
+def mesclar_resumos(a, b):
+    """Combina os sketches de dois blocos (a é alterado e devolvido)"""
+    a['linhas'] += b['linhas']
+    a['artistas'].mesclar(b['artistas'])
+    a['albuns'].mesclar(b['albuns'])
+    # Series ignora valores nulos de blocos sem dados válidos
+    a['popularidade_max'] = pd.Series([a['popularidade_max'], b['popularidade_max']]).max()
+    a['ano_min'] = pd.Series([a['ano_min'], b['ano_min']]).min()
+    a['ano_max'] = pd.Series([a['ano_max'], b['ano_max']]).max()
+
+    for coluna, grupos in b['quantis'].items():
+        destino = a['quantis'].setdefault(coluna, {})
+        for grupo, sketch in grupos.items():
+            if grupo in destino:
+                destino[grupo].mesclar(sketch)
+            else:
+                destino[grupo] = sketch
+    return a
+
+
+def resumir_blocos(blocos, colunas_grupo=()):
+    """Resume um iterável de blocos (partições, chunks de CSV ou lotes em streaming)"""
+    resumo = None
+    for bloco in blocos:
+        parcial = resumir_bloco(bloco, colunas_grupo)
+        resumo = parcial if resumo is None else mesclar_resumos(resumo, parcial)
+    return resumo
+
+
+# =============================================
+# SKETCHES POR CÉLULA DOS FILTROS
+# =============================================
+
+def sketches_por_celula(df, colunas_grupo=(), precisao=PRECISAO_CELULAS):
+    """Resumo de cada combinação de tipo de álbum, explícito e ano ({valores da célula: resumo})"""
+    return {
+        celula: resumir_bloco(bloco, colunas_grupo, precisao)
+        for celula, bloco in df.groupby(DIMENSOES_CELULAS, dropna=False, sort=False)
+    }
+
+
+@cache_limitado(max_entradas=VERSOES_MANTIDAS, max_bytes=None, copiar=False, fixo=True)
+def sketches_da_versao(assinatura):
+    """Sketches por célula de uma versão do dataset, com os grupos dos boxplots; somente leitura"""
+    df = dados_compartilhados(assinatura)
+    df = df.assign(
+        duration_category_str=derivado('faixas_duracao', df),
+        artist_popularity_cat_str=derivado('faixas_popularidade_artista', df),
+    )
+    return sketches_por_celula(df, COLUNAS_GRUPO)
+
+
+def _mesclar_hlls(sketches):
+    resultado = HyperLogLog(sketches[0].precisao)
+    np.maximum.reduce([sketch.registradores for sketch in sketches], out=resultado.registradores)
+    return resultado
+
+
+def _mesclar_klls(sketches):
+    """Junta os níveis de todos os sketches e compacta uma única vez"""
+    resultado = KLL(sketches[0].k)
+    altura = max(len(sketch.niveis) for sketch in sketches)
+    resultado.niveis = [
+        np.concatenate([sketch.niveis[nivel] for sketch in sketches if nivel < len(sketch.niveis)])
+        for nivel in range(altura)
+    ]
+    resultado.n = sum(sketch.n for sketch in sketches)
+    resultado.minimo = min(sketch.minimo for sketch in sketches)
+    resultado.maximo = max(sketch.maximo for sketch in sketches)
+    resultado._compactar()
+    return resultado
+
+
+def mesclar_celulas(celulas, filtros):
+    """
+    Resumo das células que atendem aos filtros globais (sem o de gêneros, que
+    não particiona as linhas). None quando nenhuma célula é selecionada.
+    Os sketches das células não são alterados.
+    """
+    selecionadas = [
+        resumo for celula, resumo in celulas.items()
+        if celula_atende(dict(zip(DIMENSOES_CELULAS, celula)), filtros)
+    ]
+    if not selecionadas:
+        return None
+
+    quantis = {}
+    for resumo in selecionadas:
+        for coluna, grupos in resumo['quantis'].items():
+            for grupo, sketch in grupos.items():
+                quantis.setdefault(coluna, {}).setdefault(grupo, []).append(sketch)
+
+    # Series ignora valores nulos de células sem dados válidos
+    return {
+        'linhas': sum(resumo['linhas'] for resumo in selecionadas),
+        'artistas': _mesclar_hlls([resumo['artistas'] for resumo in selecionadas]),
+        'albuns': _mesclar_hlls([resumo['albuns'] for resumo in selecionadas]),
+        'popularidade_max': pd.Series([resumo['popularidade_max'] for resumo in selecionadas]).max(),
+        'ano_min': pd.Series([resumo['ano_min'] for resumo in selecionadas]).min(),
+        'ano_max': pd.Series([resumo['ano_max'] for resumo in selecionadas]).max(),
+        'quantis': {
+            coluna: {grupo: _mesclar_klls(sketches) for grupo, sketches in grupos.items()}
+            for coluna, grupos in quantis.items()
+        },
+    }
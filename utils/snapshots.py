@@ -0,0 +1,184 @@
+"""
+Comparação entre snapshots (exports semanais) do dataset.
+
+Cada snapshot é um CSV no mesmo formato do dataset principal, guardado em
+./dataset/snapshots. As chaves de texto (artista, álbum, música) dos dois
+snapshots são internadas em um único vocabulário de inteiros, e a junção é
+feita por hash sobre essa chave int64, sem comparar strings linha a linha.
+O resultado fica em cache por par de snapshots (caminho + assinatura).
+
+Todos os snapshots, inclusive o dataset principal, são lidos sem a
+deduplicação do dashboard: a política 'musica' escolhe a versão mais popular
+de cada música, e essa escolha muda entre exports quando a popularidade muda,
+criando músicas "novas" e "removidas" que não existem. Cada snapshot mantém
+uma linha por chave da junção (a primeira do arquivo).
+
+Popularidade e seguidores de um artista variam entre as linhas dele no mesmo
+export. Para artistas presentes nos dois snapshots, esses valores são
+comparados só nas músicas que existem nos dois, e uma música que entrou ou
+saiu não aparece como variação do artista.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from utils.cache import cache_limitado
+from utils.carrega_dados import CAMINHO_DATASET, assinatura_arquivo, ler_dataset
+
+DIRETORIO_SNAPSHOTS = './dataset/snapshots'
+NOME_DATASET_ATUAL = 'Atual (dataset principal)'
+
+COLUNAS_CHAVE = ['artist_name', 'album_name', 'track_name']
+
+# Situação de cada entidade entre o snapshot base e o comparado
+SITUACOES = ['mantida', 'nova', 'removida']
+
+
+def listar_snapshots(diretorio=DIRETORIO_SNAPSHOTS):
+    """Nome -> caminho dos snapshots disponíveis, do mais antigo ao mais recente"""
+    arquivos = []
+    if os.path.isdir(diretorio):
+        arquivos = [
+            os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+            if nome.endswith('.csv')
+        ]
+    arquivos.sort(key=os.path.getmtime)
+
+    snapshots = {os.path.splitext(os.path.basename(caminho))[0]: caminho for caminho in arquivos}
+    snapshots[NOME_DATASET_ATUAL] = CAMINHO_DATASET
+    return snapshots
+
+
+@cache_limitado(max_entradas=4, max_bytes=None, copiar=False)
+def carregar_snapshot(caminho, assinatura):
+    """
+    Snapshot limpo e validado (sem gravar quarentena), com uma linha por
+    chave da junção; a assinatura só identifica a versão no cache. Somente leitura.
+    """
+    df = ler_dataset(caminho, caminho_quarentena=None, politica='nenhuma')['dados']
+    return df[~df.duplicated(COLUNAS_CHAVE)]
+
+
+# =============================================
+# CHAVES E JUNÇÃO
+# =============================================
+
+def internar_chaves(df_a, df_b, colunas=COLUNAS_CHAVE):
+    """
+    Chave int64 de cada linha dos dois snapshots para a combinação de colunas.
+
+    Os valores de cada coluna viram códigos de um vocabulário comum aos dois
+    snapshots; a combinação é recompactada a cada coluna para que o produto
+    nunca estoure int64. Linhas com os mesmos valores recebem a mesma chave.
+    """
+    n_a = len(df_a)
+    chave = np.zeros(n_a + len(df_b), dtype=np.int64)
+
+    for coluna in colunas:
+        codigos, distintos = pd.factorize(pd.concat([df_a[coluna], df_b[coluna]], ignore_index=True))
+        # Código -1 (nulo) vira 0 para não colidir com o primeiro valor
+        chave, _ = pd.factorize(chave * (len(distintos) + 1) + (codigos + 1))
+
+    return chave[:n_a], chave[n_a:]
+
+
+def _juntar(antes, depois, nomes):
+    """
+    Junção externa por hash (merge em chave int64) de duas tabelas indexadas
+    pela chave, com os nomes da entidade e a situação de cada uma.
+    """
+    juntas = antes.join(depois, how='outer', lsuffix='_antes', rsuffix='_depois')
+
+    nomes = nomes[~nomes.index.duplicated()]
+    juntas = nomes.reindex(juntas.index).join(juntas)
+
+    tem_antes = juntas.index.isin(antes.index)
+    tem_depois = juntas.index.isin(depois.index)
+    juntas['situacao'] = pd.Categorical(
+        np.select([tem_antes & tem_depois, tem_depois], SITUACOES[:2], default=SITUACOES[2]),
+        categories=SITUACOES,
+    )
+    return juntas.reset_index(drop=True)
+
+
+def _deltas_musicas(df_a, df_b, chave_a, chave_b):
+    def por_chave(df, chave):
+        # carregar_snapshot já deixa uma linha por chave
+        return pd.DataFrame({'popularidade': df['track_popularity'].to_numpy()}, index=chave)
+
+    nomes = pd.concat([
+        df_a[COLUNAS_CHAVE].set_axis(chave_a),
+        df_b[COLUNAS_CHAVE].set_axis(chave_b),
+    ])
+    musicas = _juntar(por_chave(df_a, chave_a), por_chave(df_b, chave_b), nomes)
+    musicas['delta_popularidade'] = musicas['popularidade_depois'] - musicas['popularidade_antes']
+    return musicas
+
+
+def _deltas_artistas(df_a, df_b, comum_a, comum_b):
+    """comum_a/comum_b: máscaras das músicas presentes nos dois snapshots"""
+    chave_a, chave_b = internar_chaves(df_a, df_b, ['artist_name'])
+
+    def por_artista(df, chave, comum):
+        artistas = df.groupby(chave).agg(
+            popularidade=('artist_popularity', 'max'),
+            seguidores=('artist_followers', 'max'),
+            musicas=('track_name', 'count'),
+        )
+        comuns = df[comum].groupby(chave[comum])[['artist_popularity', 'artist_followers']].max()
+        artistas.loc[comuns.index, ['popularidade', 'seguidores']] = comuns.to_numpy()
+        return artistas
+
+    nomes = pd.concat([
+        df_a[['artist_name']].set_axis(chave_a),
+        df_b[['artist_name']].set_axis(chave_b),
+    ])
+    artistas = _juntar(por_artista(df_a, chave_a, comum_a), por_artista(df_b, chave_b, comum_b), nomes)
+    artistas['delta_popularidade'] = artistas['popularidade_depois'] - artistas['popularidade_antes']
+    artistas['delta_seguidores'] = artistas['seguidores_depois'] - artistas['seguidores_antes']
+    artistas['variacao_seguidores_pct'] = (
+        artistas['delta_seguidores'] / artistas['seguidores_antes'].where(artistas['seguidores_antes'] > 0) * 100
+    )
+    return artistas
+
+
+# =============================================
+# COMPARAÇÃO
+# =============================================
+
+@cache_limitado(max_entradas=4, copiar=False)
+def _comparar(caminho_a, assinatura_a, caminho_b, assinatura_b):
+    df_a = carregar_snapshot(caminho_a, assinatura_a)
+    df_b = carregar_snapshot(caminho_b, assinatura_b)
+
+    chave_a, chave_b = internar_chaves(df_a, df_b)
+    musicas = _deltas_musicas(df_a, df_b, chave_a, chave_b)
+    artistas = _deltas_artistas(df_a, df_b, np.isin(chave_a, chave_b), np.isin(chave_b, chave_a))
+
+    resumo = {
+        'musicas_antes': len(df_a),
+        'musicas_depois': len(df_b),
+        # Quantidade por situação: {'mantida': n, 'nova': n, 'removida': n}
+        'situacao_musicas': {s: int(n) for s, n in musicas['situacao'].value_counts().items()},
+        'situacao_artistas': {s: int(n) for s, n in artistas['situacao'].value_counts().items()},
+        'delta_medio_popularidade_musicas': float(musicas['delta_popularidade'].mean()),
+        'delta_total_seguidores': float(artistas['delta_seguidores'].sum()),
+    }
+    return {'musicas': musicas, 'artistas': artistas, 'resumo': resumo}
+
+
+def comparar_snapshots(caminho_a, caminho_b):
+    """
+    Deltas por música e por artista entre o snapshot base (a) e o comparado (b).
+
+    Retorna {'musicas': df, 'artistas': df, 'resumo': dict}. As tabelas são
+    compartilhadas pelo cache e não devem ser alteradas.
+    """
+    return _comparar(caminho_a, assinatura_arquivo(caminho_a), caminho_b, assinatura_arquivo(caminho_b))
+
+
+def maiores_variacoes(tabela, coluna, n=15):
+    """As n entidades presentes nos dois snapshots que mais subiram e mais caíram"""
+    mantidas = tabela[(tabela['situacao'] == 'mantida') & tabela[coluna].notna()]
+    return mantidas.nlargest(n, coluna), mantidas.nsmallest(n, coluna)
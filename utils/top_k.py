@@ -0,0 +1,86 @@
+import pandas as pd
+from utils.cache import cache_limitado
+from utils.carrega_dados import classificar_segmento, explodir_generos
+
+# Quantidade de posições guardadas em cada ranking
+TOP_K_PADRAO = 50
+
+# Métricas de ranking: nome da métrica -> coluna usada na ordenação
+METRICAS_ARTISTA = {
+    'popularidade': 'artist_popularity',
+    'seguidores': 'artist_followers',
+    'musicas': 'qtd_musicas',
+    'popularidade_musicas': 'popularidade_media_musicas',
+}
+
+METRICAS_MUSICA = {
+    'popularidade': 'track_popularity',
+    'seguidores': 'artist_followers',
+}
+
+ESCOPOS = ['global', 'genero', 'ano', 'segmento']
+
+
+def _linhas_por_escopo(df):
+    """Gera (escopo, DataFrame com coluna 'valor') para cada escopo de ranking"""
+    colunas = ['artist_name', 'track_name', 'album_name', 'track_popularity',
+               'artist_popularity', 'artist_followers']
+    base = df[colunas]
+
+    yield 'global', base.assign(valor='Todos')
+
+    generos = explodir_generos(df)
+    yield 'genero', base.loc[generos.index].assign(valor=generos.values)
+
+    anos = df['release_year']
+    yield 'ano', base[anos.notna()].assign(valor=anos.dropna().astype(int))
+
+    yield 'segmento', base.assign(valor=classificar_segmento(df))
+
+
+def _top_por_valor(tabela, coluna, k):
+    # Ordenação estável mantém a ordem alfabética em caso de empate
+    tabela = tabela.sort_values(['valor', coluna], ascending=[True, False], kind='stable')
+    return tabela.groupby('valor', sort=False).head(k).set_index('valor')
+
+
+@cache_limitado
+def construir_indices_top_k(df, k=TOP_K_PADRAO):
+    """
+    Pré-calcula os rankings top-k de artistas e músicas para o escopo global
+    e para cada gênero, ano de lançamento e segmento estratégico.
+
+    Retorna um dicionário {(entidade, metrica, escopo): DataFrame} indexado por
+    'valor' do escopo, já ordenado da melhor para a pior posição.
+    """
+    indices = {}
+
+    for escopo, linhas in _linhas_por_escopo(df):
+        artistas = linhas.groupby(['valor', 'artist_name'], as_index=False).agg(
+            artist_popularity=('artist_popularity', 'mean'),
+            artist_followers=('artist_followers', 'max'),
+            qtd_musicas=('track_name', 'count'),
+            popularidade_media_musicas=('track_popularity', 'mean'),
+        )
+        for metrica, coluna in METRICAS_ARTISTA.items():
+            indices[('artistas', metrica, escopo)] = _top_por_valor(artistas, coluna, k)
+
+        musicas = linhas[['valor', 'track_name', 'artist_name', 'album_name',
+                          'track_popularity', 'artist_followers']]
+        for metrica, coluna in METRICAS_MUSICA.items():
+            indices[('musicas', metrica, escopo)] = _top_por_valor(musicas, coluna, k)
+
+    return indices
+
+
+def valores_escopo(indices, escopo):
+    """Lista os valores disponíveis em um escopo (gêneros, anos ou segmentos)"""
+    return indices[('artistas', 'popularidade', escopo)].index.unique().tolist()
+
+
+def consultar_top_k(indices, entidade, metrica, escopo='global', valor='Todos', n=10):
+    """Retorna as n primeiras posições do ranking pré-calculado"""
+    tabela = indices[(entidade, metrica, escopo)]
+    if valor not in tabela.index:
+        return tabela.iloc[0:0].reset_index(drop=True)
+    return tabela.loc[[valor]].head(n).reset_index(drop=True)
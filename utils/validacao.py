@@ -0,0 +1,181 @@
+"""
+Validação, deduplicação e quarentena na ingestão do dataset.
+
+Todas as regras são máscaras vetorizadas sobre o DataFrame inteiro, então a
+etapa cresce linearmente com o arquivo. Um resumo de qualidade acompanha cada
+versão; as linhas rejeitadas e duplicadas, com os motivos, só são gravadas
+no CSV de quarentena com GRAVAR_QUARENTENA=1 (ou passando o caminho).
+
+O dashboard usa a política de deduplicação de POLITICA_DEDUPLICACAO (padrão
+'musica'). Datas de lançamento ilegíveis não rejeitam a linha por padrão: ela
+fica no dataset sem data (release_year nulo) e entra na contagem de nulos do
+resumo; com REJEITAR_DATAS_INVALIDAS=1 a linha vai para a quarentena.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CAMINHO_QUARENTENA = './dataset/quarentena.csv'
+GRAVAR_QUARENTENA = os.environ.get('GRAVAR_QUARENTENA', '0') == '1'
+QUARENTENA_PADRAO = CAMINHO_QUARENTENA if GRAVAR_QUARENTENA else None
+
+# Políticas de deduplicação:
+# - nenhuma: mantém todas as linhas
+# - linha: remove linhas idênticas em todas as colunas do CSV
+# - faixa: uma linha por track_id do Spotify
+# - musica: uma linha por música + artista (nomes normalizados), mesmo que
+#   apareça em álbum, single e compilação
+POLITICAS_DEDUPLICACAO = ('nenhuma', 'linha', 'faixa', 'musica')
+
+
+def _politica_configurada():
+    politica = os.environ.get('POLITICA_DEDUPLICACAO', 'musica').strip().lower()
+    if politica not in POLITICAS_DEDUPLICACAO:
+        raise ValueError(f'Política de deduplicação desconhecida: {politica!r} '
+                         f'(use {", ".join(POLITICAS_DEDUPLICACAO)})')
+    return politica
+
+
+POLITICA_PADRAO = _politica_configurada()
+REJEITAR_DATAS_INVALIDAS = os.environ.get('REJEITAR_DATAS_INVALIDAS', '0') == '1'
+MOTIVO_DATA_INVALIDA = 'data de lançamento inválida'
+
+# Entre duplicatas de uma música, fica a mais popular; no empate, a do álbum
+PRIORIDADE_TIPO_ALBUM = {'album': 0, 'single': 1, 'compilation': 2}
+
+
+
+def _fora_do_intervalo(serie, minimo, maximo):
+    """Valores ausentes, ilegíveis ou fora de [minimo, maximo]"""
+    valores = pd.to_numeric(serie, errors='coerce')
+    return (valores.isna() | (valores < minimo) | (valores > maximo)).to_numpy()
+
+
+def _negativos(serie):
+    """Valores abaixo de zero; ausentes não contam (ficam nos nulos do resumo)"""
+    return (pd.to_numeric(serie, errors='coerce') < 0).to_numpy()
+
+
+# Motivo -> máscara das linhas inválidas (calculada sobre o dataset já convertido)
+REGRAS = {
+    'nome da música ausente': lambda df: df['track_name'].isna().to_numpy(),
+    'nome do artista ausente': lambda df: df['artist_name'].isna().to_numpy(),
+    'popularidade da música fora de 0-100': lambda df: _fora_do_intervalo(df['track_popularity'], 0, 100),
+    'popularidade do artista fora de 0-100': lambda df: _fora_do_intervalo(df['artist_popularity'], 0, 100),
+    'seguidores negativos': lambda df: _negativos(df['artist_followers']),
+    'duração ausente ou não positiva': lambda df: (
+        _fora_do_intervalo(df['track_duration_min'], 0, np.inf)
+        | (df['track_duration_min'] == 0).to_numpy()
+    ),
+    MOTIVO_DATA_INVALIDA: lambda df: df['release_year'].isna().to_numpy(),
+}
+
+
+def avaliar_regras(df):
+    """Matriz booleana (linhas x regras) com as violações de cada linha"""
+    return pd.DataFrame({motivo: regra(df) for motivo, regra in REGRAS.items()}, index=df.index)
+
+
+def _texto_motivos(violacoes):
+    """Motivos de cada linha separados por '; ', montados coluna a coluna"""
+    texto = pd.Series('', index=violacoes.index)
+    for motivo in violacoes.columns:
+        texto = texto.where(~violacoes[motivo], texto + motivo + '; ')
+    return texto.str.removesuffix('; ')
+
+
+def _normalizar(serie):
+    return serie.astype('string').str.strip().str.casefold()
+
+
+def hash_linhas(df_original, politica):
+    """Hash de 64 bits que identifica duplicatas segundo a política"""
+    if politica == 'linha':
+        chave = df_original
+    elif politica == 'faixa':
+        chave = df_original[['track_id']]
+    else:
+        chave = pd.DataFrame({
+            'track_name': _normalizar(df_original['track_name']),
+            'artist_name': _normalizar(df_original['artist_name']),
+        })
+    return pd.util.hash_pandas_object(chave, index=False).to_numpy()
+
+
+def marcar_duplicatas(df, df_original, politica):
+    """Máscara das linhas descartadas como duplicatas (mantém uma por chave)"""
+    if politica == 'nenhuma':
+        return np.zeros(len(df), dtype=bool)
+
+    hashes = hash_linhas(df_original, politica)
+    # Ordem de preferência: maior popularidade, depois álbum > single > compilação
+    prioridade_tipo = df['album_type'].map(PRIORIDADE_TIPO_ALBUM).fillna(len(PRIORIDADE_TIPO_ALBUM))
+    ordem = np.lexsort((
+        np.arange(len(df)),
+        prioridade_tipo.to_numpy(),
+        -pd.to_numeric(df['track_popularity'], errors='coerce').fillna(-1).to_numpy(),
+    ))
+
+    duplicada = np.zeros(len(df), dtype=bool)
+    duplicada[ordem] = pd.Series(hashes[ordem]).duplicated().to_numpy()
+    return duplicada
+
+
+def gravar_quarentena(rejeitadas, caminho=CAMINHO_QUARENTENA):
+    """Grava as linhas rejeitadas (com a coluna 'motivo') de forma atômica, por um temporário de nome único"""
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8', newline='') as arquivo:
+            rejeitadas.to_csv(arquivo, index=False)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def validar_dados(df, df_original, politica=POLITICA_PADRAO, caminho_quarentena=QUARENTENA_PADRAO,
+                  rejeitar_datas_invalidas=REJEITAR_DATAS_INVALIDAS):
+    """
+    Separa as linhas válidas das rejeitadas e resume a qualidade do arquivo.
+
+    df é o dataset já convertido (datas, explicit) e df_original o CSV lido,
+    com o mesmo índice. Retorna o df válido e deduplicado e o resumo. As
+    linhas descartadas só são gravadas quando há 'caminho_quarentena'. Sem
+    'rejeitar_datas_invalidas', linhas com data ilegível são mantidas sem data.
+    """
+    if politica not in POLITICAS_DEDUPLICACAO:
+        raise ValueError(f'Política de deduplicação desconhecida: {politica!r}')
+
+    violacoes = avaliar_regras(df)
+    datas_invalidas = violacoes[MOTIVO_DATA_INVALIDA]
+    if not rejeitar_datas_invalidas:
+        violacoes = violacoes.drop(columns=MOTIVO_DATA_INVALIDA)
+    invalida = violacoes.any(axis=1).to_numpy()
+
+    # Duplicatas só são procuradas entre as linhas válidas
+    duplicada = np.zeros(len(df), dtype=bool)
+    duplicada[~invalida] = marcar_duplicatas(df[~invalida], df_original[~invalida], politica)
+
+    motivos = _texto_motivos(violacoes)
+    motivos[duplicada] = f'duplicada (política {politica})'
+    rejeitada = invalida | duplicada
+
+    if caminho_quarentena:
+        gravar_quarentena(df_original[rejeitada].assign(motivo=motivos[rejeitada]), caminho_quarentena)
+
+    validas = df[~rejeitada]
+    resumo = {
+        'linhas_lidas': len(df),
+        'linhas_validas': len(validas),
+        'linhas_rejeitadas': int(invalida.sum()),
+        'linhas_duplicadas': int(duplicada.sum()),
+        'politica_deduplicacao': politica,
+        'rejeitadas_por_motivo': {m: int(n) for m, n in violacoes.sum().items() if n},
+        'datas_invalidas_mantidas': 0 if rejeitar_datas_invalidas else int(datas_invalidas[~rejeitada].sum()),
+        'nulos_por_coluna': {c: int(n) for c, n in validas.isna().sum().items() if n},
+        'arquivo_quarentena': caminho_quarentena,
+    }
+    return validas, resumo